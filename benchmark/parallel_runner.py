@@ -0,0 +1,225 @@
+import argparse
+import csv
+import fcntl
+import json
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+from docker.utils import parse_bytes
+from scheduler import group_rows
+
+from llm4netlab.config import BASE_DIR, RESULTS_DIR
+from llm4netlab.net_env.net_env_pool import get_net_env_instance
+from llm4netlab.utils.timing import format_report, write_timing_report
+
+""" Parallel benchmark runner: concurrent workers on isolated labs, admitted against the host capacity """
+
+cur_dir = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger("ParallelBenchmarkRunner")
+
+# requested by a machine without cpus/mem in its meta, the containers are not limited but they still use some
+UNLIMITED_MACHINE_CPUS = 0.25
+UNLIMITED_MACHINE_MEMORY = "128m"
+
+
+def row_key(row: dict) -> str:
+    return "|".join(str(row[column]) for column in ("problem", "scenario", "topo_level", "topo_size"))
+
+
+class AdmissionController:
+    """Admit labs while the CPUs and memory requested by their machines fit in the host capacity.
+
+    The requests are the `cpus`/`mem` limits of the machines (e.g. 0.5 CPU / 256m for the frr-stress routers), or
+    UNLIMITED_MACHINE_* for the machines without limits, and headroom keeps a share of the host for the agents,
+    the LLM clients and Docker itself. A lab larger than the whole capacity is admitted alone.
+    """
+
+    def __init__(self, cpus: float | None = None, memory: int | None = None, headroom: float = 0.8):
+        self.cpus = (cpus or os.cpu_count()) * headroom
+        self.memory = (memory or os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")) * headroom
+        self.used_cpus = 0.0
+        self.used_memory = 0
+        self.running = 0
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def demand(scenario_name: str, topo_size: str | None) -> tuple[float, int]:
+        """CPUs and bytes of memory requested by the machines of a lab."""
+        net_env = get_net_env_instance(scenario_name, topo_size=topo_size)
+        cpus = 0.0
+        memory = 0
+        for machine in net_env.lab.machines.values():
+            cpu = machine.get_cpu(multiplier=1000)
+            cpus += cpu / 1000 if cpu else UNLIMITED_MACHINE_CPUS
+            memory += parse_bytes(machine.get_mem() or UNLIMITED_MACHINE_MEMORY)
+        return cpus, memory
+
+    def _fits(self, cpus: float, memory: int) -> bool:
+        if self.running == 0:
+            return True
+        return self.used_cpus + cpus <= self.cpus and self.used_memory + memory <= self.memory
+
+    def acquire(self, demand: tuple[float, int]):
+        cpus, memory = demand
+        with self._cond:
+            while not self._fits(cpus, memory):
+                self._cond.wait()
+            self.used_cpus += cpus
+            self.used_memory += memory
+            self.running += 1
+
+    def release(self, demand: tuple[float, int]):
+        cpus, memory = demand
+        with self._cond:
+            self.used_cpus -= cpus
+            self.used_memory -= memory
+            self.running -= 1
+            self._cond.notify_all()
+
+
+class CompletedRows:
+    """Append-only record of the completed rows, shared by the worker processes, to resume a sweep."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> set[str]:
+        if not os.path.exists(self.path):
+            return set()
+        with open(self.path, "r") as f:
+            return {json.loads(line)["row"] for line in f if line.strip()}
+
+    def mark(self, row: dict):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            f.write(json.dumps({"row": row_key(row), "completed_at": time.time(), "pid": os.getpid()}) + "\n")
+            f.flush()
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def merge_summaries(results_dir: str, num_workers: int):
+    """Concatenate the evaluation summaries of the workers into 0_summary/evaluation_summary_parallel.csv."""
+    rows = []
+    fieldnames = None
+    for worker in range(num_workers):
+        path = os.path.join(results_dir, f"worker_{worker}", "0_summary", "evaluation_summary.csv")
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            fieldnames = fieldnames or reader.fieldnames
+            rows.extend(reader)
+    if fieldnames is None:
+        return
+    os.makedirs(os.path.join(results_dir, "0_summary"), exist_ok=True)
+    with open(os.path.join(results_dir, "0_summary", "evaluation_summary_parallel.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def run_parallel_benchmark(
+    rows: list[dict],
+    num_workers: int = 4,
+    seed: int = 0,
+    max_rows_per_task: int = 10,
+    admission: AdmissionController | None = None,
+    results_dir: str = RESULTS_DIR,
+):
+    """Run the rows on num_workers concurrent worker processes.
+
+    The rows are grouped by (scenario, topo_size) as in run_grouped_benchmark and split into tasks of at most
+    max_rows_per_task rows. Worker i deploys its labs as <scenario>_w<i> and keeps its session in
+    runtime/workers/worker_<i> and its results in <results_dir>/worker_<i>. A task starts once the admission
+    controller has room for its lab. Completed rows are recorded in <results_dir>/0_summary/completed_rows.jsonl
+    and skipped when the sweep is run again.
+    """
+    admission = admission or AdmissionController()
+    completed = CompletedRows(os.path.join(results_dir, "0_summary", "completed_rows.jsonl"))
+    done = completed.load()
+    remaining = [row for row in rows if row_key(row) not in done]
+    logger.info(f"{len(rows) - len(remaining)} of {len(rows)} rows already completed, {len(remaining)} to run")
+
+    tasks = queue.Queue()
+    for (scenario, topo_size), group in group_rows(remaining, seed):
+        for i in range(0, len(group), max_rows_per_task):
+            tasks.put((scenario, topo_size, group[i : i + max_rows_per_task]))
+
+    failed = []
+
+    def worker(index: int):
+        worker_dir = os.path.join(BASE_DIR, "runtime", "workers", f"worker_{index}")
+        os.makedirs(worker_dir, exist_ok=True)
+        env = dict(
+            os.environ,
+            RESULTS_DIR=os.path.join(results_dir, f"worker_{index}"),
+            SESSION_DIR=worker_dir,
+        )
+        while True:
+            try:
+                scenario, topo_size, task_rows = tasks.get_nowait()
+            except queue.Empty:
+                return
+            demand = admission.demand(scenario, topo_size)
+            admission.acquire(demand)
+            logger.info(
+                f"Worker {index}: {len(task_rows)} rows of {scenario} (topo size {topo_size}), "
+                f"requesting {demand[0]:.1f} CPUs / {demand[1] / 2**30:.1f} GiB"
+            )
+            task_path = os.path.join(worker_dir, "task.json")
+            with open(task_path, "w") as f:
+                json.dump({"rows": task_rows, "seed": seed, "lab_suffix": f"_w{index}", "completed": completed.path}, f)
+            try:
+                with open(os.path.join(worker_dir, "worker.log"), "a") as log:
+                    process = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), "--task", task_path],
+                        env=env,
+                        cwd=cur_dir,
+                        stdout=log,
+                        stderr=subprocess.STDOUT,
+                    )
+            finally:
+                admission.release(demand)
+            if process.returncode != 0:
+                logger.error(f"Worker {index}: task on {scenario} failed, see {worker_dir}/worker.log")
+                failed.append((scenario, topo_size))
+
+    threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(num_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    merge_summaries(results_dir, num_workers)
+    timing_dirs = [os.path.join(results_dir, f"worker_{index}", "0_timing") for index in range(num_workers)]
+    report = write_timing_report(timing_dirs, os.path.join(results_dir, "0_summary"))
+    logger.info(f"Benchmark timing:\n{format_report(report)}")
+    logger.info(f"Parallel benchmark done, {len(completed.load())} of {len(rows)} rows completed")
+    if failed:
+        logger.warning(f"Failed tasks, their remaining rows run again on resume: {failed}")
+
+
+def _run_task(task_path: str):
+    """Worker process: run the rows of a task on the labs of the worker."""
+    from scheduler import run_grouped_benchmark
+
+    with open(task_path, "r") as f:
+        task = json.load(f)
+    completed = CompletedRows(task["completed"])
+    run_grouped_benchmark(task["rows"], seed=task["seed"], lab_suffix=task["lab_suffix"], on_row_done=completed.mark)
+
+
+if __name__ == "__main__":
+    # entry point of the worker processes, the sweep is started with run_benchmark.py --workers N
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Parallel benchmark worker")
+    parser.add_argument("--task", type=str, required=True, help="Task file written by run_parallel_benchmark")
+    args = parser.parse_args()
+    _run_task(args.task)
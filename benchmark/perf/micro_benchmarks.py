@@ -0,0 +1,193 @@
+import argparse
+import asyncio
+import csv
+import importlib
+import inspect
+import logging
+import os
+import random
+import statistics
+import time
+from typing import Callable
+
+from llm4netlab.service.kathara.fake_backend import FakeKatharaManager, install_fake_backend
+
+""" Micro-benchmarks of the framework overhead: command round trip, MCP tools and problem construction, on the
+in-memory Kathara backend so that the Docker exec time is left out """
+
+cur_dir = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger("MicroBenchmarks")
+
+# (MCP server module, tool, arguments), {host}/{router}/{intf} are filled from the lab
+MCP_TOOL_CALLS = [
+    ("kathara_base_mcp_server", "get_host_net_config", {"host_name": "{host}"}),
+    ("kathara_base_mcp_server", "get_tc_statistics", {"host_name": "{host}", "interface": "{intf}"}),
+    ("kathara_base_mcp_server", "ping_pair", {"host_a": "{host}", "host_b": "{other_host}", "count": 4}),
+    ("kathara_frr_mcp_server", "frr_show_ip_route", {"router_name": "{router}"}),
+    ("kathara_frr_mcp_server", "frr_show_running_config", {"router_name": "{router}"}),
+]
+
+
+def measure(fn: Callable[[], object], repeat: int = 100, warmup: int = 3) -> dict:
+    """Time repeat calls of fn, in milliseconds per call."""
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {
+        "calls": repeat,
+        "mean_ms": round(statistics.mean(times), 4),
+        "p50_ms": round(statistics.median(times), 4),
+        "p95_ms": round(times[int(0.95 * (len(times) - 1))], 4),
+        "min_ms": round(times[0], 4),
+    }
+
+
+def _run_tool(tool: Callable, arguments: dict):
+    result = tool(**arguments)
+    if inspect.isawaitable(result):
+        result = asyncio.run(result)
+    return result
+
+
+def benchmark_commands(api, host: str, router: str, repeat: int) -> dict:
+    """_run_cmd round trip and the API calls built on it, which parse its output."""
+    return {
+        "run_cmd.ip_addr": measure(lambda: api._run_cmd(host, "ip -j addr"), repeat),
+        "exec_cmd.ip_addr": measure(lambda: api.exec_cmd(host, "ip -j addr"), repeat),
+        "api.get_host_ip": measure(lambda: api.get_host_ip(host), repeat),
+        "api.get_default_gateway": measure(lambda: api.get_default_gateway(host), repeat),
+        "api.get_links": measure(api.get_links, repeat),
+        "api.frr_show_route": measure(lambda: api.frr_show_route(router), repeat),
+        "api.get_reachability": measure(lambda: asyncio.run(api.get_reachability()), max(1, repeat // 10), 1),
+    }
+
+
+def benchmark_mcp_tools(lab_name: str, placeholders: dict, repeat: int) -> dict:
+    """The MCP tool functions called in process, without the stdio transport, with a new API object per call as in
+    the servers."""
+    results = {}
+    skipped = set()
+    for module_name, tool_name, arguments in MCP_TOOL_CALLS:
+        if module_name in skipped:
+            continue
+        try:
+            module = importlib.import_module(f"llm4netlab.service.mcp_server.{module_name}")
+        except ImportError as e:
+            logger.warning(f"Skipping the tools of {module_name}: {e}")
+            skipped.add(module_name)
+            continue
+        # the servers read the lab from the environment when they are imported
+        module.LAB_NAME = lab_name
+        tool = getattr(module, tool_name)
+        arguments = {
+            key: value.format(**placeholders) if isinstance(value, str) else value for key, value in arguments.items()
+        }
+        # safe_tool turns the exceptions into an error message, which would time the error path
+        result = _run_tool(tool, arguments)
+        if (
+            isinstance(result, list)
+            and result
+            and str(result[0]).startswith(("Tool execution error", "Validation error"))
+        ):
+            logger.warning(f"Skipping tool {tool_name}, it failed: {result[0]}")
+            continue
+        results[f"mcp.{tool_name}"] = measure(lambda: _run_tool(tool, arguments), repeat)
+    return results
+
+
+def benchmark_problems(scenario_name: str, topo_size: str | None, problem_names: list[str], repeat: int) -> dict:
+    """Construction of the problems of a scenario, the net env model coming from the memo cache."""
+    from llm4netlab.orchestrator.problems.prob_pool import get_problem_instance
+
+    results = {}
+    for problem_name in problem_names:
+        random.seed(f"{problem_name}-{scenario_name}")
+        try:
+            get_problem_instance(
+                problem_names=[problem_name],
+                task_level="localization",
+                scenario_name=scenario_name,
+                topo_size=topo_size,
+            )
+        except Exception as e:
+            logger.warning(f"Skipping problem {problem_name} on {scenario_name}: {e}")
+            continue
+        results[f"problem.{problem_name}"] = measure(
+            lambda: get_problem_instance(
+                problem_names=[problem_name],
+                task_level="localization",
+                scenario_name=scenario_name,
+                topo_size=topo_size,
+            ),
+            repeat,
+        )
+    return results
+
+
+def benchmark_problem_names(scenario_name: str) -> list[str]:
+    """The problems benchmarked on a scenario in benchmark.csv."""
+    with open(os.path.join(cur_dir, "..", "benchmark.csv"), "r", newline="") as f:
+        return sorted({row["problem"] for row in csv.DictReader(f) if row["scenario"] == scenario_name})
+
+
+def run_micro_benchmarks(
+    scenario_name: str = "ospf_enterprise_static",
+    topo_size: str | None = "s",
+    exec_latency: float = 0.0,
+    repeat: int = 100,
+    manager: FakeKatharaManager | None = None,
+) -> dict:
+    """Deploy the scenario on the in-memory backend and time the framework calls against it.
+
+    Args:
+        exec_latency: Seconds added to each exec by the backend, 0 to measure the framework overhead alone.
+    """
+    manager = install_fake_backend(manager or FakeKatharaManager(exec_latency=exec_latency))
+
+    from llm4netlab.net_env.net_env_pool import get_net_env_instance
+    from llm4netlab.service.kathara import KatharaAPIALL
+
+    # not memoized, so that the net env holds the fake Kathara instance
+    net_env = get_net_env_instance(scenario_name, use_cache=False, topo_size=topo_size)
+    manager.deploy_lab(net_env.lab)
+    net_env.load_machines()
+    api = KatharaAPIALL(lab_name=net_env.lab.name)
+    host, other_host = net_env.hosts[0], net_env.hosts[-1]
+    router = net_env.routers[0] if net_env.routers else host
+    placeholders = {"host": host, "other_host": other_host, "router": router, "intf": "eth0"}
+
+    results = {}
+    results.update(benchmark_commands(api, host, router, repeat))
+    results.update(benchmark_mcp_tools(net_env.lab.name, placeholders, repeat))
+    results.update(benchmark_problems(scenario_name, topo_size, benchmark_problem_names(scenario_name), repeat))
+    logger.info(f"{manager.exec_count} commands run on the in-memory backend")
+    return results
+
+
+def format_results(results: dict) -> str:
+    lines = [f"{'benchmark':<40} {'calls':>6} {'mean(ms)':>10} {'p50(ms)':>10} {'p95(ms)':>10}"]
+    for name, stats in results.items():
+        lines.append(
+            f"{name:<40} {stats['calls']:>6} {stats['mean_ms']:>10.3f} "
+            f"{stats['p50_ms']:>10.3f} {stats['p95_ms']:>10.3f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of the framework on the in-memory Kathara backend")
+    parser.add_argument("--scenario", type=str, default="ospf_enterprise_static", help="Scenario to deploy")
+    parser.add_argument("--topo_size", type=str, default="s", help="Topology size of the scenario (default: s)")
+    parser.add_argument(
+        "--exec_latency", type=float, default=0.0, help="Seconds added to each exec (default: 0, overhead only)"
+    )
+    parser.add_argument("--repeat", type=int, default=100, help="Calls per benchmark (default: 100)")
+    args = parser.parse_args()
+    print(format_results(run_micro_benchmarks(args.scenario, args.topo_size, args.exec_latency, args.repeat)))
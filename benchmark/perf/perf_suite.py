@@ -0,0 +1,319 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from micro_benchmarks import measure
+
+from llm4netlab.service.kathara.fake_backend import FakeKatharaManager, install_fake_backend
+
+""" Performance suite of the platform hot paths, with a history of the runs and regression checks against a
+baseline """
+
+cur_dir = os.path.dirname(os.path.abspath(__file__))
+
+logger = logging.getLogger("PerfSuite")
+
+PERF_RESULTS_DIR = os.getenv("PERF_RESULTS_DIR") or os.path.join(cur_dir, "results")
+# a case regresses when its p50 grows by more than the threshold and by more than the noise floor
+DEFAULT_THRESHOLD = 0.25
+NOISE_FLOOR_MS = 0.05
+
+_IMPORT_SCRIPT = """\
+import time
+start = time.perf_counter()
+from llm4netlab.orchestrator.problems.prob_pool import get_problem_class, list_avail_problem_names
+names = list_avail_problem_names()
+{resolve}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+# --- cases -------------------------------------------------------------------------------------------------------
+def bench_registry_import(repeat: int) -> dict:
+    """Import of the problem registry and lookup of every problem class, each in a fresh interpreter."""
+    script = _IMPORT_SCRIPT.format(resolve="for name in names: get_problem_class(name, 'localization')")
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+        times.append(float(output.stdout.strip().splitlines()[-1]))
+    times.sort()
+    return {
+        "calls": repeat,
+        "mean_ms": round(sum(times) / len(times), 4),
+        "p50_ms": round(times[len(times) // 2], 4),
+        "p95_ms": round(times[int(0.95 * (len(times) - 1))], 4),
+        "min_ms": round(times[0], 4),
+    }
+
+
+def bench_model_builds(scenarios: list[str], repeat: int) -> dict:
+    """Model build of each scenario and size, from scratch and from the on-disk model cache."""
+    import inspect
+
+    from llm4netlab.net_env.model_cache import load_or_build
+    from llm4netlab.net_env.net_env_pool import _NET_ENVS
+
+    results = {}
+    for scenario_name in scenarios:
+        net_env_cls = _NET_ENVS[scenario_name]
+        sizes = ["s", "m", "l"] if "topo_size" in inspect.signature(net_env_cls).parameters else [None]
+        for topo_size in sizes:
+            arguments = (("topo_size", topo_size),) if topo_size else ()
+            suffix = f"{scenario_name}.{topo_size or 'default'}"
+            results[f"model_build.{suffix}"] = measure(lambda: net_env_cls(**dict(arguments)), repeat, warmup=1)
+            results[f"model_load.{suffix}"] = measure(
+                lambda: load_or_build(scenario_name, net_env_cls, arguments), repeat, warmup=1
+            )
+    return results
+
+
+def bench_run_cmd(lab_name: str, host: str, repeat: int) -> dict:
+    from llm4netlab.service.kathara import KatharaBaseAPI
+
+    api = KatharaBaseAPI(lab_name=lab_name)
+    return {"run_cmd.true": measure(lambda: api._run_cmd(host, "true"), repeat)}
+
+
+def bench_bmv2(lab_name: str, switch: str, repeat: int) -> dict:
+    """Thrift RPCs to a BMv2 switch, each one a python3 run on the switch."""
+    from llm4netlab.service.kathara import KatharaBMv2API
+
+    api = KatharaBMv2API(lab_name=lab_name)
+    return {
+        "bmv2.switch_info": measure(lambda: api.bmv2_switch_info(switch), repeat),
+        "bmv2.show_tables": measure(lambda: api.bmv2_show_tables(switch), repeat),
+    }
+
+
+def bench_telemetry(lab_name: str, collector: str, repeat: int) -> dict:
+    """InfluxDB queries on the INT collector."""
+    from llm4netlab.service.kathara import KatharaTelemetryAPI
+
+    api = KatharaTelemetryAPI(lab_name=lab_name)
+    return {
+        "telemetry.get_measurements": measure(lambda: api.influx_get_measurements(collector), repeat),
+        "telemetry.count_measurements": measure(lambda: api.influx_count_measurements("int", collector), repeat),
+    }
+
+
+def _write_trace(path: str, steps: int):
+    """A conversation.log of steps LLM calls with one tool call each, in the format of FileLoggerHandler."""
+    start = datetime(2025, 1, 1)
+    with open(path, "w") as f:
+        for step in range(steps):
+            for offset, entry in enumerate(
+                [
+                    {"event": "llm_start", "prompts": ["..." * 50]},
+                    {"event": "llm_end", "usage_metadata": {"input_tokens": 1200, "output_tokens": 150}},
+                    {"event": "tool_start", "tool": {"name": "get_host_net_config"}, "input": "{}"},
+                    {"event": "tool_end", "output": "x" * 400},
+                ]
+            ):
+                timestamp = start + timedelta(seconds=step, milliseconds=offset)
+                f.write(json.dumps({"timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S.%f"), **entry}) + "\n")
+
+
+def bench_trace_parsing(repeat: int, steps: int = 500) -> dict:
+    from llm4netlab.evaluator.trace_parser import AgentTraceParser
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "conversation.log")
+        _write_trace(path, steps)
+        stats = measure(lambda: AgentTraceParser(path).parse_trace(), repeat)
+    stats["entries_per_s"] = round(4 * steps / (stats["p50_ms"] / 1000))
+    return {f"trace_parse.{steps}_steps": stats}
+
+
+def bench_result_recording(repeat: int) -> dict:
+    from llm4netlab.evaluator import result_log
+    from llm4netlab.evaluator.result_log import EvalResult, record_eval_result
+
+    results_dir = result_log.RESULTS_DIR
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        result_log.RESULTS_DIR = tmp_dir
+        try:
+            result = EvalResult(agent_type="react", backend_model="perf", session_id="perf", time_taken=1.0)
+            stats = measure(lambda: record_eval_result(result), repeat)
+        finally:
+            result_log.RESULTS_DIR = results_dir
+    return {"record_eval_result": stats}
+
+
+# --- suite -------------------------------------------------------------------------------------------------------
+def _lab_ready(net_env, manager: FakeKatharaManager | None) -> bool:
+    """Deploy the lab on the in-memory backend, or check that it runs on Kathara."""
+    if manager is not None:
+        manager.deploy_lab(net_env.lab)
+        return True
+    if not net_env.lab_exists():
+        logger.warning(f"Lab {net_env.lab.name} is not deployed, skipping its cases")
+        return False
+    return True
+
+
+def run_suite(
+    backend: str = "fake",
+    scenario_name: str = "ospf_enterprise_static",
+    p4_scenario_name: str = "p4_int",
+    model_scenarios: list[str] | None = None,
+    repeat: int = 50,
+) -> dict:
+    """Run the cases, on the labs deployed on Kathara (backend="kathara") or on the in-memory backend.
+
+    On Kathara, scenario_name and p4_scenario_name must be deployed under their own names, the cases of a lab that
+    is not deployed are skipped. The registry, model, trace and result cases do not touch a lab.
+    """
+    manager = install_fake_backend() if backend == "fake" else None
+    from llm4netlab.net_env.net_env_pool import get_net_env_instance
+
+    results = {}
+    results["registry_import"] = bench_registry_import(max(3, repeat // 10))
+    results.update(bench_model_builds(model_scenarios or [scenario_name], max(3, repeat // 10)))
+
+    net_env = get_net_env_instance(scenario_name, use_cache=False)
+    if _lab_ready(net_env, manager):
+        net_env.load_machines()
+        results.update(bench_run_cmd(net_env.lab.name, net_env.hosts[0], repeat))
+
+    p4_env = get_net_env_instance(p4_scenario_name, use_cache=False)
+    if _lab_ready(p4_env, manager):
+        p4_env.load_machines()
+        results.update(bench_bmv2(p4_env.lab.name, p4_env.bmv2_switches[0], repeat))
+        if "collector" in p4_env.lab.machines:
+            results.update(bench_telemetry(p4_env.lab.name, "collector", repeat))
+
+    results.update(bench_trace_parsing(max(3, repeat // 5)))
+    results.update(bench_result_recording(repeat))
+    return results
+
+
+# --- history and baseline ----------------------------------------------------------------------------------------
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=cur_dir, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_record(backend: str, results: dict) -> dict:
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "backend": backend,
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def append_history(record: dict, results_dir: str = PERF_RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    with open(os.path.join(results_dir, "history.jsonl"), "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def baseline_path(backend: str, results_dir: str = PERF_RESULTS_DIR) -> str:
+    # the two backends differ by orders of magnitude, each has its own baseline
+    return os.path.join(results_dir, f"baseline_{backend}.json")
+
+
+def save_baseline(record: dict, results_dir: str = PERF_RESULTS_DIR):
+    os.makedirs(results_dir, exist_ok=True)
+    path = baseline_path(record["backend"], results_dir)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(record, f, indent=4)
+    os.replace(f"{path}.tmp", path)
+
+
+def load_baseline(backend: str, results_dir: str = PERF_RESULTS_DIR) -> dict | None:
+    path = baseline_path(backend, results_dir)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare(results: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list[dict]:
+    """Compare the p50 of each case with the baseline.
+
+    Returns:
+        One row per case: baseline and current p50, relative change and status, "regression" when it grew by more
+        than threshold and NOISE_FLOOR_MS, "improved" when it shrank as much, "new" without a baseline.
+    """
+    rows = []
+    for name, stats in results.items():
+        current = stats["p50_ms"]
+        previous = baseline.get("results", {}).get(name, {}).get("p50_ms")
+        if previous is None:
+            rows.append({"case": name, "baseline_ms": None, "current_ms": current, "change": None, "status": "new"})
+            continue
+        change = (current - previous) / previous if previous else 0.0
+        status = "ok"
+        if abs(current - previous) > NOISE_FLOOR_MS:
+            if change > threshold:
+                status = "regression"
+            elif change < -threshold:
+                status = "improved"
+        rows.append(
+            {"case": name, "baseline_ms": previous, "current_ms": current, "change": round(change, 3), "status": status}
+        )
+    return rows
+
+
+def format_comparison(rows: list[dict]) -> str:
+    lines = [f"{'case':<45} {'baseline(ms)':>13} {'current(ms)':>12} {'change':>8}  status"]
+    for row in rows:
+        baseline = f"{row['baseline_ms']:.3f}" if row["baseline_ms"] is not None else "-"
+        change = f"{row['change']:+.1%}" if row["change"] is not None else "-"
+        lines.append(f"{row['case']:<45} {baseline:>13} {row['current_ms']:>12.3f} {change:>8}  {row['status']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    parser = argparse.ArgumentParser(description="Performance suite of the platform hot paths")
+    parser.add_argument(
+        "--backend",
+        type=str,
+        choices=["fake", "kathara"],
+        default="fake",
+        help="Run against the in-memory backend, or the labs deployed on Kathara (default: fake)",
+    )
+    parser.add_argument("--scenario", type=str, default="ospf_enterprise_static", help="Lab of the run_cmd case")
+    parser.add_argument("--p4_scenario", type=str, default="p4_int", help="Lab of the BMv2 and telemetry cases")
+    parser.add_argument(
+        "--model_scenarios", type=str, nargs="*", default=None, help="Scenarios of the model build cases"
+    )
+    parser.add_argument("--repeat", type=int, default=50, help="Calls per case (default: 50)")
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Relative p50 growth flagged as a regression"
+    )
+    parser.add_argument("--save_baseline", action="store_true", help="Store this run as the baseline of its backend")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    record = make_record(
+        args.backend,
+        run_suite(args.backend, args.scenario, args.p4_scenario, args.model_scenarios, args.repeat),
+    )
+    append_history(record)
+    baseline = load_baseline(args.backend)
+    rows = compare(record["results"], baseline or {}, args.threshold)
+    print(format_comparison(rows))
+    print(f"Suite run in {time.perf_counter() - start:.1f}s, history in {PERF_RESULTS_DIR}/history.jsonl")
+    if args.save_baseline or baseline is None:
+        save_baseline(record)
+        print(f"Baseline saved to {baseline_path(args.backend)}")
+    regressions = [row["case"] for row in rows if row["status"] == "regression"]
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        sys.exit(1)
@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from perf_suite import PERF_RESULTS_DIR
+
+from llm4netlab.service.kathara.fake_backend import FakeKatharaManager, install_fake_backend
+
+""" Scaling curve of the generated topologies: model build, deploy, readiness, memory and reachability time of
+increasing sizes, to find where the platform stops scaling """
+
+logger = logging.getLogger("ScalingBenchmark")
+
+# increasing explicit dimensions per scenario, the first ones are the s/m/l presets
+SCALING_SWEEPS = {
+    "dc_clos_bgp": [
+        {"super_spines": 1, "spines_per_pod": 2, "leaves_per_pod": 2},
+        {"super_spines": 2, "spines_per_pod": 4, "leaves_per_pod": 4},
+        {"super_spines": 4, "spines_per_pod": 8, "leaves_per_pod": 8},
+        {"super_spines": 4, "spines_per_pod": 8, "leaves_per_pod": 16},
+        {"super_spines": 8, "spines_per_pod": 8, "leaves_per_pod": 16},
+        {"super_spines": 8, "spines_per_pod": 16, "leaves_per_pod": 32},
+    ],
+    "ospf_enterprise_dhcp": [
+        {"dists_per_core": 1, "access_per_dist": 1, "hosts_per_access": 1},
+        {"dists_per_core": 2, "access_per_dist": 2, "hosts_per_access": 2},
+        {"dists_per_core": 4, "access_per_dist": 4, "hosts_per_access": 4},
+        {"dists_per_core": 8, "access_per_dist": 4, "hosts_per_access": 4},
+        {"dists_per_core": 16, "access_per_dist": 4, "hosts_per_access": 4},
+        {"dists_per_core": 32, "access_per_dist": 4, "hosts_per_access": 4},
+    ],
+    "sdn_clos": [
+        {"spines": 1, "leaves": 4, "hosts_per_leaf": 2},
+        {"spines": 2, "leaves": 8, "hosts_per_leaf": 2},
+        {"spines": 4, "leaves": 16, "hosts_per_leaf": 2},
+        {"spines": 4, "leaves": 32, "hosts_per_leaf": 2},
+        {"spines": 8, "leaves": 48, "hosts_per_leaf": 2},
+        {"spines": 8, "leaves": 64, "hosts_per_leaf": 3},
+    ],
+}
+
+_SIZE_UNITS = {"b": 1, "kb": 1e3, "mb": 1e6, "gb": 1e9, "kib": 2**10, "mib": 2**20, "gib": 2**30}
+
+
+def parse_mem_usage(mem_usage: str) -> float | None:
+    """MiB used by a container, from the "<used> / <limit>" of the Kathara machine stats."""
+    match = re.match(r"\s*([\d.]+)\s*([kmg]?i?b)", mem_usage, re.IGNORECASE)
+    if match is None:
+        return None
+    return float(match.group(1)) * _SIZE_UNITS[match.group(2).lower()] / 2**20
+
+
+def container_memory(instance, lab_name: str) -> list[float]:
+    stats = next(instance.get_machines_stats(lab_name=lab_name))
+    usages = [parse_mem_usage(machine_stats.mem_usage) for machine_stats in stats.values()]
+    return [usage for usage in usages if usage is not None]
+
+
+def wait_ready(api, hosts: list[str], timeout: float, interval: float = 1.0) -> float | None:
+    """Seconds until the first host has an address and reaches all the others, None if not within timeout."""
+    start = time.perf_counter()
+    source, others = hosts[0], hosts[1:]
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        while time.perf_counter() - start < timeout:
+            addresses = list(executor.map(api.get_host_ip, hosts))
+            if all(addresses):
+                pings = executor.map(lambda ip: api._run_cmd(source, f"ping -c 1 -W 1 {ip}"), addresses[1:])
+                if all(" 0% packet loss" in output for output in pings) or not others:
+                    return time.perf_counter() - start
+            time.sleep(interval)
+    return None
+
+
+def run_step(scenario_name: str, dims: dict, ready_timeout: float) -> dict:
+    """Build, deploy and probe one size of a scenario, then undeploy it."""
+    from llm4netlab.net_env.net_env_pool import get_net_env_instance
+    from llm4netlab.service.kathara import KatharaBaseAPI
+
+    row = {"scenario": scenario_name, **{f"dim.{name}": value for name, value in dims.items()}}
+    start = time.perf_counter()
+    net_env = get_net_env_instance(scenario_name, use_cache=False, **dims)
+    row["model_build_s"] = round(time.perf_counter() - start, 3)
+    row["containers"] = len(net_env.lab.machines)
+    row["links"] = len(net_env.lab.links)
+
+    if net_env.lab_exists():
+        net_env.undeploy()
+    start = time.perf_counter()
+    try:
+        net_env.instance.deploy_lab(lab=net_env.lab)
+        row["deploy_s"] = round(time.perf_counter() - start, 3)
+
+        api = KatharaBaseAPI(lab_name=net_env.lab.name)
+        ready = wait_ready(api, net_env.hosts, ready_timeout)
+        row["ready_s"] = round(ready, 3) if ready is not None else None
+
+        memory = container_memory(net_env.instance, net_env.lab.name)
+        row["mem_mean_mib"] = round(sum(memory) / len(memory), 1) if memory else None
+        row["mem_max_mib"] = round(max(memory), 1) if memory else None
+
+        start = time.perf_counter()
+        asyncio.run(api.get_reachability())
+        row["reachability_s"] = round(time.perf_counter() - start, 3)
+    except Exception as e:
+        logger.warning(f"{scenario_name} {dims} failed: {e}")
+        row["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        start = time.perf_counter()
+        net_env.undeploy()
+        row["undeploy_s"] = round(time.perf_counter() - start, 3)
+    return row
+
+
+def run_scaling(
+    scenario_name: str,
+    steps: list[dict] | None = None,
+    backend: str = "fake",
+    ready_timeout: float | None = None,
+    exec_latency: float = 0.0,
+) -> list[dict]:
+    """Deploy increasing sizes of a scenario, one at a time, and stop at the first size that fails or does not get
+    ready, which is where the platform stops scaling.
+
+    On the in-memory backend the DHCP leases are not emulated, ospf_enterprise_dhcp does not get ready there.
+    """
+    if backend == "fake":
+        install_fake_backend(FakeKatharaManager(exec_latency=exec_latency))
+    ready_timeout = ready_timeout if ready_timeout is not None else (300.0 if backend == "kathara" else 5.0)
+
+    rows = []
+    for dims in steps or SCALING_SWEEPS[scenario_name]:
+        row = run_step(scenario_name, dims, ready_timeout)
+        rows.append(row)
+        logger.info(f"{scenario_name} {dims}: {row}")
+        if row.get("error") or row.get("ready_s") is None:
+            break
+    return rows
+
+
+def write_curve(rows: list[dict], scenario_name: str, backend: str, results_dir: str = PERF_RESULTS_DIR) -> str:
+    """Store the curve as scaling_<scenario>_<backend>_<timestamp>.csv and .json, returns the csv path."""
+    os.makedirs(results_dir, exist_ok=True)
+    path = os.path.join(results_dir, f"scaling_{scenario_name}_{backend}_{datetime.now().strftime('%Y%m%d%H%M%S')}")
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    with open(f"{path}.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(f"{path}.json", "w") as f:
+        json.dump(rows, f, indent=4)
+    return f"{path}.csv"
+
+
+def format_curve(rows: list[dict]) -> str:
+    columns = ["containers", "links", "model_build_s", "deploy_s", "ready_s", "mem_mean_mib", "reachability_s"]
+    lines = [f"{'dims':<40} " + " ".join(f"{column:>14}" for column in columns)]
+    for row in rows:
+        dims = ",".join(str(value) for name, value in row.items() if name.startswith("dim."))
+        values = [row.get(column) for column in columns]
+        lines.append(f"{dims:<40} " + " ".join(f"{'-' if value is None else value:>14}" for value in values))
+        if row.get("error"):
+            lines.append(f"  error: {row['error']}")
+    return "\n".join(lines)
+
+
+def _parse_dims(text: str) -> dict:
+    return {name: int(value) for name, value in (item.split("=") for item in text.split(","))}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Scaling curve of a generated topology")
+    parser.add_argument("--scenario", type=str, choices=sorted(SCALING_SWEEPS), default="dc_clos_bgp")
+    parser.add_argument(
+        "--steps",
+        type=str,
+        nargs="*",
+        default=None,
+        help="Dimensions of each size, e.g. super_spines=2,spines_per_pod=4,leaves_per_pod=8 (default: built-in sweep)",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        choices=["fake", "kathara"],
+        default="fake",
+        help="Deploy on the in-memory backend or on Kathara (default: fake)",
+    )
+    parser.add_argument(
+        "--ready_timeout", type=float, default=None, help="Seconds to wait for readiness (default: 300, 5 on fake)"
+    )
+    parser.add_argument("--exec_latency", type=float, default=0.0, help="Seconds added to each exec on fake")
+    args = parser.parse_args()
+
+    steps = [_parse_dims(step) for step in args.steps] if args.steps else None
+    rows = run_scaling(args.scenario, steps, args.backend, args.ready_timeout, args.exec_latency)
+    print(format_curve(rows))
+    print(f"Scaling curve saved to {write_curve(rows, args.scenario, args.backend)}")
@@ -1,10 +1,15 @@
+import argparse
 import logging
 import os
 import random
 
 import polars as pl
+from parallel_runner import run_parallel_benchmark
+from scheduler import run_grouped_benchmark
 
+from llm4netlab.net_env.lab_pool import LabPool
 from llm4netlab.net_env.net_env_pool import get_net_env_instance
+from llm4netlab.utils.timing import format_report, write_timing_report
 from scripts.step1_net_env_start import start_net_env
 from scripts.step2_failure_inject import inject_failure
 from scripts.step3_agent_run import start_agent
@@ -16,18 +21,38 @@ logger = logging.getLogger("BenchmarkRunner")
 logging.basicConfig(level=logging.INFO)
 
 
-def run_benchmark():
-    """Run benchmark tests based on the benchmark.csv file."""
+def run_benchmark(pool_size: int = 0, grouped: bool = False, seed: int = 0, workers: int = 0):
+    """Run benchmark tests based on the benchmark.csv file.
+
+    Args:
+        pool_size: With pool_size > 0, the rows run on instances leased from a LabPool of that many pre-deployed
+            labs per (scenario, topo_size), reset between rows instead of being deployed and undeployed per row.
+        grouped: Run the rows scenario by scenario with one deploy per (scenario, topo_size), see scheduler.
+        seed: Seed of the order of the rows.
+        workers: With workers > 0, the groups of rows run on that many concurrent workers with isolated labs, see
+            parallel_runner. An interrupted parallel sweep resumes from its completed rows.
+    """
     benchmark_file = os.path.join(cur_dir, "benchmark.csv")
     df = pl.read_csv(benchmark_file)
     df = df.filter(pl.col("topo_size").is_in(["-", "s"]))
 
-    for row in (
+    rows = list(
         df.select(["problem", "scenario", "topo_level", "topo_size"])
         .unique()
-        .sample(fraction=1, shuffle=True)
+        .sort(["problem", "scenario", "topo_level", "topo_size"])
+        .sample(fraction=1, shuffle=True, seed=seed)
         .iter_rows(named=True)
-    ):
+    )
+    if workers > 0:
+        run_parallel_benchmark(rows, num_workers=workers, seed=seed)
+        return
+    if grouped:
+        run_grouped_benchmark(rows, seed=seed)
+        logger.info(f"Benchmark timing:\n{format_report(write_timing_report())}")
+        return
+
+    pool = LabPool(size=pool_size) if pool_size > 0 else None
+    for i, row in enumerate(rows):
         problem = row["problem"]
         scenario = row["scenario"]
         topo_level = row["topo_level"]
@@ -39,35 +64,77 @@ def run_benchmark():
         is_scenario_started = False
         is_failure_injected = False
 
+        pooled = None
+        if pool is not None:
+            pooled = pool.lease(scenario, topo_size)
+            # deploy the instances of the next row while this one runs
+            if i + 1 < len(rows):
+                pool.prepare(rows[i + 1]["scenario"], rows[i + 1]["topo_size"])
+        lab_name = pooled.lab_name if pooled is not None else None
+
         # set random seed per problem-scenario to select the consistent failure point
         random.seed(f"{problem}-{scenario}")
 
-        for task_level in ["localization"]:
-            if not is_scenario_started:
-                # Step 1: Start Network Environment
-                start_net_env(scenario, topo_size=topo_size, redeploy=True)
-                is_scenario_started = True
-            else:
-                start_net_env(scenario, topo_size=topo_size, redeploy=False)
+        problem_instance = None
+        try:
+            for task_level in ["localization"]:
+                if not is_scenario_started:
+                    # Step 1: Start Network Environment, a leased lab is already deployed and reset
+                    session_id = start_net_env(
+                        scenario, topo_size=topo_size, redeploy=pooled is None, lab_name=lab_name
+                    )
+                    is_scenario_started = True
+                else:
+                    session_id = start_net_env(scenario, topo_size=topo_size, redeploy=False, lab_name=lab_name)
+
+                if not is_failure_injected:
+                    # Step 2: Inject Failure
+                    problem_instance = inject_failure(
+                        problem_names=[problem], task_level=task_level, session_id=session_id
+                    )
+                    is_failure_injected = True
+                else:
+                    inject_failure(
+                        problem_names=[problem], task_level=task_level, re_inject=False, session_id=session_id
+                    )
 
-            if not is_failure_injected:
-                # Step 2: Inject Failure
-                inject_failure(problem_names=[problem], task_level=task_level)
-                is_failure_injected = True
-            else:
-                inject_failure(problem_names=[problem], task_level=task_level, re_inject=False)
+                # Step 3: Start Agent
+                start_agent(agent_type="react", backend_model="gpt-oss:20b", max_steps=20, session_id=session_id)
 
-            # Step 3: Start Agent
-            start_agent(agent_type="react", backend_model="gpt-oss:20b", max_steps=20)
+                # Step 4: Evaluate Results
+                eval(judge_model="qwen3:32b", destroy_env=False, session_id=session_id)
+        finally:
+            if pooled is not None:
+                # the lab is reset in the background and goes back to the pool
+                pool.release(pooled, problem_instance)
 
-            # Step 4: Evaluate Results
-            eval(judge_model="qwen3:32b", destroy_env=False)
+        if pooled is None:
+            # Finally, destroy the network environment if it was started
+            net_env = get_net_env_instance(scenario, topo_size=topo_size)
+            if net_env.lab_exists():
+                net_env.undeploy()
 
-        # Finally, destroy the network environment if it was started
-        net_env = get_net_env_instance(scenario, topo_size=topo_size)
-        if net_env.lab_exists():
-            net_env.undeploy()
+    if pool is not None:
+        pool.shutdown()
+    logger.info(f"Benchmark timing:\n{format_report(write_timing_report())}")
 
 
 if __name__ == "__main__":
-    run_benchmark()
+    parser = argparse.ArgumentParser(description="Run the benchmark")
+    parser.add_argument(
+        "--pool_size",
+        type=int,
+        default=0,
+        help="Pre-deployed labs per (scenario, topo_size) to lease the rows from, 0 to deploy per row (default: 0)",
+    )
+    parser.add_argument(
+        "--grouped",
+        action="store_true",
+        help="Deploy each (scenario, topo_size) once and recover the faults between its rows",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the order of the rows (default: 0)")
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Concurrent workers on isolated labs, 0 to run sequentially (default: 0)"
+    )
+    args = parser.parse_args()
+    run_benchmark(pool_size=args.pool_size, grouped=args.grouped, seed=args.seed, workers=args.workers)
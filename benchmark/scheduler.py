@@ -0,0 +1,138 @@
+import logging
+import random
+import time
+from collections import Counter, defaultdict
+from typing import Callable
+
+from llm4netlab.net_env.base import NetworkEnvBase
+from llm4netlab.net_env.checkpoint import LabCheckpoint, reset_lab
+from llm4netlab.net_env.net_env_pool import get_net_env_instance
+from scripts.step1_net_env_start import start_net_env
+from scripts.step2_failure_inject import inject_failure
+from scripts.step3_agent_run import start_agent
+from scripts.step4_result_eval import eval
+
+""" Benchmark scheduling by scenario: one deploy per (scenario, topo_size), faults recovered between the rows """
+
+logger = logging.getLogger("BenchmarkScheduler")
+
+
+def group_rows(rows: list[dict], seed: int) -> list[tuple[tuple[str, str], list[dict]]]:
+    """Group the benchmark rows by (scenario, topo_size), in a random order seeded for reproducibility.
+
+    Both the groups and the rows within a group are shuffled, from the sorted rows so that the order does not
+    depend on how they were read.
+    """
+    rng = random.Random(seed)
+    groups = defaultdict(list)
+    for row in sorted(rows, key=lambda row: tuple(str(value) for value in row.values())):
+        groups[(row["scenario"], row["topo_size"])].append(row)
+    keys = sorted(groups)
+    rng.shuffle(keys)
+    for key in keys:
+        rng.shuffle(groups[key])
+    return [(key, groups[key]) for key in keys]
+
+
+def verify_or_redeploy(net_env: NetworkEnvBase, topo_size: str, verify_timeout: float = 60.0) -> str:
+    """Health check of a lab after recover_fault, against the checkpoint captured after its deploy.
+
+    Returns:
+        "clean" if the lab is back to its checkpoint, "restored" if the differences had to be restored from it,
+        "redeployed" if the restore did not verify either, or there was no checkpoint.
+    """
+    checkpoint = LabCheckpoint.load(net_env.lab.name)
+    if checkpoint is not None and checkpoint.matches(net_env, topo_size):
+        differences = checkpoint.verify(net_env, timeout=verify_timeout)
+        if not differences:
+            return "clean"
+        logger.warning(f"Lab {net_env.lab.name} differs from its checkpoint after recovery: {differences}")
+        if reset_lab(net_env, topo_size, verify_timeout):
+            return "restored"
+    net_env.undeploy()
+    net_env.deploy()
+    LabCheckpoint.capture(net_env, topo_size).save()
+    return "redeployed"
+
+
+def run_grouped_benchmark(
+    rows: list[dict],
+    seed: int = 0,
+    task_levels: tuple[str, ...] = ("localization",),
+    agent_type: str = "react",
+    backend_model: str = "gpt-oss:20b",
+    max_steps: int = 20,
+    judge_model: str = "qwen3:32b",
+    verify_timeout: float = 60.0,
+    lab_suffix: str = "",
+    on_row_done: Callable[[dict], None] | None = None,
+) -> Counter:
+    """Run the rows scenario by scenario: each (scenario, topo_size) is deployed once, then every row cycles
+    inject -> agent -> evaluate -> recover_fault -> health check, and the lab is redeployed only when the
+    health check fails.
+
+    Args:
+        lab_suffix: Appended to the lab names, so that concurrent runners deploy distinct labs.
+        on_row_done: Called with each row once it is evaluated and its faults are recovered.
+
+    Returns:
+        The number of deploys, clean recoveries, checkpoint restores and redeploys.
+    """
+    counts = Counter()
+    for (scenario, topo_size), group in group_rows(rows, seed):
+        lab_name = f"{scenario}{lab_suffix}" if lab_suffix else None
+        net_env = get_net_env_instance(scenario, topo_size=topo_size, lab_name=lab_name)
+        deployed = False
+
+        for row in group:
+            problem_name = row["problem"]
+            logger.info(
+                f"Running benchmark: Problem={problem_name}, Scenario={scenario}, "
+                f"Topo Level={row['topo_level']}, Topo Size={topo_size}"
+            )
+            # set random seed per problem-scenario to select the consistent failure point
+            random.seed(f"{problem_name}-{scenario}")
+
+            problem = None
+            for i, task_level in enumerate(task_levels):
+                # new session, the first one of the group deploys the lab
+                start = time.perf_counter()
+                # the checkpoint of the first deploy is the reference of the health checks of the group
+                session_id = start_net_env(
+                    scenario, topo_size=topo_size, redeploy=not deployed, use_checkpoint=True, lab_name=lab_name
+                )
+                if not deployed:
+                    deployed = True
+                    counts["deploys"] += 1
+                    logger.info(
+                        f"Deployed {scenario} (topo size {topo_size}) for {len(group)} rows "
+                        f"in {time.perf_counter() - start:.1f}s"
+                    )
+                if i == 0:
+                    problem = inject_failure(problem_names=[problem_name], task_level=task_level, session_id=session_id)
+                else:
+                    inject_failure(
+                        problem_names=[problem_name], task_level=task_level, re_inject=False, session_id=session_id
+                    )
+                start_agent(
+                    agent_type=agent_type, backend_model=backend_model, max_steps=max_steps, session_id=session_id
+                )
+                eval(judge_model=judge_model, destroy_env=False, session_id=session_id)
+
+            start = time.perf_counter()
+            if problem is not None:
+                try:
+                    problem.recover_fault()
+                except Exception as e:
+                    logger.warning(f"Failed to recover {problem_name} on {scenario}: {e}")
+            outcome = verify_or_redeploy(net_env, topo_size, verify_timeout)
+            counts[outcome] += 1
+            logger.info(f"Lab {net_env.lab.name} {outcome} after {problem_name} in {time.perf_counter() - start:.1f}s")
+            if on_row_done is not None:
+                on_row_done(row)
+
+        if net_env.lab_exists():
+            net_env.undeploy()
+
+    logger.info(f"Grouped benchmark done: {dict(counts)}")
+    return counts
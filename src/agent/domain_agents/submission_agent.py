@@ -13,6 +13,7 @@ from agent.utils.loggers import FileLoggerHandler
 from agent.utils.mcp_servers import MCPServerConfig
 from llm4netlab.config import RESULTS_DIR
 from llm4netlab.utils.session import SessionKey
+from llm4netlab.utils.timing import span, timed
 
 load_dotenv()
 
@@ -26,18 +27,23 @@ SUBMIT_PROMPT_TEMPLATE = dedent("""\
 
 
 class SubmissionAgent:
-    def __init__(self, backend_model: str = "gpt-oss:20b"):
-        mcp_server_config = MCPServerConfig().load_config(if_submit=True)
+    def __init__(self, backend_model: str = "gpt-oss:20b", session_id: str | None = None):
+        self.session_id = session_id
+        mcp_server_config = MCPServerConfig(session_id).load_config(if_submit=True)
         self.client = MultiServerMCPClient(connections=mcp_server_config)
         self.tools = None
 
         self.llm = load_model(backend_model=backend_model)
 
     async def load_tools(self):
-        self.tools: list[StructuredTool] = await self.client.get_tools()
+        # get_tools starts each MCP server to list its tools
+        with span("agent.load_tools", self.session_id, agent="submission"):
+            self.tools: list[StructuredTool] = await self.client.get_tools()
         for tool in self.tools:
             tool.handle_tool_error = True
             tool.handle_validation_error = True
+            # the MCP tools are async, a call runs a new session with the server
+            tool.coroutine = timed(f"tool.{tool.name}", self.session_id)(tool.coroutine)
 
     def get_agent(self):
         """Final submission node"""
@@ -29,14 +29,15 @@ class AgentState(TypedDict):
 
 
 class BasicReActAgent:
-    def __init__(self, backend_model, max_steps: int = 20):
+    def __init__(self, backend_model, max_steps: int = 20, session_id: str | None = None):
         self.max_steps = max_steps
+        self.session_id = session_id
         # load agent and tools
-        diagnosis_agent = DiagnosisAgent(backend_model=backend_model)
+        diagnosis_agent = DiagnosisAgent(backend_model=backend_model, session_id=session_id)
         asyncio.run(diagnosis_agent.load_tools())
         self.diagnosis_agent = diagnosis_agent.get_agent()
 
-        submission_agent = SubmissionAgent(backend_model=backend_model)
+        submission_agent = SubmissionAgent(backend_model=backend_model, session_id=session_id)
         asyncio.run(submission_agent.load_tools())
         self.submission_agent = submission_agent.get_agent()
 
@@ -57,7 +58,7 @@ class BasicReActAgent:
             result = await self.graph.ainvoke(
                 {"messages": [HumanMessage(content=task_description)]},
                 config={
-                    "callbacks": [FileLoggerHandler()],
+                    "callbacks": [FileLoggerHandler(session_id=self.session_id)],
                     "recursion_limit": self.max_steps,
                 },
             )
@@ -73,7 +74,7 @@ class BasicReActAgent:
             diagnosis_result = await self.diagnosis_agent.ainvoke(
                 {"messages": state["messages"]},
                 config={
-                    "callbacks": [FileLoggerHandler()],
+                    "callbacks": [FileLoggerHandler(session_id=self.session_id)],
                     "recursion_limit": self.max_steps,
                 },
                 debug=True,
@@ -91,7 +92,7 @@ class BasicReActAgent:
                 ]
             },
             config={
-                "callbacks": [FileLoggerHandler()],
+                "callbacks": [FileLoggerHandler(session_id=self.session_id)],
                 "recursion_limit": self.max_steps,
             },
             debug=True,
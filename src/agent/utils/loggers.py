@@ -7,32 +7,33 @@ from datetime import datetime
 from langchain_core.callbacks.base import BaseCallbackHandler
 from langchain_core.outputs.generation import Generation
 
-from llm4netlab.config import BASE_DIR
+from llm4netlab.config import RESULTS_DIR
+from llm4netlab.utils.session import Session
 
 
 class FileLoggerHandler(BaseCallbackHandler):
-    def __init__(self, log_path: str = None):
+    def __init__(self, log_path: str = None, session_id: str | None = None):
         super().__init__()
-        self.logger = logging.getLogger(__name__)
+        if log_path is None:
+            # read session info from the session store
+            session = Session(session_id)
+            session.load_running_session()
+            log_path = os.path.join(
+                RESULTS_DIR,
+                session.root_cause_name,
+                session.task_level,
+                session.session_id,
+                "conversation.log",
+            )
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+
+        # one logger per log file, so that the sessions of a process do not write into each other's logs
+        self.logger = logging.getLogger(f"{__name__}.{log_path}")
         self.logger.setLevel(logging.INFO)
 
         for h in list(self.logger.handlers):
             self.logger.removeHandler(h)
 
-        # read session info from file
-        with open(f"{BASE_DIR}/runtime/current_session.json", "r") as f:
-            session_info = json.load(f)
-
-        log_path = os.path.join(
-            BASE_DIR,
-            "results",
-            session_info["root_cause_name"],
-            session_info["task_level"],
-            session_info["session_id"],
-            "conversation.log",
-        )
-        os.makedirs(os.path.dirname(log_path), exist_ok=True)
-
         # new loggers
         file_handler = logging.FileHandler(log_path, encoding="utf-8", mode="a")
         formatter = logging.Formatter("%(message)s")
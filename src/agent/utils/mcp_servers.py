@@ -4,11 +4,11 @@ from llm4netlab.utils.session import Session
 
 
 class MCPServerConfig:
-    def __init__(self):
+    def __init__(self, session_id: str | None = None):
         # load paths
         base_dir = os.getenv("BASE_DIR")
         self.mcp_server_dir = os.path.join(base_dir, "src/llm4netlab/service/mcp_server")
-        self.session = Session()
+        self.session = Session(session_id)
         self.session.load_running_session()
 
     def load_config(self, if_submit: bool = False) -> dict:
@@ -50,8 +50,12 @@ class MCPServerConfig:
                 "LAB_SESSION_ID": self.session.session_id,
                 "ROOT_CAUSE_NAME": self.session.root_cause_name,
                 "TASK_LEVEL": self.session.task_level,
-                "LAB_NAME": self.session.scenario_name,
+                "LAB_NAME": getattr(self.session, "lab_name", self.session.scenario_name),
                 "backend_model": self.session.backend_model,
                 "agent_type": self.session.agent_type,
             }
+            # the submission servers write to the results of the session, which can be per worker
+            for key in ("BASE_DIR", "RESULTS_DIR"):
+                if os.getenv(key):
+                    server["env"][key] = os.getenv(key)
         return config
@@ -1,7 +1,10 @@
 import os
+
 from dotenv import load_dotenv
 
 load_dotenv()
 
 BASE_DIR = os.getenv("BASE_DIR")
-RESULTS_DIR = os.getenv("RESULTS_DIR")
\ No newline at end of file
+RESULTS_DIR = os.getenv("RESULTS_DIR")
+# where the running session is kept, set per worker by the parallel benchmark runner
+SESSION_DIR = os.getenv("SESSION_DIR") or (os.path.join(BASE_DIR, "runtime") if BASE_DIR else None)
@@ -0,0 +1,208 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+
+""" Fault plans: inject several faults concurrently, with dependencies, deadlines and rollback """
+
+logger = logging.getLogger(__name__)
+
+
+class FaultPlanError(RuntimeError):
+    """Raised when a step of a fault plan fails, after the plan was rolled back."""
+
+
+@dataclass
+class FaultStep:
+    name: str
+    inject: Callable[[], object]
+    undo: Callable[[], object] | None = None
+    # names of the steps that must be injected before this one
+    depends_on: tuple[str, ...] = ()
+    # seconds, None for no deadline
+    deadline: float | None = None
+
+
+@dataclass
+class UndoRecord:
+    step: FaultStep
+    # the step failed or timed out, so its fault may be only partially applied
+    partial: bool = False
+    injected_at: float = field(default_factory=time.time)
+
+
+class FaultPlan:
+    """DAG of fault injection steps.
+
+    Steps run as soon as their dependencies are injected, at most max_concurrency at a time. Every step that
+    was started is recorded in the undo log. If a step fails or misses its deadline, no further step is started
+    and the plan is rolled back. recover() replays the undo log in reverse: the undo of a step runs once the
+    undos of all the steps depending on it are done, so independent steps are undone in parallel.
+    """
+
+    def __init__(self, max_concurrency: int = 8, default_deadline: float | None = None, rollback_grace: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.default_deadline = default_deadline
+        self.rollback_grace = rollback_grace
+        self.steps: dict[str, FaultStep] = {}
+        self.undo_log: list[UndoRecord] = []
+        # {step name: seconds}, of the last inject() and recover()
+        self.inject_times: dict[str, float] = {}
+        self.recover_times: dict[str, float] = {}
+
+    def add_step(
+        self,
+        name: str,
+        inject: Callable[[], object],
+        undo: Callable[[], object] | None = None,
+        depends_on: list[str] | tuple[str, ...] = (),
+        deadline: float | None = None,
+    ) -> "FaultPlan":
+        if name in self.steps:
+            raise ValueError(f"Step {name} already in the fault plan.")
+        self.steps[name] = FaultStep(
+            name, inject, undo, tuple(depends_on), deadline if deadline is not None else self.default_deadline
+        )
+        return self
+
+    def _check(self):
+        """Reject unknown dependencies and cycles."""
+        for step in self.steps.values():
+            for dep in step.depends_on:
+                if dep not in self.steps:
+                    raise ValueError(f"Step {step.name} depends on unknown step {dep}.")
+        visited, visiting = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Fault plan has a dependency cycle through {name}.")
+            visiting.add(name)
+            for dep in self.steps[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.steps:
+            visit(name)
+
+    def _timed(self, fn: Callable[[], object], times: dict[str, float], name: str):
+        start = time.perf_counter()
+        try:
+            return fn()
+        finally:
+            times[name] = time.perf_counter() - start
+
+    def inject(self):
+        """Inject all the steps, rolling back what was injected if one of them fails."""
+        self._check()
+        self.inject_times = {}
+        pending = dict(self.steps)
+        # {future: (step, deadline timestamp)}
+        running: dict[Future, tuple[FaultStep, float | None]] = {}
+        done = set()
+        failure = None
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="fault_plan")
+        try:
+            while (pending or running) and failure is None:
+                for step in list(pending.values()):
+                    if len(running) >= self.max_concurrency:
+                        break
+                    if all(dep in done for dep in step.depends_on):
+                        del pending[step.name]
+                        deadline_at = time.monotonic() + step.deadline if step.deadline is not None else None
+                        running[executor.submit(self._timed, step.inject, self.inject_times, step.name)] = (
+                            step,
+                            deadline_at,
+                        )
+
+                deadlines = [deadline_at for _, deadline_at in running.values() if deadline_at is not None]
+                timeout = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+                finished, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    step, _ = running.pop(future)
+                    exc = future.exception()
+                    self.undo_log.append(UndoRecord(step, partial=exc is not None))
+                    if exc is not None:
+                        failure = failure or (step, exc)
+                    else:
+                        done.add(step.name)
+                        logger.info(f"Fault plan step {step.name} injected in {self.inject_times[step.name]:.2f}s")
+
+                now = time.monotonic()
+                for future, (step, deadline_at) in list(running.items()):
+                    if failure is None and deadline_at is not None and now >= deadline_at:
+                        failure = (step, TimeoutError(f"missed its deadline of {step.deadline}s"))
+
+            if failure is not None:
+                # let the steps already started settle before undoing them
+                finished, still_running = wait(running, timeout=self.rollback_grace)
+                for future, (step, _) in running.items():
+                    self.undo_log.append(
+                        UndoRecord(step, partial=future not in finished or future.exception() is not None)
+                    )
+                if still_running:
+                    logger.warning(f"Rolling back with {len(still_running)} fault plan steps still running.")
+        finally:
+            executor.shutdown(wait=False)
+
+        if failure is not None:
+            step, exc = failure
+            logger.error(f"Fault plan step {step.name} failed: {exc}, rolling back")
+            self.recover()
+            raise FaultPlanError(f"Fault plan step {step.name} failed: {exc}") from exc
+
+    def recover(self, all_steps: bool = False):
+        """Undo the injected steps in reverse dependency order, in parallel where no dependency forbids it.
+
+        Args:
+            all_steps: undo every step of the plan, also when nothing was injected by this plan object,
+                e.g. to clean up a lab after a crash.
+        """
+        records = {record.step.name: record for record in self.undo_log}
+        if all_steps:
+            records = {name: records.get(name, UndoRecord(step, partial=True)) for name, step in self.steps.items()}
+        records = {name: record for name, record in records.items() if record.step.undo is not None}
+        self.recover_times = {}
+
+        # a step can be undone once the steps depending on it are undone
+        dependents = {name: set() for name in records}
+        for name, record in records.items():
+            for dep in record.step.depends_on:
+                if dep in dependents:
+                    dependents[dep].add(name)
+
+        pending = dict(records)
+        running: dict[Future, UndoRecord] = {}
+        undone = set()
+        errors = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="fault_plan") as executor:
+            while pending or running:
+                for name, record in list(pending.items()):
+                    if len(running) >= self.max_concurrency:
+                        break
+                    if dependents[name] <= undone:
+                        del pending[name]
+                        running[executor.submit(self._timed, record.step.undo, self.recover_times, name)] = record
+                if not running:
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record = running.pop(future)
+                    # undone even on failure, so that the steps it depends on are still undone
+                    undone.add(record.step.name)
+                    exc = future.exception()
+                    if exc is None:
+                        continue
+                    if record.partial:
+                        logger.warning(f"Undo of partially injected step {record.step.name} failed: {exc}")
+                    else:
+                        errors[record.step.name] = exc
+
+        self.undo_log = []
+        if errors:
+            raise FaultPlanError(f"Failed to undo {', '.join(f'{n} ({e})' for n, e in errors.items())}")
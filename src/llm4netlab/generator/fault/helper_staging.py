@@ -0,0 +1,81 @@
+import hashlib
+import io
+import os
+import tarfile
+import threading
+
+from llm4netlab.config import BASE_DIR
+from llm4netlab.service.kathara.container_index import LabContainerIndex
+
+""" Copy fault helper scripts and binaries into containers once, keyed by content hash """
+
+HELPERS_DIR = os.path.join(BASE_DIR, "src/llm4netlab/generator/fault/utils")
+REMOTE_HELPERS_DIR = "/opt/llm4netlab/helpers"
+
+# {(helper file, mtime): _Helper}, shared by all labs
+_loaded_helpers: dict[tuple[str, float], "_Helper"] = {}
+
+
+class _Helper:
+    __slots__ = ("name", "digest", "remote_path", "archive")
+
+    def __init__(self, name: str, content: bytes):
+        self.name = name
+        self.digest = hashlib.sha256(content).hexdigest()[:16]
+        # e.g. /opt/llm4netlab/helpers/<digest>/link_flap.sh, a changed helper gets a new path
+        self.remote_path = f"{REMOTE_HELPERS_DIR}/{self.digest}/{name}"
+        self.archive = self._build_archive(content)
+
+    def _build_archive(self, content: bytes) -> bytes:
+        """Tar to extract at /, with the parent directories so that they are created on the way."""
+        buf = io.BytesIO()
+        with tarfile.open(fileobj=buf, mode="w") as tar:
+            parts = self.remote_path.strip("/").split("/")
+            for depth in range(1, len(parts)):
+                info = tarfile.TarInfo("/".join(parts[:depth]))
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                tar.addfile(info)
+            info = tarfile.TarInfo("/".join(parts))
+            info.size = len(content)
+            info.mode = 0o755
+            tar.addfile(info, io.BytesIO(content))
+        return buf.getvalue()
+
+
+class HelperStager:
+    """Stage helpers from generator/fault/utils into the containers of a lab.
+
+    A helper is uploaded with a single `put_archive` the first time a machine needs it, and then only looked up
+    by its content hash, so repeated injections do not copy it again.
+    """
+
+    def __init__(self, lab):
+        self.containers = LabContainerIndex.for_lab(lab)
+        # {(machine name, container id, digest)} already present in the containers
+        self._staged = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def load_helper(helper_name: str) -> _Helper:
+        path = os.path.join(HELPERS_DIR, helper_name)
+        key = (path, os.path.getmtime(path))
+        if key not in _loaded_helpers:
+            with open(path, "rb") as f:
+                _loaded_helpers[key] = _Helper(helper_name, f.read())
+        return _loaded_helpers[key]
+
+    def stage(self, host_name: str, helper_name: str) -> str:
+        """Make sure the helper is in the container of host_name, return its path in the container."""
+        helper = self.load_helper(helper_name)
+        container = self.containers.get(host_name)
+        key = (host_name, container.id, helper.digest)
+        if key in self._staged:
+            return helper.remote_path
+
+        present = container.exec_run(["test", "-x", helper.remote_path]).exit_code == 0
+        if not present and not container.put_archive("/", helper.archive):
+            raise RuntimeError(f"Failed to copy {helper_name} into {host_name}.")
+        with self._lock:
+            self._staged.add(key)
+        return helper.remote_path
@@ -0,0 +1,95 @@
+import random
+from dataclasses import dataclass, field
+
+from llm4netlab.service.kathara.tc_api import netem_options
+
+""" Time-varying link impairments, run in the containers by the netem_schedule.sh helper """
+
+NETEM_SCHEDULE_HELPER = "netem_schedule.sh"
+NETEM_SCHEDULE_FIFO = "/tmp/netem_schedule.fifo"
+
+
+@dataclass
+class ImpairmentStep:
+    # seconds from the start of the timeline
+    t: float
+    loss: float | None = None
+    delay_ms: int | None = None
+    jitter_ms: int | None = None
+    # e.g. "10mbit"
+    rate: str | None = None
+
+    def options(self) -> str:
+        return netem_options(loss=self.loss, delay_ms=self.delay_ms, jitter_ms=self.jitter_ms, rate=self.rate)
+
+
+@dataclass
+class ImpairmentSchedule:
+    """Timeline of netem impairments of an interface.
+
+    Each step replaces the netem qdisc of the interface at its offset, a step without any impairment leaves a
+    pass-through netem. With repeat set, the timeline starts over every `repeat` seconds.
+    """
+
+    steps: list[ImpairmentStep] = field(default_factory=list)
+    repeat: float | None = None
+
+    @classmethod
+    def from_tuples(
+        cls, steps: list[tuple[float, float | None, int | None, int | None, str | None]], repeat: float | None = None
+    ) -> "ImpairmentSchedule":
+        """Build a schedule from (t, loss, delay_ms, jitter_ms, rate) tuples."""
+        return cls([ImpairmentStep(*step) for step in steps], repeat)
+
+    @classmethod
+    def gilbert_elliott(
+        cls,
+        duration: float,
+        p_good_bad: float,
+        p_bad_good: float,
+        loss_good: float = 0,
+        loss_bad: float = 100,
+        slot: float = 0.1,
+        seed: int | None = None,
+        **impairments,
+    ) -> "ImpairmentSchedule":
+        """Bursts of loss following a two-state Gilbert-Elliott chain sampled every `slot` seconds.
+
+        Args:
+            p_good_bad: probability to enter the bad state at each slot, 1/p_good_bad is the mean good period.
+            p_bad_good: probability to leave the bad state at each slot, 1/p_bad_good is the mean burst length.
+            impairments: delay_ms, jitter_ms and rate applied in both states.
+        """
+        rng = random.Random(seed)
+        steps = []
+        bad = None
+        for i in range(int(duration / slot)):
+            if bad is None:
+                state = rng.random() < p_good_bad / (p_good_bad + p_bad_good)
+            else:
+                state = (rng.random() >= p_bad_good) if bad else (rng.random() < p_good_bad)
+            # only the state changes become steps
+            if state != bad:
+                steps.append(ImpairmentStep(round(i * slot, 3), loss=loss_bad if state else loss_good, **impairments))
+                bad = state
+        if bad:
+            # end the last burst with the timeline
+            steps.append(ImpairmentStep(round(int(duration / slot) * slot, 3), loss=loss_good, **impairments))
+        return cls(steps)
+
+    def commands(self, intf_name: str) -> list[str]:
+        """Control commands of the netem_schedule.sh helper running this schedule on intf_name."""
+        commands = [
+            f"step {intf_name} {round(step.t * 1000)} {step.options()}".rstrip()
+            for step in sorted(self.steps, key=lambda step: step.t)
+        ]
+        commands.append(f"start {intf_name} {round(self.repeat * 1000) if self.repeat else 0}")
+        return commands
+
+
+if __name__ == "__main__":
+    schedule = ImpairmentSchedule.from_tuples(
+        [(0, 5, 20, 5, None), (2, 30, 100, 20, None), (4, None, None, None, "1mbit")], repeat=6
+    )
+    print("\n".join(schedule.commands("eth0")))
+    print("\n".join(ImpairmentSchedule.gilbert_elliott(5, p_good_bad=0.1, p_bad_good=0.5, seed=0).commands("eth1")))
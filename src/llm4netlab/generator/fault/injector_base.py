@@ -1,10 +1,9 @@
 import logging
 import os
 
-import docker
-
-from llm4netlab.config import BASE_DIR
+from llm4netlab.generator.fault.helper_staging import HelperStager
 from llm4netlab.service.kathara import KatharaAPIALL
+from llm4netlab.service.kathara.container_index import LabContainerIndex
 
 """ Fault injector for Kathara """
 
@@ -13,6 +12,22 @@ class FaultInjectorBase:
     def __init__(self, lab_name: str):
         self.kathara_api = KatharaAPIALL(lab_name)
         self.logger = logging.getLogger(__name__)
+        self._containers = None
+        self._helpers = None
+
+    @property
+    def containers(self) -> LabContainerIndex:
+        """Docker containers of the lab, indexed by machine name."""
+        if self._containers is None:
+            self._containers = LabContainerIndex.for_lab(self.kathara_api.lab)
+        return self._containers
+
+    @property
+    def helpers(self) -> HelperStager:
+        """Stager of the helper scripts in generator/fault/utils."""
+        if self._helpers is None:
+            self._helpers = HelperStager(self.kathara_api.lab)
+        return self._helpers
 
     def inject_intf_down(self, host_name: str, intf_name: str):
         """Bring down a specific interface of a host."""
@@ -24,37 +39,54 @@ class FaultInjectorBase:
         self.kathara_api.intf_on_off(host_name=host_name, interface=intf_name, state="up")
         self.logger.info(f"Recovered interface down on {host_name}:{intf_name}")
 
-    def inject_link_flap(self, host_name: str, intf_name: str, down_time: int = 1, up_time: int = 1):
-        """Inject link flap on a specific interface of a host."""
-        with open(os.path.join(BASE_DIR, "src/llm4netlab/generator/fault/utils/link_flap.sh"), "r") as f:
-            script = f.read()
-        write_cmd = f"cat <<'EOF' > /tmp/link_flap.sh\n{script}\nEOF\nchmod +x /tmp/link_flap.sh"
-        self.kathara_api.exec_cmd(host_name, write_cmd)
+    def _start_helper(self, host_name: str, helper_name: str, instances: dict[str, str], restart: bool = True):
+        """Start one background instance of a staged helper per key, with a single exec.
 
-        # kill the previous link flap process if any
-        self.kathara_api.exec_cmd(
-            host_name, "if [ -f /tmp/link_flap.pid ]; then kill $(cat /tmp/link_flap.pid) 2>/dev/null; fi"
-        )
+        Args:
+            instances: {key: arguments}, e.g. {"eth0": "eth0 1 1"}. Its pid and log go to /tmp/<helper>_<key>.pid
+                and /tmp/<helper>_<key>.log.
+            restart: stop a running instance with the same key first, otherwise keep it running.
+        """
+        remote_path = self.helpers.stage(host_name, helper_name)
+        prefix = f"/tmp/{os.path.splitext(helper_name)[0]}"
+        if restart:
+            cmd = "".join(
+                f"if [ -f {prefix}_{key}.pid ]; then kill $(cat {prefix}_{key}.pid) 2>/dev/null; fi; "
+                f"nohup {remote_path} {args} > {prefix}_{key}.log 2>&1 & echo $! > {prefix}_{key}.pid; "
+                for key, args in instances.items()
+            )
+        else:
+            cmd = "".join(
+                f"if ! kill -0 $(cat {prefix}_{key}.pid 2>/dev/null) 2>/dev/null; then "
+                f"nohup {remote_path} {args} > {prefix}_{key}.log 2>&1 & echo $! > {prefix}_{key}.pid; fi; "
+                for key, args in instances.items()
+            )
+        self.kathara_api.exec_cmd(host_name, cmd)
+
+    def _stop_helper(self, host_name: str, helper_name: str, instances: dict[str, str]):
+        """Stop the background instances of a helper with a single exec.
 
-        # start the link flap script
-        start_cmd = (
-            f"nohup /tmp/link_flap.sh {intf_name} {down_time} {up_time} "
-            f"> /tmp/link_flap_{intf_name}.log 2>&1 & echo $! > /tmp/link_flap.pid"
+        Args:
+            instances: {key: command to run once the instance is stopped}, e.g. to restore an interface.
+        """
+        prefix = f"/tmp/{os.path.splitext(helper_name)[0]}"
+        cmd = "".join(
+            f"if [ -f {prefix}_{key}.pid ]; then kill $(cat {prefix}_{key}.pid) 2>/dev/null; "
+            f"rm -f {prefix}_{key}.pid; fi; {after}; "
+            for key, after in instances.items()
         )
-        self.kathara_api.exec_cmd(host_name, start_cmd)
+        self.kathara_api.exec_cmd(host_name, cmd)
 
+    def inject_link_flap(self, host_name: str, intf_name: str | list[str], down_time: int = 1, up_time: int = 1):
+        """Inject link flap on one or several interfaces of a host."""
+        intf_names = [intf_name] if isinstance(intf_name, str) else intf_name
+        self._start_helper(host_name, "link_flap.sh", {intf: f"{intf} {down_time} {up_time}" for intf in intf_names})
         self.logger.info(f"Injected link flap on {host_name}:{intf_name} (down_time={down_time}, up_time={up_time})")
 
-    def recover_link_flap(self, host_name: str, intf_name: str):
+    def recover_link_flap(self, host_name: str, intf_name: str | list[str]):
         # kill process & restore interface
-        stop_cmd = (
-            "if [ -f /tmp/link_flap.pid ]; then "
-            "  kill $(cat /tmp/link_flap.pid) 2>/dev/null || true; "
-            "  rm -f /tmp/link_flap.pid; "
-            f"  ip link set {intf_name} up; "
-            "fi"
-        )
-        self.kathara_api.exec_cmd(host_name, stop_cmd)
+        intf_names = [intf_name] if isinstance(intf_name, str) else intf_name
+        self._stop_helper(host_name, "link_flap.sh", {intf: f"ip link set {intf} up" for intf in intf_names})
         self.logger.info(f"Stopped link flap on {host_name}:{intf_name}")
 
     def inject_link_detach(self, host_name: str, intf_name: str):
@@ -73,18 +105,14 @@ class FaultInjectorBase:
         )
         self.logger.info(f"Recovered link detach on {host_name}:{intf_name}")
 
-    def inject_host_down(self, host_name: str):
-        """Inject a fault by stopping a host."""
-        docker_client = docker.from_env()
-        container_name = docker_client.containers.list(filters={"name": f"{host_name}"})[0]
-        container_name.pause()
+    def inject_host_down(self, host_name: str | list[str]):
+        """Inject a fault by pausing a host, or several hosts in parallel."""
+        self.containers.pause(host_name)
         self.logger.info(f"Injected host down fault on {host_name}.")
 
-    def recover_host_down(self, host_name: str):
-        """Recover from a fault by starting a host."""
-        docker_client = docker.from_env()
-        container_name = docker_client.containers.list(filters={"name": f"{host_name}"})[0]
-        container_name.unpause()
+    def recover_host_down(self, host_name: str | list[str]):
+        """Recover from a fault by unpausing a host, or several hosts in parallel."""
+        self.containers.unpause(host_name)
         self.logger.info(f"Recovered host down fault on {host_name}.")
 
     def inject_fragmentation_disabled(self, host_name: str, mtu: int = 100):
@@ -0,0 +1,150 @@
+import threading
+
+from docker.models.containers import Container
+from docker.utils import parse_bytes
+
+from llm4netlab.generator.fault.injector_base import FaultInjectorBase
+
+""" Fault injector for resource contention, through the cgroup limits of the containers """
+
+CPU_PERIOD_US = 100_000
+# default cgroup blkio weight, restored when the container had none
+DEFAULT_BLKIO_WEIGHT = 500
+
+# {container id: {HostConfig field: value before the injection}}, of the changed fields only,
+# shared by all the injectors of the process
+_saved_resources: dict[str, dict] = {}
+# (container id, interface) rate limited by the injector
+_rate_limited: set[tuple[str, str]] = set()
+_saved_resources_lock = threading.Lock()
+
+
+class FaultInjectorResource(FaultInjectorBase):
+    """Starve containers of CPU, memory, block I/O or bandwidth by lowering their limits with a live Docker update.
+
+    Unlike the stress-ng based faults of FaultInjectorHost, nothing runs on the host: the contention is the same
+    on a loaded or an idle benchmark machine, it does not slow down the other containers, and the previous limits
+    are restored with a single recover call.
+
+    The update API cannot remove a memory limit (it ignores Memory=0 and rejects -1): a container that had none
+    is left with a limit of the host memory after recovery, which never triggers before the host runs out itself.
+    """
+
+    def _update_resources(self, container: Container, resources: dict):
+        """Update the HostConfig fields of a container, e.g. {"CpuQuota": 5000, "Memory": 67108864}."""
+        resources = dict(resources)
+        nano_cpus = resources.pop("NanoCpus", None)
+        if resources:
+            # docker-py only sends the truthy fields, a 0 would be skipped instead of cleared
+            container.update(
+                cpu_period=resources.get("CpuPeriod"),
+                cpu_quota=resources.get("CpuQuota"),
+                mem_limit=resources.get("Memory"),
+                memswap_limit=resources.get("MemorySwap"),
+                blkio_weight=resources.get("BlkioWeight"),
+            )
+        if nano_cpus is not None:
+            # docker-py has no parameter for NanoCpus
+            api = self.containers.client.api
+            api._result(api._post_json(api._url("/containers/{0}/update", container.id), data={"NanoCpus": nano_cpus}))
+
+    def _unlimited_memory(self) -> int:
+        # the closest to no limit, see the class docstring
+        return self.containers.client.info()["MemTotal"]
+
+    def inject_resource_contention(
+        self,
+        host_name: str | list[str],
+        cpus: float | None = None,
+        memory: str | int | None = None,
+        blkio_weight: int | None = None,
+        rate: str | None = None,
+        intf_name: str | list[str] | None = None,
+    ):
+        """Lower the resource limits of one or several machines.
+
+        Args:
+            cpus: CPU time available to the container, in CPUs (e.g. 0.05).
+            memory: memory limit without swap (e.g. "64m"), the processes above it are reclaimed or OOM killed.
+            blkio_weight: block I/O weight (10-1000) against the other containers.
+            rate: egress rate (e.g. "1mbit"), with a tbf qdisc replacing the root qdisc of the interfaces.
+            intf_name: the interfaces to rate limit, all the interfaces of the machines by default.
+        """
+        host_names = [host_name] if isinstance(host_name, str) else host_name
+        intf_names = [intf_name] if isinstance(intf_name, str) else intf_name
+        for name in host_names:
+            container = self.containers.get(name)
+            container.reload()
+            host_config = container.attrs["HostConfig"]
+
+            resources = {}
+            if cpus is not None:
+                # a container created with --cpus cannot get a CPU quota, and the other way around
+                if host_config.get("NanoCpus"):
+                    resources["NanoCpus"] = int(cpus * 1e9)
+                else:
+                    resources.update(CpuPeriod=CPU_PERIOD_US, CpuQuota=int(cpus * CPU_PERIOD_US))
+            if memory is not None:
+                memory = parse_bytes(memory) if isinstance(memory, str) else memory
+                resources.update(Memory=memory, MemorySwap=memory)
+            if blkio_weight is not None:
+                resources["BlkioWeight"] = blkio_weight
+            limited_intfs = []
+            if rate is not None:
+                limited_intfs = intf_names or self.kathara_api.get_host_interfaces(name)
+            with _saved_resources_lock:
+                saved = _saved_resources.setdefault(container.id, {})
+                # keep the original limits if the fault is injected twice
+                for key in resources:
+                    saved.setdefault(key, host_config.get(key) or 0)
+                _rate_limited.update((container.id, intf) for intf in limited_intfs)
+            if resources:
+                self._update_resources(container, resources)
+            for intf in limited_intfs:
+                self.kathara_api.tc_set_tbf(name, intf, rate=rate, burst="32kbit", limit="10000")
+            self.logger.info(
+                f"Injected resource contention on {name} (cpus={cpus}, memory={memory}, "
+                f"blkio_weight={blkio_weight}, rate={rate})."
+            )
+
+    def recover_resource_contention(self, host_name: str | list[str]):
+        """Restore the limits the machines had before the injection, and remove the rate limits it set."""
+        host_names = [host_name] if isinstance(host_name, str) else host_name
+        for name in host_names:
+            container = self.containers.get(name)
+            with _saved_resources_lock:
+                saved = _saved_resources.pop(container.id, None)
+                limited_intfs = sorted(intf for cid, intf in _rate_limited if cid == container.id)
+                _rate_limited.difference_update((container.id, intf) for intf in limited_intfs)
+            if saved is None:
+                # injected by another process, fall back to no CPU and memory limits; its rate limits are unknown,
+                # the qdiscs are left alone rather than clearing those of other faults
+                self.logger.warning(f"No resource contention recorded on {name}, resetting its CPU and memory limits.")
+                container.reload()
+                saved = {"Memory": 0, "MemorySwap": 0}
+                if not container.attrs["HostConfig"].get("NanoCpus"):
+                    saved.update(CpuPeriod=0, CpuQuota=0)
+            resources = {}
+            for key, value in saved.items():
+                if value:
+                    resources[key] = value
+                elif key == "CpuPeriod":
+                    resources[key] = CPU_PERIOD_US
+                elif key in ("CpuQuota", "MemorySwap"):
+                    resources[key] = -1
+                elif key == "Memory":
+                    resources[key] = self._unlimited_memory()
+                elif key == "BlkioWeight":
+                    resources[key] = DEFAULT_BLKIO_WEIGHT
+            if resources:
+                self._update_resources(container, resources)
+            for intf in limited_intfs:
+                self.kathara_api.tc_clear_intf(name, intf)
+            self.logger.info(f"Recovered resource contention on {name}.")
+
+
+if __name__ == "__main__":
+    # Example usage
+    injector = FaultInjectorResource("dc_clos_service")
+    injector.inject_resource_contention("dns_pod0", cpus=0.05, memory="64m", rate="1mbit")
+    injector.recover_resource_contention("dns_pod0")
@@ -1,15 +1,14 @@
-import logging
-
-from llm4netlab.service.kathara import KatharaAPIALL
+from llm4netlab.generator.fault.impairment_schedule import (
+    NETEM_SCHEDULE_FIFO,
+    NETEM_SCHEDULE_HELPER,
+    ImpairmentSchedule,
+)
+from llm4netlab.generator.fault.injector_base import FaultInjectorBase
 
 """ Fault injector for Linux Traffic Control (tc) related faults """
 
 
-class FaultInjectorTC:
-    def __init__(self, lab_name: str):
-        self.kathara_api = KatharaAPIALL(lab_name)
-        self.logger = logging.getLogger(__name__)
-
+class FaultInjectorTC(FaultInjectorBase):
     def inject_packet_loss(self, host_name: str, intf_name: str, loss_percentage: int):
         """Inject packet loss into a specific intf_name of a switch."""
         self.kathara_api.tc_set_netem(
@@ -101,10 +100,52 @@ class FaultInjectorTC:
         )
         self.logger.info(f"Recovered bandwidth limit (via clearing TC rules) on {host_name}:{intf_name}")
 
+    def _send_schedule_commands(self, host_name: str, commands: list[str], wait: bool = True):
+        """Write control commands to the netem_schedule.sh daemon of a host.
+
+        With wait, the FIFO of a daemon that just started is waited for. Nothing is written if there is no FIFO:
+        the redirection would create a regular file in its place.
+        """
+        lines = " ".join(f"'{command}'" for command in commands)
+        wait_cmd = f"for i in $(seq 50); do [ -p {NETEM_SCHEDULE_FIFO} ] && break; sleep 0.1; done; " if wait else ""
+        self.kathara_api.exec_cmd(
+            host_name,
+            f"{wait_cmd}[ -p {NETEM_SCHEDULE_FIFO} ] && "
+            f"printf '%s\\n' {lines} | timeout 5 sh -c 'cat > {NETEM_SCHEDULE_FIFO}'",
+        )
+
+    def inject_impairment_schedule(self, host_name: str, intf_name: str | list[str], schedule: ImpairmentSchedule):
+        """Run a timeline of netem impairments on one or several interfaces of a host.
+
+        A single netem_schedule.sh daemon per container applies all the timelines, it is started on first use and
+        receives each schedule as one write to its FIFO, so no exec is needed per step.
+        """
+        intf_names = [intf_name] if isinstance(intf_name, str) else intf_name
+        self._start_helper(host_name, NETEM_SCHEDULE_HELPER, {"daemon": NETEM_SCHEDULE_FIFO}, restart=False)
+        self._send_schedule_commands(host_name, [cmd for intf in intf_names for cmd in schedule.commands(intf)])
+        self.logger.info(
+            f"Injected impairment schedule of {len(schedule.steps)} steps on {host_name}:{intf_name}"
+            f" (repeat={schedule.repeat})"
+        )
+
+    def recover_impairment_schedule(self, host_name: str, intf_name: str | list[str]):
+        """Stop the impairment timelines of the interfaces and remove their netem qdisc."""
+        intf_names = [intf_name] if isinstance(intf_name, str) else intf_name
+        # no daemon to wait for if it is not running anymore, the qdiscs are cleared below anyway
+        self._send_schedule_commands(host_name, [f"stop {intf}" for intf in intf_names], wait=False)
+        for intf in intf_names:
+            self.kathara_api.tc_clear_intf(host_name=host_name, intf_name=intf)
+        self.logger.info(f"Recovered impairment schedule on {host_name}:{intf_name}")
+
 
 if __name__ == "__main__":
     # Example usage
     injector = FaultInjectorTC("dc_clos_service")
     injector.inject_delay("dns_pod0", "eth0", 1000)
+    injector.inject_impairment_schedule(
+        "dns_pod0",
+        "eth0",
+        ImpairmentSchedule.from_tuples([(0, 10, 50, 5, None), (5, 50, 200, 50, None), (10, None, None, None, None)]),
+    )
     # print(injector.kathara_api.tc_show_intf("leaf_0_1", "eth0"))
     # injector.recover_bandwidth_limit("dns_pod0", "eth0")
@@ -0,0 +1,84 @@
+#!/bin/bash
+
+# Apply netem impairment timelines with `tc qdisc replace`, controlled through a FIFO.
+# One daemon per container, one timeline per interface. Commands, one per line:
+#   step <intf> <offset_ms> [netem options]   append a step to the pending timeline of <intf>
+#   start <intf> <repeat_ms>                  run the pending timeline, again every repeat_ms if > 0
+#   stop <intf>                               stop the timeline of <intf> and remove its root qdisc
+#   quit                                      stop all the timelines and exit
+# Offsets are relative to the start of the timeline and each step waits for its absolute deadline, so the
+# timing does not drift with the time spent running tc.
+
+FIFO=${1:-/tmp/netem_schedule.fifo}
+
+declare -A STEPS RUNNERS
+
+[ -p "$FIFO" ] || { rm -f "$FIFO"; mkfifo "$FIFO"; }
+# also opened for writing, so that reads never see EOF between two writers and stay interruptible
+exec 3<> "$FIFO"
+
+now_ms() {
+    local t=${EPOCHREALTIME/./}
+    NOW=$((t / 1000))
+}
+
+run_timeline() {
+    local intf=$1 repeat_ms=$2 steps=$3 start offset opts wait_ms
+    now_ms
+    start=$NOW
+    while true; do
+        while read -r offset opts; do
+            [ -z "$offset" ] && continue
+            now_ms
+            wait_ms=$((start + offset - NOW))
+            if ((wait_ms > 0)); then
+                sleep "$((wait_ms / 1000)).$(printf '%03d' $((wait_ms % 1000)))"
+            fi
+            tc qdisc replace dev "$intf" root netem $opts
+            now_ms
+            echo "$NOW $intf +$((NOW - start))ms $opts"
+        done <<< "$steps"
+        ((repeat_ms > 0)) || break
+        start=$((start + repeat_ms))
+    done
+}
+
+stop_runner() {
+    if [ -n "${RUNNERS[$1]}" ]; then
+        kill "${RUNNERS[$1]}" 2>/dev/null
+        wait "${RUNNERS[$1]}" 2>/dev/null
+        unset "RUNNERS[$1]"
+    fi
+}
+
+stop_all() {
+    for intf in "${!RUNNERS[@]}"; do
+        stop_runner "$intf"
+    done
+    rm -f "$FIFO"
+    exit 0
+}
+
+trap stop_all TERM INT
+
+while read -r cmd intf rest <&3; do
+    case $cmd in
+        step)
+            STEPS[$intf]+="$rest"$'\n'
+            ;;
+        start)
+            stop_runner "$intf"
+            run_timeline "$intf" "${rest:-0}" "${STEPS[$intf]}" &
+            RUNNERS[$intf]=$!
+            STEPS[$intf]=""
+            ;;
+        stop)
+            stop_runner "$intf"
+            STEPS[$intf]=""
+            tc qdisc del dev "$intf" root 2>/dev/null
+            ;;
+        quit)
+            stop_all
+            ;;
+    esac
+done
@@ -5,6 +5,29 @@ from typing import Dict
 from Kathara.manager.Kathara import Kathara, Machine
 
 
+def resolve_topo_dims(topo_size: str, presets: Dict[str, Dict[str, int]], **dims: int | None) -> Dict[str, int]:
+    """Dimensions of a generated topology: the preset of topo_size, overridden by the dimensions given explicitly.
+
+    Example:
+        resolve_topo_dims("m", DCClosBGP.TOPO_PRESETS, leaves_per_pod=16)
+
+    Raises:
+        ValueError: If topo_size is not a preset, or a dimension is unknown or not a positive integer.
+    """
+    if topo_size not in presets:
+        raise ValueError(f"topo_size should be one of {', '.join(presets)}.")
+    resolved = dict(presets[topo_size])
+    for name, value in dims.items():
+        if value is None:
+            continue
+        if name not in resolved:
+            raise ValueError(f"Unknown topology dimension {name}, expected one of {', '.join(resolved)}.")
+        if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+            raise ValueError(f"Topology dimension {name} should be a positive integer, got {value!r}.")
+        resolved[name] = value
+    return resolved
+
+
 class NetworkEnvBase:
     LAB_NAME = None
     """
@@ -77,6 +100,8 @@ class NetworkEnvBase:
         machines = self.lab.machines
         for machine, stat in machines.items():
             for intf_num, intf in stat.interfaces.items():
+                if intf is None:
+                    continue
                 topology[intf.link.name].append(f"{machine}:eth{intf_num}")
         # sorted by the link name A, B, C, ...
         topology = sorted(topology.items(), key=lambda x: x[0])
@@ -0,0 +1,388 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from llm4netlab.config import BASE_DIR
+from llm4netlab.generator.fault.helper_staging import HELPERS_DIR
+from llm4netlab.net_env.base import NetworkEnvBase
+from llm4netlab.service.kathara.container_index import LabContainerIndex
+
+""" Checkpoint of the converged state of a lab, to reset it without redeploying """
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_DIR = os.path.join(BASE_DIR, "runtime", "checkpoints") if BASE_DIR else None
+
+# Mutable configuration trees, and the service to restart when they are restored
+MUTABLE_PATHS = {
+    "/etc/frr": "systemctl restart frr",
+    "/etc/dhcp": "systemctl restart isc-dhcp-server",
+}
+# Daemons started by the lab startup files, and the command bringing a stopped one back ({machine} is formatted)
+DAEMONS = {
+    "zebra": "systemctl restart frr",
+    "bgpd": "systemctl restart frr",
+    "ospfd": "systemctl restart frr",
+    "ripd": "systemctl restart frr",
+    "staticd": "systemctl restart frr",
+    "named": "systemctl restart named",
+    "dhcpd": "systemctl restart isc-dhcp-server",
+    "apache2": "service apache2 restart",
+    "nginx": "service nginx restart",
+    "simple_switch": "./hostlab/{machine}.startup",
+    "simple_switch_grpc": "./hostlab/{machine}.startup",
+}
+# Routes installed by the routing daemons come back on their own once their configuration is restored
+DYNAMIC_ROUTE_PROTOCOLS = {"bgp", "ospf", "rip", "zebra", "static"}
+DEFAULT_QDISCS = {"noqueue", "pfifo_fast", "fq_codel", "mq", "noop"}
+# pid files of the fault helpers started by FaultInjectorBase._start_helper
+HELPER_PID_GLOBS = " ".join(f"/tmp/{os.path.splitext(name)[0]}_*.pid" for name in sorted(os.listdir(HELPERS_DIR)))
+
+_SECTION = "@@section "
+_STATE_SCRIPT = "; ".join(
+    [
+        f"echo '{_SECTION}links'; ip -j link show",
+        f"echo '{_SECTION}addrs'; ip -j addr show",
+        f"echo '{_SECTION}routes'; ip -j route show",
+        f"echo '{_SECTION}neigh'; ip -j neigh show nud permanent",
+        f"echo '{_SECTION}qdisc'; tc -j qdisc show",
+        f"echo '{_SECTION}nft'; nft list ruleset 2>/dev/null",
+        f"echo '{_SECTION}iptables'; iptables-save 2>/dev/null",
+        f"echo '{_SECTION}helpers'; ls {HELPER_PID_GLOBS} 2>/dev/null",
+        f"echo '{_SECTION}daemons'; ps -eo comm=",
+        f"echo '{_SECTION}files'; "
+        + "; ".join(f"[ -e {path} ] && find {path} -type f -exec sha256sum {{}} +" for path in MUTABLE_PATHS),
+    ]
+)
+
+
+def _load_json(text: str) -> list:
+    try:
+        return json.loads(text) if text.strip() else []
+    except json.JSONDecodeError:
+        return []
+
+
+def parse_state(output: str) -> dict:
+    """Normalize the output of the state script into comparable components.
+
+    Only what a fresh deploy reproduces is kept: e.g. MAC and IPv6 link-local addresses are left out.
+    """
+    sections = {}
+    name = None
+    for line in output.splitlines():
+        if line.startswith(_SECTION):
+            name = line[len(_SECTION) :].strip()
+            sections[name] = []
+        elif name is not None:
+            sections[name].append(line)
+    sections = {key: "\n".join(lines) for key, lines in sections.items()}
+
+    state = {}
+    state["links"] = {
+        link["ifname"]: ("UP" in link.get("flags", []), link.get("mtu"))
+        for link in _load_json(sections.get("links", ""))
+    }
+    state["addrs"] = {
+        link["ifname"]: sorted(
+            f"{addr['local']}/{addr['prefixlen']}" for addr in link.get("addr_info", []) if addr.get("scope") != "link"
+        )
+        for link in _load_json(sections.get("addrs", ""))
+    }
+    state["routes"] = sorted(
+        json.dumps(
+            {
+                "dst": route.get("dst"),
+                "type": route.get("type", "unicast"),
+                "gateway": route.get("gateway"),
+                "dev": route.get("dev"),
+                "protocol": route.get("protocol"),
+                "nexthops": sorted((nh.get("gateway"), nh.get("dev")) for nh in route.get("nexthops", [])),
+            },
+            sort_keys=True,
+        )
+        for route in _load_json(sections.get("routes", ""))
+    )
+    state["neigh"] = sorted(
+        (neigh.get("dst"), neigh.get("dev"), neigh.get("lladdr")) for neigh in _load_json(sections.get("neigh", ""))
+    )
+    state["qdisc"] = {
+        qdisc["dev"]: (qdisc.get("kind"), json.dumps(qdisc.get("options", {}), sort_keys=True))
+        for qdisc in _load_json(sections.get("qdisc", ""))
+        if qdisc.get("root")
+    }
+    state["nft"] = sections.get("nft", "").strip()
+    # packet counters and comments change all the time
+    state["iptables"] = "\n".join(
+        re.sub(r"\[\d+:\d+\]", "", line)
+        for line in sections.get("iptables", "").splitlines()
+        if not line.startswith("#")
+    ).strip()
+    state["helpers"] = sorted(line for line in sections.get("helpers", "").splitlines() if line.strip())
+    # ps truncates the command names to 15 characters
+    running = {line.strip() for line in sections.get("daemons", "").splitlines()}
+    state["daemons"] = sorted(daemon for daemon in DAEMONS if daemon[:15] in running)
+    state["files"] = dict(
+        sorted(
+            (line.split(None, 1)[1], line.split(None, 1)[0]) for line in sections.get("files", "").splitlines() if line
+        )
+    )
+    return state
+
+
+def diff_state(current: dict, expected: dict) -> list[str]:
+    """Components of a machine state that differ."""
+    return [key for key in expected if current.get(key) != expected[key]]
+
+
+class LabCheckpoint:
+    """Per-machine state of a converged lab: mutable config trees, running daemons, link, address,
+    route, ARP, tc and firewall state.
+
+    `restore()` compares the live state of every machine with the checkpoint and reapplies only the components
+    that differ, machines in parallel. `verify()` checks that the live state is the checkpointed one, including
+    the routes learned by the routing daemons. A checkpoint captured right after a fresh deploy is the reference
+    a verified restore is equivalent to.
+    """
+
+    def __init__(self, lab_name: str, topo_size: str | None = None):
+        self.lab_name = lab_name
+        self.topo_size = topo_size
+        # {machine name: normalized state}
+        self.states: dict[str, dict] = {}
+        # {machine name: {mutable path: tar archive}}
+        self.archives: dict[str, dict[str, bytes]] = {}
+        self.paused: dict[str, bool] = {}
+        self.captured_at = None
+
+    # --- helpers -------------------------------------------------------------------------------------------------
+    @staticmethod
+    def _exec(container, script: str) -> str:
+        result = container.exec_run(["sh", "-c", script])
+        return result.output.decode("utf-8", errors="ignore")
+
+    @staticmethod
+    def _parallel(fn, machine_names: list[str], max_workers: int = 32) -> dict:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(machine_names, executor.map(fn, machine_names)))
+
+    @staticmethod
+    def path(lab_name: str) -> str | None:
+        return os.path.join(CHECKPOINT_DIR, f"{lab_name}.pkl") if CHECKPOINT_DIR else None
+
+    def live_states(self, containers: LabContainerIndex, machine_names: list[str]) -> dict[str, dict]:
+        return self._parallel(lambda name: parse_state(self._exec(containers.get(name), _STATE_SCRIPT)), machine_names)
+
+    # --- capture -------------------------------------------------------------------------------------------------
+    @classmethod
+    def capture(
+        cls,
+        net_env: NetworkEnvBase,
+        topo_size: str | None = None,
+        settle_interval: float = 5.0,
+        max_wait: float = 180.0,
+    ) -> "LabCheckpoint":
+        """Wait until the lab converged (two consecutive snapshots are equal), then record its state."""
+        checkpoint = cls(net_env.lab.name, topo_size)
+        containers = LabContainerIndex.for_lab(net_env.lab)
+        containers.refresh()
+        machine_names = sorted(net_env.lab.machines)
+
+        deadline = time.monotonic() + max_wait
+        states = checkpoint.live_states(containers, machine_names)
+        while True:
+            time.sleep(settle_interval)
+            new_states = checkpoint.live_states(containers, machine_names)
+            if new_states == states:
+                break
+            if time.monotonic() > deadline:
+                logger.warning(f"Lab {net_env.lab.name} did not settle in {max_wait}s, checkpointing it anyway.")
+                break
+            states = new_states
+        checkpoint.states = new_states
+
+        def archive(name: str) -> dict[str, bytes]:
+            container = containers.get(name)
+            archives = {}
+            for path in MUTABLE_PATHS:
+                if any(file.startswith(path + "/") for file in new_states[name]["files"]):
+                    stream, _ = container.get_archive(path)
+                    archives[path] = b"".join(stream)
+            return archives
+
+        checkpoint.archives = cls._parallel(archive, machine_names)
+        checkpoint.captured_at = time.time()
+        logger.info(f"Checkpointed {len(machine_names)} machines of lab {net_env.lab.name}.")
+        return checkpoint
+
+    def save(self):
+        if CHECKPOINT_DIR is None:
+            raise RuntimeError("BASE_DIR is not set, there is no directory to save the checkpoint to.")
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        tmp_path = self.path(self.lab_name) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, self.path(self.lab_name))
+
+    @classmethod
+    def load(cls, lab_name: str) -> "LabCheckpoint | None":
+        path = cls.path(lab_name)
+        if path is None or not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def matches(self, net_env: NetworkEnvBase, topo_size: str | None = None) -> bool:
+        """The checkpoint was taken on the same topology as the deployed lab, and records its running daemons."""
+        return (
+            self.topo_size == topo_size
+            and set(self.states) == set(net_env.lab.machines)
+            and all("daemons" in state for state in self.states.values())
+        )
+
+    # --- restore -------------------------------------------------------------------------------------------------
+    def _restore_script(self, current: dict, expected: dict, components: list[str]) -> tuple[str, list[str]]:
+        """Shell commands bringing the differing components back, and the mutable paths to re-upload.
+
+        Stopped daemons are not restarted here: `daemon_restarts` runs after the configuration is re-uploaded.
+        """
+        cmds = []
+        paths = []
+        if "helpers" in components:
+            cmds.append(f"for f in {HELPER_PID_GLOBS}; do [ -f $f ] && kill $(cat $f) 2>/dev/null; rm -f $f; done")
+        if "links" in components:
+            for ifname, (up, mtu) in expected["links"].items():
+                if current["links"].get(ifname) != (up, mtu):
+                    cmds.append(f"ip link set dev {ifname} mtu {mtu} {'up' if up else 'down'}")
+        if "addrs" in components:
+            for ifname, addrs in expected["addrs"].items():
+                live = set(current["addrs"].get(ifname, []))
+                cmds += [f"ip addr del {addr} dev {ifname}" for addr in live - set(addrs)]
+                cmds += [f"ip addr add {addr} dev {ifname}" for addr in set(addrs) - live]
+        if "files" in components:
+            for path in MUTABLE_PATHS:
+                prefix = path + "/"
+                live = {k: v for k, v in current["files"].items() if k.startswith(prefix)}
+                wanted = {k: v for k, v in expected["files"].items() if k.startswith(prefix)}
+                if live != wanted:
+                    paths.append(path)
+        if "routes" in components:
+            live, wanted = set(current["routes"]), set(expected["routes"])
+            for route in map(json.loads, sorted(live - wanted)):
+                if route["protocol"] not in DYNAMIC_ROUTE_PROTOCOLS:
+                    kind = "" if route["type"] == "unicast" else route["type"]
+                    cmds.append(f"ip route del {kind} {route['dst']}")
+            for route in map(json.loads, sorted(wanted - live)):
+                if route["protocol"] not in DYNAMIC_ROUTE_PROTOCOLS and route["protocol"] != "kernel":
+                    via = f"via {route['gateway']}" if route["gateway"] else ""
+                    dev = f"dev {route['dev']}" if route["dev"] else ""
+                    kind = "" if route["type"] == "unicast" else route["type"]
+                    cmds.append(f"ip route replace {kind} {route['dst']} {via} {dev}")
+        if "neigh" in components:
+            live, wanted = set(map(tuple, current["neigh"])), set(map(tuple, expected["neigh"]))
+            cmds += [f"ip neigh del {dst} dev {dev}" for dst, dev, _ in live - wanted]
+            cmds += [f"ip neigh replace {dst} lladdr {mac} dev {dev} nud permanent" for dst, dev, mac in wanted - live]
+        if "qdisc" in components:
+            for dev, root in current["qdisc"].items():
+                if expected["qdisc"].get(dev) != root:
+                    cmds.append(f"tc qdisc del dev {dev} root 2>/dev/null")
+                    kind = expected["qdisc"].get(dev, (None,))[0]
+                    if kind is not None and kind not in DEFAULT_QDISCS:
+                        logger.warning(f"Cannot restore the {kind} root qdisc of {dev}, reset to default.")
+        if "nft" in components:
+            cmds.append(f"nft flush ruleset; nft -f - <<'EOF'\n{expected['nft']}\nEOF")
+        if "iptables" in components:
+            cmds.append(f"iptables-restore <<'EOF'\n{expected['iptables']}\nEOF")
+        # one command per line, the here-documents need their terminator on a line of its own
+        return "\n".join(cmds), paths
+
+    @staticmethod
+    def daemon_restarts(machine: str, current: dict, expected: dict, paths: list[str]) -> list[str]:
+        """Commands restarting the daemons of a machine that stopped, and the services of re-uploaded paths."""
+        cmds = [MUTABLE_PATHS[path] for path in paths]
+        stopped = set(expected.get("daemons", [])) - set(current.get("daemons", []))
+        cmds += [DAEMONS[daemon].format(machine=machine) for daemon in sorted(stopped)]
+        # e.g. all the FRR daemons come back with one restart
+        return list(dict.fromkeys(cmds))
+
+    def restore(self, net_env: NetworkEnvBase) -> dict[str, list[str]]:
+        """Reapply what differs from the checkpoint, return {machine: restored components}."""
+        containers = LabContainerIndex.for_lab(net_env.lab)
+        containers.refresh()
+        machine_names = sorted(self.states)
+
+        # paused containers cannot exec anything
+        statuses = containers.status(machine_names)
+        paused = [name for name, status in statuses.items() if status == "paused"]
+        if paused:
+            containers.unpause(paused)
+        stopped = [name for name, status in statuses.items() if status not in ("running", "paused")]
+        if stopped:
+            containers.start(stopped)
+
+        current_states = self.live_states(containers, machine_names)
+
+        def restore_machine(name: str) -> list[str]:
+            current, expected = current_states[name], self.states[name]
+            components = diff_state(current, expected)
+            if not components:
+                return []
+            container = containers.get(name)
+            script, paths = self._restore_script(current, expected, components)
+            for path in paths:
+                self._exec(container, f"rm -rf {path}")
+                container.put_archive(os.path.dirname(path), self.archives[name][path])
+            restart_cmds = self.daemon_restarts(name, current, expected, paths)
+            script = "\n".join(cmd for cmd in [script, *restart_cmds] if cmd)
+            if script:
+                self._exec(container, script)
+            return components
+
+        restored = self._parallel(restore_machine, machine_names)
+        restored = {name: components for name, components in restored.items() if components}
+        for name in paused:
+            restored.setdefault(name, []).append("paused")
+        for name in stopped:
+            restored.setdefault(name, []).append("stopped")
+        logger.info(f"Restored lab {self.lab_name}: {restored if restored else 'nothing to restore'}")
+        return restored
+
+    def verify(self, net_env: NetworkEnvBase, timeout: float = 120.0, interval: float = 5.0) -> dict[str, list[str]]:
+        """Wait until the live state equals the checkpoint, return the components still differing (empty if equal)."""
+        containers = LabContainerIndex.for_lab(net_env.lab)
+        machine_names = sorted(self.states)
+        deadline = time.monotonic() + timeout
+        while True:
+            current_states = self.live_states(containers, machine_names)
+            differences = {
+                name: components
+                for name in machine_names
+                if (components := diff_state(current_states[name], self.states[name]))
+            }
+            if not differences or time.monotonic() > deadline:
+                return differences
+            time.sleep(interval)
+
+    def fingerprint(self) -> str:
+        """Digest of the checkpointed state, equal for two fresh deploys of the same topology."""
+        return hashlib.sha256(json.dumps(self.states, sort_keys=True, default=list).encode()).hexdigest()
+
+
+def reset_lab(net_env: NetworkEnvBase, topo_size: str | None = None, verify_timeout: float = 120.0) -> bool:
+    """Reset a deployed lab to its checkpoint, return False if there is no usable checkpoint or it did not verify."""
+    checkpoint = LabCheckpoint.load(net_env.lab.name)
+    if checkpoint is None or not checkpoint.matches(net_env, topo_size):
+        return False
+    start = time.perf_counter()
+    checkpoint.restore(net_env)
+    differences = checkpoint.verify(net_env, timeout=verify_timeout)
+    if differences:
+        logger.warning(f"Lab {net_env.lab.name} differs from its checkpoint after restore: {differences}")
+        return False
+    logger.info(f"Reset lab {net_env.lab.name} from its checkpoint in {time.perf_counter() - start:.1f}s")
+    return True
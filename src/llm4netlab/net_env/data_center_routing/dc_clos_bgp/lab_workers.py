@@ -6,13 +6,13 @@ from Kathara.manager.Kathara import Kathara, Machine
 from Kathara.model.Lab import Lab
 
 from llm4netlab.config import BASE_DIR
-from llm4netlab.net_env.base import NetworkEnvBase
+from llm4netlab.net_env.base import NetworkEnvBase, resolve_topo_dims
 
 cur_path = os.path.dirname(os.path.abspath(__file__))
 
 
 # P2P links use 172.16.0.0/16 with /31 per link.
-# Host access networks use 10.<pod>.<leaf>.0/24 with leaf .1 and host .2
+# Host access networks use 10.<pod>.<leaf>.0/24 with leaf .1 and hosts from .2
 def assign_p2p_ips(subnet):
     base = subnet.network_address
     ip0 = IPv4Interface(f"{base}/31")
@@ -67,21 +67,56 @@ class DCClosBGP(NetworkEnvBase):
     TOPO_LEVEL = "medium"
     TOPO_SIZE = ["s", "m", "l"]
     TAGS = ["arp", "link", "mac", "bgp", "icmp", "frr", "host"]
-
-    def __init__(self, topo_size: Literal["s", "m", "l"] = "s"):
+    # one pod per super spine
+    TOPO_PRESETS = {
+        "s": {"super_spines": 1, "spines_per_pod": 2, "leaves_per_pod": 2, "hosts_per_leaf": 1},
+        "m": {"super_spines": 2, "spines_per_pod": 4, "leaves_per_pod": 4, "hosts_per_leaf": 1},
+        "l": {"super_spines": 4, "spines_per_pod": 8, "leaves_per_pod": 8, "hosts_per_leaf": 1},
+    }
+
+    def __init__(
+        self,
+        topo_size: Literal["s", "m", "l"] = "s",
+        super_spines: int | None = None,
+        spines_per_pod: int | None = None,
+        leaves_per_pod: int | None = None,
+        hosts_per_leaf: int | None = None,
+    ):
+        """The dimensions given explicitly override the ones of the topo_size preset, e.g. to scale past "l"."""
         super().__init__()
         self.lab = Lab(self.LAB_NAME)
         self.name = self.LAB_NAME
         self.instance = Kathara.get_instance()
-
-        if topo_size == "s":
-            super_spine_count, spine_per_pod, leaf_per_pod = 1, 2, 2
-        elif topo_size == "m":
-            super_spine_count, spine_per_pod, leaf_per_pod = 2, 4, 4
-        elif topo_size == "l":
-            super_spine_count, spine_per_pod, leaf_per_pod = 4, 8, 8
+        self.topo_size = topo_size
+        self.topo_dims = resolve_topo_dims(
+            topo_size,
+            self.TOPO_PRESETS,
+            super_spines=super_spines,
+            spines_per_pod=spines_per_pod,
+            leaves_per_pod=leaves_per_pod,
+            hosts_per_leaf=hosts_per_leaf,
+        )
+        super_spine_count = self.topo_dims["super_spines"]
+        spine_per_pod = self.topo_dims["spines_per_pod"]
+        leaf_per_pod = self.topo_dims["leaves_per_pod"]
+        host_per_leaf = self.topo_dims["hosts_per_leaf"]
+
+        # host networks are 10.<pod>.<leaf>.0/24, and the /31 of the links come from 172.16.0.0/16
+        if max(super_spine_count, spine_per_pod, leaf_per_pod) > 256:
+            raise ValueError("At most 256 pods, and 256 spines and leaves per pod, are supported.")
+        link_count = (
+            super_spine_count * super_spine_count * spine_per_pod + super_spine_count * spine_per_pod * leaf_per_pod
+        )
+        if link_count > 2**15:
+            raise ValueError(f"{link_count} router links do not fit the /31 subnets of 172.16.0.0/16.")
+        # the leaf takes .1 of its host network
+        if host_per_leaf > 253:
+            raise ValueError(f"{host_per_leaf} hosts per leaf do not fit the host networks 10.<pod>.<leaf>.0/24.")
+        # the private 2-byte ASes of the presets fit 10 pods of 10 spines and 10 leaves, larger fabrics use 4-byte ones
+        if max(super_spine_count, spine_per_pod, leaf_per_pod) > 10:
+            spine_as_base, leaf_as_base, pod_as_stride = 4201000000, 4202000000, 1000
         else:
-            raise ValueError("topo_size should be s, m, or l.")
+            spine_as_base, leaf_as_base, pod_as_stride = 65100, 65200, 10
 
         pod_spines = {}
         pod_leaves = {}
@@ -94,7 +129,7 @@ class DCClosBGP(NetworkEnvBase):
 
         infra_pool = IPv4Network("172.16.0.0/16")
         # Create a generator of /31s
-        subnets31 = list(infra_pool.subnets(new_prefix=31))
+        subnets31 = infra_pool.subnets(new_prefix=31)
 
         for ss in range(super_spine_count):
             ss_name = f"super_spine_router_{ss}"
@@ -120,7 +155,7 @@ class DCClosBGP(NetworkEnvBase):
                     machine=router_spine,
                     eth_index=0,
                     cmd_list=[],
-                    AS_number=65100 + 10 * pod + spine_id,
+                    AS_number=spine_as_base + pod_as_stride * pod + spine_id,
                 )
                 pod_spines[pod].append(spine_meta)
                 tot_spines.append(spine_meta)
@@ -136,23 +171,29 @@ class DCClosBGP(NetworkEnvBase):
                     machine=router_leaf,
                     eth_index=0,
                     cmd_list=[],
-                    AS_number=65200 + 10 * pod + leaf_id,
+                    AS_number=leaf_as_base + pod_as_stride * pod + leaf_id,
                 )
                 pod_leaves[pod].append(leaf_meta)
                 tot_leaves.append(leaf_meta)
 
+            # the hosts of each leaf, the first one keeps the name it has with one host per leaf
             pod_hosts[pod] = []
-            for host in range(leaf_per_pod):
-                host_name = f"pc_{pod}_{host}"
-                host = self.lab.new_machine(host_name, **{"image": "kathara/base-stress", "cpus": 0.5, "mem": "256m"})
-                host_meta = HostMeta(
-                    name=host_name,
-                    machine=host,
-                    eth_index=0,
-                    cmd_list=[],
-                )
-                pod_hosts[pod].append(host_meta)
-                tot_hosts.append(host_meta)
+            for leaf_id in range(leaf_per_pod):
+                leaf_hosts = []
+                for host_id in range(host_per_leaf):
+                    host_name = f"pc_{pod}_{leaf_id}" if host_id == 0 else f"pc_{pod}_{leaf_id}_{host_id}"
+                    host = self.lab.new_machine(
+                        host_name, **{"image": "kathara/base-stress", "cpus": 0.5, "mem": "256m"}
+                    )
+                    host_meta = HostMeta(
+                        name=host_name,
+                        machine=host,
+                        eth_index=0,
+                        cmd_list=[],
+                    )
+                    leaf_hosts.append(host_meta)
+                    tot_hosts.append(host_meta)
+                pod_hosts[pod].append(leaf_hosts)
 
         # add links between super spines and spines
         for pod in range(super_spine_count):
@@ -164,7 +205,7 @@ class DCClosBGP(NetworkEnvBase):
                 self.lab.connect_machine_to_link(
                     spine_meta.machine.name, f"{super_spine_meta.machine.name}_{spine_meta.machine.name}"
                 )
-                subnet = subnets31.pop(0)
+                subnet = next(subnets31)
                 a_ip, b_ip = assign_p2p_ips(subnet)
                 super_spine_meta.cmd_list.append(f"ip addr add {a_ip} dev eth{super_spine_meta.eth_index}")
                 super_spine_meta.eth_index += 1
@@ -200,7 +241,7 @@ class DCClosBGP(NetworkEnvBase):
                     self.lab.connect_machine_to_link(
                         leaf_meta.machine.name, f"{spine_meta.machine.name}_{leaf_meta.machine.name}"
                     )
-                    subnet = subnets31.pop(0)
+                    subnet = next(subnets31)
                     a_ip, b_ip = assign_p2p_ips(subnet)
                     spine_meta.cmd_list.append(f"ip addr add {a_ip} dev eth{spine_meta.eth_index}")
                     spine_meta.eth_index += 1
@@ -226,23 +267,23 @@ class DCClosBGP(NetworkEnvBase):
                     if leaf_meta.router_id == "":
                         leaf_meta.router_id = b_ip.split("/")[0]
 
-        # add links between leaves and hosts
+        # add links between leaves and hosts, the hosts of a leaf share one access network
         for pod in range(super_spine_count):
             for idx in range(leaf_per_pod):
                 leaf_meta = pod_leaves[pod][idx]
-                host = pod_hosts[pod][idx]
-                self.lab.connect_machine_to_link(
-                    leaf_meta.machine.name, f"{leaf_meta.machine.name}_{host.machine.name}"
-                )
-                self.lab.connect_machine_to_link(host.machine.name, f"{leaf_meta.machine.name}_{host.machine.name}")
+                leaf_hosts = pod_hosts[pod][idx]
+                link_name = f"{leaf_meta.machine.name}_{leaf_hosts[0].machine.name}"
+                self.lab.connect_machine_to_link(leaf_meta.machine.name, link_name)
                 subnet = IPv4Network(f"10.{pod}.{idx}.0/24")
                 leaf_ip = IPv4Interface(f"{subnet.network_address + 1}/{subnet.prefixlen}")
-                host_ip = IPv4Interface(f"{subnet.network_address + 2}/{subnet.prefixlen}")
                 leaf_meta.cmd_list.append(f"ip addr add {leaf_ip} dev eth{leaf_meta.eth_index}")
                 leaf_meta.eth_index += 1
-                host.cmd_list.append(f"ip addr add {host_ip} dev eth{host.eth_index}")
-                host.cmd_list.append(f"ip route add default via {leaf_ip.ip} dev eth{host.eth_index}")
-                host.eth_index += 1
+                for host_id, host in enumerate(leaf_hosts):
+                    self.lab.connect_machine_to_link(host.machine.name, link_name)
+                    host_ip = IPv4Interface(f"{subnet.network_address + 2 + host_id}/{subnet.prefixlen}")
+                    host.cmd_list.append(f"ip addr add {host_ip} dev eth{host.eth_index}")
+                    host.cmd_list.append(f"ip route add default via {leaf_ip.ip} dev eth{host.eth_index}")
+                    host.eth_index += 1
                 # add host network to leaf for redistribution
                 leaf_meta.host_network = str(subnet)
 
@@ -305,10 +346,12 @@ class DCClosBGP(NetworkEnvBase):
 
         # load machines after initialization
         self.load_machines()
+        leaf_hosts_desc = "one host" if host_per_leaf == 1 else f"{host_per_leaf} hosts"
         self.desc = (
             "A multi-tier data center Clos (fat-tree) topology using EBGP. Super-spine routers (AS 65000) connect to all spine routers."
             "Each pod contains multiple spines and leaves; spines peer with super-spines and all leaves in their pod. "
-            "Each leaf connects to one host via a /24 subnet (10.<pod>.<leaf>.0/24) and advertises this network via BGP. "
+            f"Each leaf connects to {leaf_hosts_desc} via a /24 subnet (10.<pod>.<leaf>.0/24) and advertises this "
+            "network via BGP. "
             "All inter-router links use /31 subnets from 172.16.0.0/16. Routing is entirely EBGP using FRR."
         )
 
@@ -7,7 +7,7 @@ from Kathara.manager.Kathara import Kathara, Machine
 from Kathara.model.Lab import Lab
 
 from llm4netlab.config import BASE_DIR
-from llm4netlab.net_env.base import NetworkEnvBase
+from llm4netlab.net_env.base import NetworkEnvBase, resolve_topo_dims
 
 cur_path = os.path.dirname(os.path.abspath(__file__))
 
@@ -72,20 +72,43 @@ class OSPFEnterpriseDHCP(NetworkEnvBase):
     TOPO_SIZE = ["s", "m", "l"]
     TAGS = ["arp", "link", "web", "icmp", "frr", "dns", "mpls", "ospf", "dhcp", "host", "mac", "http", "load_balancer"]
 
-    def __init__(self, topo_size: Literal["s", "m", "l"] = "s"):
+    # per core router
+    TOPO_PRESETS = {
+        "s": {"dists_per_core": 1, "access_per_dist": 1, "hosts_per_access": 1},
+        "m": {"dists_per_core": 2, "access_per_dist": 2, "hosts_per_access": 2},
+        "l": {"dists_per_core": 4, "access_per_dist": 4, "hosts_per_access": 4},
+    }
+
+    def __init__(
+        self,
+        topo_size: Literal["s", "m", "l"] = "s",
+        dists_per_core: int | None = None,
+        access_per_dist: int | None = None,
+        hosts_per_access: int | None = None,
+    ):
+        """The dimensions given explicitly override the ones of the topo_size preset, e.g. to scale past "l"."""
         super().__init__()
         self.lab = Lab(self.LAB_NAME)
         self.name = self.LAB_NAME
         self.instance = Kathara.get_instance()
         self.desc = "An enterprise OSPF network with multiple areas."
+        self.topo_size = topo_size
+        self.topo_dims = resolve_topo_dims(
+            topo_size,
+            self.TOPO_PRESETS,
+            dists_per_core=dists_per_core,
+            access_per_dist=access_per_dist,
+            hosts_per_access=hosts_per_access,
+        )
+        DIST_SW_COUNT = self.topo_dims["dists_per_core"]
+        ACCESS_SW_PER_DIST = self.topo_dims["access_per_dist"]
+        HOST_PER_ACCESS = self.topo_dims["hosts_per_access"]
 
-        match topo_size:
-            case "s":
-                DIST_SW_COUNT, ACCESS_SW_PER_DIST, HOST_PER_ACCESS = 1, 1, 1  # per core router
-            case "m":
-                DIST_SW_COUNT, ACCESS_SW_PER_DIST, HOST_PER_ACCESS = 2, 2, 2
-            case "l":
-                DIST_SW_COUNT, ACCESS_SW_PER_DIST, HOST_PER_ACCESS = 4, 4, 4
+        # each dist router serves 10.<core>.<dist>.0/24, whose DHCP range is .10 to .100
+        if DIST_SW_COUNT > 255:
+            raise ValueError("At most 255 dist routers per core fit the 10.<core>.<dist>.0/24 host networks.")
+        if ACCESS_SW_PER_DIST * HOST_PER_ACCESS > 91:
+            raise ValueError(f"{ACCESS_SW_PER_DIST * HOST_PER_ACCESS} hosts per dist router exceed its DHCP range.")
 
         # core layer, only core1 and core2 connect dist routers, core3 connect to server subnet
         core_routers = {}
@@ -236,7 +259,7 @@ class OSPFEnterpriseDHCP(NetworkEnvBase):
         # Now connect the layers and assign IPs and OSPF configs
         infra_pool = IPv4Network("172.16.0.0/16")
         # Create a generator of /31s
-        subnets_infra = list(infra_pool.subnets(new_prefix=31))
+        subnets_infra = infra_pool.subnets(new_prefix=31)
 
         # add links between core routers (1-2, 1-3, 2-3)
         for core_id1 in range(1, 3):
@@ -249,7 +272,7 @@ class OSPFEnterpriseDHCP(NetworkEnvBase):
                 self.lab.connect_machine_to_link(
                     core_meta2.machine.name, f"{core_meta1.machine.name}_{core_meta2.machine.name}"
                 )
-                subnet = subnets_infra.pop(0)
+                subnet = next(subnets_infra)
                 a_ip, b_ip = assign_p2p_ips(subnet)
                 core_meta1.cmd_list.append(f"ip addr add {a_ip} dev eth{core_meta1.eth_index}")
                 core_meta2.cmd_list.append(f"ip addr add {b_ip} dev eth{core_meta2.eth_index}")
@@ -276,7 +299,7 @@ class OSPFEnterpriseDHCP(NetworkEnvBase):
                 self.lab.connect_machine_to_link(
                     dist_meta.machine.name, f"{core_meta.machine.name}_{dist_meta.machine.name}"
                 )
-                subnet = subnets_infra.pop(0)
+                subnet = next(subnets_infra)
                 a_ip, b_ip = assign_p2p_ips(subnet)
                 core_meta.cmd_list.append(f"ip addr add {a_ip} dev eth{core_meta.eth_index}")
                 core_meta.eth_index += 1
@@ -414,7 +437,7 @@ class OSPFEnterpriseDHCP(NetworkEnvBase):
         self.lab.connect_machine_to_link(
             server_router_meta.machine.name, f"{core3_meta.machine.name}_{server_router_meta.machine.name}"
         )
-        subnet = subnets_infra.pop(0)
+        subnet = next(subnets_infra)
         a_ip, b_ip = assign_p2p_ips(subnet)
         core3_meta.cmd_list.append(f"ip addr add {a_ip} dev eth{core3_meta.eth_index}")
         server_router_meta.cmd_list.append(f"ip addr add {b_ip} dev eth{server_router_meta.eth_index}")
@@ -75,7 +75,7 @@ class RIPSmallInternetVPN(NetworkEnvBase):
                 raise ValueError("topo_size should be one of 's', 'm', 'l'.")
 
         # addresses between routers
-        infra_pool = list(IPv4Network("192.168.0.0/16").subnets(new_prefix=31))
+        infra_pool = IPv4Network("192.168.0.0/16").subnets(new_prefix=31)
 
         # internal routers
         internal_router_list: list[RIPRouterMeta] = []
@@ -166,7 +166,7 @@ class RIPSmallInternetVPN(NetworkEnvBase):
                 self.lab.connect_machine_to_link(r_a.machine.name, link_name)
                 self.lab.connect_machine_to_link(r_b.machine.name, link_name)
 
-                subnet = infra_pool.pop(0)
+                subnet = next(infra_pool)
                 a_ip, b_ip = assign_p2p_ips(subnet)
                 r_a.cmd_list.append(f"ip addr add {a_ip} dev eth{r_a.eth_index}")
                 r_a.eth_index += 1
@@ -181,7 +181,7 @@ class RIPSmallInternetVPN(NetworkEnvBase):
             self.lab.connect_machine_to_link(r_internal.machine.name, link_name)
             self.lab.connect_machine_to_link(r_gateway.machine.name, link_name)
 
-            subnet = infra_pool.pop(0)
+            subnet = next(infra_pool)
             a_ip, b_ip = assign_p2p_ips(subnet)
             r_internal.cmd_list.append(f"ip addr add {a_ip} dev eth{r_internal.eth_index}")
             r_internal.eth_index += 1
@@ -216,7 +216,7 @@ class RIPSmallInternetVPN(NetworkEnvBase):
             self.lab.connect_machine_to_link(ext_router.machine.name, link_name)
             self.lab.connect_machine_to_link(gateway_router_meta.machine.name, link_name)
 
-            subnet = infra_pool.pop(0)
+            subnet = next(infra_pool)
             a_ip, b_ip = assign_p2p_ips(subnet)
             ext_router.cmd_list.append(f"ip addr add {a_ip} dev eth{ext_router.eth_index}")
             ext_router.eth_index += 1
@@ -0,0 +1,323 @@
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from llm4netlab.net_env.base import NetworkEnvBase
+from llm4netlab.net_env.checkpoint import LabCheckpoint, reset_lab
+from llm4netlab.net_env.net_env_pool import get_net_env_instance
+
+if TYPE_CHECKING:
+    from llm4netlab.orchestrator.tasks.base import TaskBase
+
+""" Pool of pre-deployed lab instances, leased to benchmark runs and reset between leases """
+
+logger = logging.getLogger(__name__)
+
+DEPLOYING = "deploying"
+READY = "ready"
+LEASED = "leased"
+RESETTING = "resetting"
+
+
+@dataclass
+class PooledLab:
+    scenario_name: str
+    topo_size: str | None
+    net_env: NetworkEnvBase
+    state: str = DEPLOYING
+    leases: int = 0
+    # time.monotonic() of the current lease, and the leased time of the previous ones
+    leased_at: float | None = None
+    leased_time: float = 0.0
+    # time.monotonic() of the first time the instance was ready
+    ready_since: float | None = None
+
+    @property
+    def lab_name(self) -> str:
+        return self.net_env.lab.name
+
+
+@dataclass
+class Lease:
+    """Handle of a lease in `LabPool.leased()`, set `problem` to the problem injected on the lab to recover it."""
+
+    pooled: PooledLab
+    problem: "TaskBase | None" = None
+
+    @property
+    def lab_name(self) -> str:
+        return self.pooled.lab_name
+
+    @property
+    def net_env(self) -> NetworkEnvBase:
+        return self.pooled.net_env
+
+
+@dataclass
+class PoolMetrics:
+    lease_waits: list[float] = field(default_factory=list)
+    reset_times: list[float] = field(default_factory=list)
+    deploy_times: list[float] = field(default_factory=list)
+    # resets that did not verify against the checkpoint and ended with a redeploy
+    redeploys: int = 0
+    failures: int = 0
+
+
+def _summary(values: list[float]) -> dict:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(statistics.mean(values), 2),
+        "p50": round(statistics.median(values), 2),
+        "max": round(max(values), 2),
+    }
+
+
+class LabPool:
+    """Keep `size` deployed and converged instances of each (scenario, topo_size), under distinct lab names.
+
+    An instance is leased to one run at a time. Once released it is reset in the background, by recovering the
+    faults of the run and restoring the checkpoint captured after its deploy, or by redeploying it if the
+    restored lab does not verify, then it goes back to the pool. Instances are deployed on the first lease of a
+    (scenario, topo_size), or ahead of time with `prepare()`.
+    """
+
+    def __init__(self, size: int = 2, max_workers: int = 4, max_failures: int = 3, verify_timeout: float = 120.0):
+        self.size = size
+        self.max_failures = max_failures
+        self.verify_timeout = verify_timeout
+        self.metrics = PoolMetrics()
+        # {(scenario name, topo size): instances}
+        self._labs: dict[tuple[str, str | None], list[PooledLab]] = {}
+        self._failures: dict[tuple[str, str | None], int] = {}
+        self._next_index: dict[tuple[str, str | None], int] = {}
+        # instances reserved whose model is being built
+        self._building: dict[tuple[str, str | None], int] = {}
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="lab_pool")
+        self._created_at = time.monotonic()
+        self._closed = False
+
+    # --- instances -----------------------------------------------------------------------------------------------
+    def _reserve_lab(self, key: tuple[str, str | None]) -> str:
+        """Name of a new instance of key, counted as building until _new_lab registers it. Called with the lock."""
+        scenario_name, topo_size = key
+        index = self._next_index.get(key, 0)
+        self._next_index[key] = index + 1
+        self._building[key] = self._building.get(key, 0) + 1
+        return f"{scenario_name}_{topo_size or 'default'}_pool{index}"
+
+    def _new_lab(self, key: tuple[str, str | None], lab_name: str) -> PooledLab | None:
+        """Build the model of a reserved instance and start deploying it. Called without the lock: building or
+        renaming a large model takes seconds, and the leases must not wait for it."""
+        scenario_name, topo_size = key
+        try:
+            net_env = get_net_env_instance(scenario_name, topo_size=topo_size, lab_name=lab_name)
+        except Exception as e:
+            logger.error(f"Failed to build lab {lab_name}: {e}")
+            with self._cond:
+                self._building[key] -= 1
+                self.metrics.failures += 1
+                self._failures[key] = self._failures.get(key, 0) + 1
+                self._cond.notify_all()
+            return None
+        pooled = PooledLab(scenario_name, topo_size, net_env)
+        with self._cond:
+            self._building[key] -= 1
+            if self._closed:
+                self._cond.notify_all()
+                return None
+            self._labs.setdefault(key, []).append(pooled)
+            self._executor.submit(self._deploy, pooled)
+            self._cond.notify_all()
+        return pooled
+
+    def _deploy(self, pooled: PooledLab):
+        """Deploy an instance, or reset it if it survived a previous pool, and wait until it converged."""
+        start = time.perf_counter()
+        net_env = pooled.net_env
+        try:
+            if not (net_env.lab_exists() and reset_lab(net_env, pooled.topo_size, self.verify_timeout)):
+                net_env.undeploy()
+                net_env.deploy()
+                # the capture waits until the routing converged, it is the readiness check of the instance
+                LabCheckpoint.capture(net_env, pooled.topo_size).save()
+        except Exception as e:
+            self._drop(pooled, e)
+            return
+        self.metrics.deploy_times.append(time.perf_counter() - start)
+        logger.info(f"Lab {pooled.lab_name} ready in {time.perf_counter() - start:.1f}s")
+        self._set_ready(pooled)
+
+    def _reset(self, pooled: PooledLab, problem: "TaskBase | None" = None):
+        """Bring a released instance back to its checkpoint, redeploying it if the restore does not verify."""
+        start = time.perf_counter()
+        net_env = pooled.net_env
+        try:
+            if problem is not None:
+                # recovering the faults first leaves less to restore
+                try:
+                    problem.recover_fault()
+                except Exception as e:
+                    logger.warning(f"Failed to recover the faults on lab {pooled.lab_name}: {e}")
+            if not reset_lab(net_env, pooled.topo_size, self.verify_timeout):
+                self.metrics.redeploys += 1
+                net_env.undeploy()
+                net_env.deploy()
+                LabCheckpoint.capture(net_env, pooled.topo_size).save()
+        except Exception as e:
+            self._drop(pooled, e)
+            return
+        self.metrics.reset_times.append(time.perf_counter() - start)
+        self._set_ready(pooled)
+
+    def _set_ready(self, pooled: PooledLab):
+        with self._cond:
+            pooled.state = READY
+            if pooled.ready_since is None:
+                pooled.ready_since = time.monotonic()
+            self._failures[(pooled.scenario_name, pooled.topo_size)] = 0
+            self._cond.notify_all()
+
+    def _drop(self, pooled: PooledLab, error: Exception):
+        """Remove a broken instance and deploy a replacement, until max_failures in a row."""
+        key = (pooled.scenario_name, pooled.topo_size)
+        logger.error(f"Lab {pooled.lab_name} failed, removing it from the pool: {error}")
+        try:
+            pooled.net_env.undeploy()
+        except Exception:
+            pass
+        replacement = None
+        with self._cond:
+            self.metrics.failures += 1
+            self._labs[key].remove(pooled)
+            self._failures[key] = self._failures.get(key, 0) + 1
+            if self._failures[key] < self.max_failures:
+                if not self._closed:
+                    replacement = self._reserve_lab(key)
+            elif self._failures[key] == self.max_failures:
+                logger.error(f"Giving up replenishing the pool of {key} after {self._failures[key]} failures")
+            self._cond.notify_all()
+        if replacement is not None:
+            self._new_lab(key, replacement)
+
+    # --- leases --------------------------------------------------------------------------------------------------
+    def prepare(self, scenario_name: str, topo_size: str | None = None):
+        """Start deploying the instances of (scenario, topo_size) in the background, if not done yet."""
+        key = (scenario_name, topo_size)
+        with self._cond:
+            lab_names = []
+            while (
+                len(self._labs.get(key, [])) + self._building.get(key, 0) < self.size
+                and self._failures.get(key, 0) < self.max_failures
+            ):
+                lab_names.append(self._reserve_lab(key))
+        for lab_name in lab_names:
+            self._new_lab(key, lab_name)
+
+    def lease(self, scenario_name: str, topo_size: str | None = None, timeout: float | None = None) -> PooledLab:
+        """Wait for a ready instance of (scenario, topo_size) and lease it.
+
+        Raises:
+            TimeoutError: If no instance got ready within timeout seconds, or the pool gave up deploying them.
+        """
+        key = (scenario_name, topo_size)
+        self.prepare(scenario_name, topo_size)
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                ready = [pooled for pooled in self._labs.get(key, []) if pooled.state == READY]
+                if ready:
+                    break
+                if not self._labs.get(key) and not self._building.get(key):
+                    raise TimeoutError(f"No instance of {key} could be deployed")
+                remaining = None if timeout is None else timeout - (time.monotonic() - start)
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No instance of {key} got ready within {timeout}s")
+                self._cond.wait(remaining)
+            # the least used instance first, so that the wear spreads over the pool
+            pooled = min(ready, key=lambda pooled: pooled.leases)
+            pooled.state = LEASED
+            pooled.leases += 1
+            pooled.leased_at = time.monotonic()
+            self.metrics.lease_waits.append(pooled.leased_at - start)
+        logger.info(f"Leased lab {pooled.lab_name} after waiting {pooled.leased_at - start:.1f}s")
+        return pooled
+
+    def release(self, pooled: PooledLab, problem: "TaskBase | None" = None):
+        """Return a leased instance, it is reset in the background before its next lease.
+
+        Args:
+            problem: The problem injected during the lease, its faults are recovered before the checkpoint restore.
+        """
+        with self._cond:
+            if pooled.state != LEASED:
+                raise ValueError(f"Lab {pooled.lab_name} is not leased")
+            pooled.state = RESETTING
+            pooled.leased_time += time.monotonic() - pooled.leased_at
+            pooled.leased_at = None
+        self._executor.submit(self._reset, pooled, problem)
+
+    @contextmanager
+    def leased(self, scenario_name: str, topo_size: str | None = None, timeout: float | None = None):
+        """Lease an instance for the duration of a with block, the problem set on the yielded Lease is recovered."""
+        lease = Lease(self.lease(scenario_name, topo_size, timeout))
+        try:
+            yield lease
+        finally:
+            self.release(lease.pooled, lease.problem)
+
+    # --- metrics -------------------------------------------------------------------------------------------------
+    def stats(self) -> dict:
+        """Lease wait, reset and deploy times in seconds, and the share of the ready time the instances were leased."""
+        now = time.monotonic()
+        with self._cond:
+            labs = [pooled for labs in self._labs.values() for pooled in labs]
+            available = sum(now - pooled.ready_since for pooled in labs if pooled.ready_since is not None)
+            leased = sum(
+                pooled.leased_time + (now - pooled.leased_at if pooled.leased_at is not None else 0) for pooled in labs
+            )
+            states = {}
+            for pooled in labs:
+                states[pooled.state] = states.get(pooled.state, 0) + 1
+            return {
+                "instances": len(labs),
+                "states": states,
+                "leases": sum(pooled.leases for pooled in labs),
+                "lease_wait": _summary(self.metrics.lease_waits),
+                "reset_time": _summary(self.metrics.reset_times),
+                "deploy_time": _summary(self.metrics.deploy_times),
+                "redeploys": self.metrics.redeploys,
+                "failures": self.metrics.failures,
+                "utilization": round(leased / available, 3) if available else 0.0,
+                "uptime": round(now - self._created_at, 1),
+            }
+
+    def shutdown(self, undeploy: bool = True):
+        """Wait for the pending deploys and resets, then undeploy all the instances."""
+        with self._cond:
+            self._closed = True
+        self._executor.shutdown(wait=True)
+        logger.info(f"Lab pool stats: {self.stats()}")
+        if undeploy:
+            for labs in self._labs.values():
+                for pooled in labs:
+                    pooled.net_env.undeploy()
+            self._labs.clear()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    pool = LabPool(size=2)
+    pool.prepare("ospf_enterprise_static", "s")
+    for _ in range(3):
+        with pool.leased("ospf_enterprise_static", "s") as lease:
+            print(lease.lab_name, lease.net_env.hosts)
+    print(pool.stats())
+    pool.shutdown()
@@ -0,0 +1,148 @@
+import copy
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+from functools import lru_cache
+
+from Kathara.manager.Kathara import Kathara
+from Kathara.model.Lab import Lab
+
+from llm4netlab.config import BASE_DIR
+from llm4netlab.net_env.base import NetworkEnvBase
+
+""" On-disk cache of built lab models, to skip the topology generation of known labs """
+
+logger = logging.getLogger(__name__)
+
+MODEL_CACHE_DIR = os.path.join(BASE_DIR, "runtime", "lab_models") if BASE_DIR else None
+NET_ENV_DIR = os.path.dirname(os.path.abspath(__file__))
+# shared by all the labs: base class, cache format, configuration templates
+SHARED_SOURCES = [
+    os.path.join(NET_ENV_DIR, "base.py"),
+    os.path.abspath(__file__),
+    os.path.join(NET_ENV_DIR, "utils"),
+]
+_FORMAT_VERSION = 1
+
+
+def _walk_files(path: str):
+    if os.path.isfile(path):
+        yield path
+        return
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+        for filename in sorted(filenames):
+            yield os.path.join(dirpath, filename)
+
+
+@lru_cache(maxsize=None)
+def source_hash(net_env_cls: type) -> str:
+    """Hash of everything a lab model is generated from: the package of the lab class and the shared sources."""
+    digest = hashlib.sha256()
+    for root in [os.path.dirname(inspect.getfile(net_env_cls)), *SHARED_SOURCES]:
+        for path in _walk_files(root):
+            digest.update(os.path.relpath(path, NET_ENV_DIR).encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _cache_path(scenario_name: str, arguments: tuple, net_env_cls: type) -> str:
+    key = json.dumps([_FORMAT_VERSION, scenario_name, arguments, source_hash(net_env_cls)], default=str)
+    return os.path.join(MODEL_CACHE_DIR, f"{scenario_name}-{hashlib.sha256(key.encode()).hexdigest()[:16]}.pkl")
+
+
+def dump_model(net_env: NetworkEnvBase) -> dict:
+    """Plain-data snapshot of a built network environment: lab files, machines, links and attributes."""
+    lab = net_env.lab
+    files = {path: lab.fs.readbytes(path) for path in lab.fs.walk.files()}
+    machines = [
+        (
+            name,
+            copy.deepcopy(machine.meta),
+            [
+                (num, interface.link.name, interface.mac_address) if interface is not None else (num, None, None)
+                for num, interface in machine.interfaces.items()
+            ],
+        )
+        for name, machine in lab.machines.items()
+    ]
+    lab_attributes = {
+        key: getattr(lab, key)
+        for key in ("description", "version", "author", "email", "web", "general_options", "global_machine_metadata")
+    }
+    attributes = {key: value for key, value in vars(net_env).items() if key not in ("lab", "instance")}
+    return {
+        "lab_name": lab.name,
+        "lab_attributes": lab_attributes,
+        "files": files,
+        "machines": machines,
+        "attributes": attributes,
+    }
+
+
+def load_model(net_env_cls: type, model: dict) -> NetworkEnvBase:
+    """Rebuild a network environment from dump_model() without running its constructor."""
+    lab = Lab(model["lab_name"])
+    for key, value in model["lab_attributes"].items():
+        setattr(lab, key, value)
+    # the files go first, so that each machine finds its directory when it is created
+    for path, content in model["files"].items():
+        lab.fs.makedirs(os.path.dirname(path), recreate=True)
+        lab.fs.writebytes(path, content)
+    for name, meta, interfaces in model["machines"]:
+        machine = lab.new_machine(name)
+        machine.meta = meta
+        for num, link_name, mac_address in interfaces:
+            if link_name is None:
+                # interface disconnected from the running machine, the next ones keep their numbers
+                machine.interfaces[num] = None
+                continue
+            lab.connect_machine_to_link(name, link_name, machine_iface_number=num, mac_address=mac_address)
+
+    net_env = net_env_cls.__new__(net_env_cls)
+    net_env.__dict__.update(model["attributes"])
+    net_env.lab = lab
+    net_env.instance = Kathara.get_instance()
+    return net_env
+
+
+def rename_net_env(net_env: NetworkEnvBase, lab_name: str) -> NetworkEnvBase:
+    """Copy of a network environment whose lab is named lab_name, to deploy several instances side by side."""
+    model = dump_model(net_env)
+    model["lab_name"] = lab_name
+    model["attributes"]["name"] = lab_name
+    return load_model(type(net_env), model)
+
+
+def load_or_build(scenario_name: str, net_env_cls: type, arguments: tuple) -> NetworkEnvBase:
+    """Load the lab model of (scenario, arguments) from the cache, or build it and store it.
+
+    The cache entry is keyed by the scenario, the constructor arguments (e.g. topo_size) and the hash of the
+    sources the model is generated from, so editing a lab class or a template invalidates it.
+    """
+    if MODEL_CACHE_DIR is None:
+        return net_env_cls(**dict(arguments))
+    path = _cache_path(scenario_name, arguments, net_env_cls)
+    if os.path.exists(path):
+        try:
+            with open(path, "rb") as f:
+                return load_model(net_env_cls, pickle.load(f))
+        except Exception as e:
+            logger.warning(f"Failed to load the cached lab model {path}, rebuilding it: {e}")
+
+    net_env = net_env_cls(**dict(arguments))
+    try:
+        data = pickle.dumps(dump_model(net_env))
+    except Exception as e:
+        logger.debug(f"Lab model of {scenario_name} cannot be cached: {e}")
+        return net_env
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return net_env
@@ -1,3 +1,6 @@
+import inspect
+import logging
+import threading
 from typing import Dict
 
 from llm4netlab.net_env.base import NetworkEnvBase
@@ -6,6 +9,7 @@ from llm4netlab.net_env.data_center_routing.dc_clos_bgp.lab_workers import DCClo
 from llm4netlab.net_env.intradomain_routing.ospf_enterprise.lab_dhcp import OSPFEnterpriseDHCP
 from llm4netlab.net_env.intradomain_routing.ospf_enterprise.lab_static import OSPFEnterpriseStatic
 from llm4netlab.net_env.intradomain_routing.rip_vpn.lab import RIPSmallInternetVPN
+from llm4netlab.net_env.model_cache import load_or_build, rename_net_env
 from llm4netlab.net_env.p4.p4_bloom_filter.lab import P4BloomFilter
 from llm4netlab.net_env.p4.p4_counter.lab import P4Counter
 from llm4netlab.net_env.p4.p4_int.lab import P4INT
@@ -27,12 +31,42 @@ _NET_ENVS: Dict[str, NetworkEnvBase] = {
     P4_MPLS.LAB_NAME: P4_MPLS,
 }
 
+logger = logging.getLogger(__name__)
 
-def get_net_env_instance(scenario_name: str, **kwargs) -> NetworkEnvBase:
+# {(scenario name, constructor arguments): network environment}, and {(that key, lab name): renamed copy},
+# shared by all the problems of the process
+_NET_ENV_CACHE: Dict[tuple, NetworkEnvBase] = {}
+_NET_ENV_CACHE_LOCK = threading.Lock()
+
+
+def _cache_key(scenario_name: str, kwargs: dict) -> tuple:
+    """Key of a network environment, with the constructor defaults applied so that `topo_size="s"` and no
+    topo_size give the same model."""
+    signature = inspect.signature(_NET_ENVS[scenario_name])
+    bound = signature.bind(**kwargs)
+    bound.apply_defaults()
+    arguments = {}
+    for name, value in bound.arguments.items():
+        if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+            arguments.update(value)
+        else:
+            arguments[name] = value
+    return scenario_name, tuple(sorted(arguments.items()))
+
+
+def get_net_env_instance(
+    scenario_name: str, use_cache: bool = True, lab_name: str | None = None, **kwargs
+) -> NetworkEnvBase:
     """Get an instance of the specified network environment.
 
+    Building the model of a large lab (machines, links, generated configurations) is expensive, and every
+    problem and sub-fault asks for it, so the instances are memoized per process, and the models are cached on
+    disk across processes (see model_cache). They describe the lab and must be treated as read-only.
+
     Args:
         scenario_name: The name of the network environment.
+        use_cache: Return the instance already built with the same arguments, if any, otherwise build it.
+        lab_name: Name of the lab, when it is not the scenario name, e.g. an instance of a LabPool.
 
     Returns:
         An instance of the specified network environment.
@@ -42,7 +76,26 @@ def get_net_env_instance(scenario_name: str, **kwargs) -> NetworkEnvBase:
     """
     if scenario_name not in _NET_ENVS:
         raise ValueError(f"Network environment '{scenario_name}' not found in the pool.")
-    return _NET_ENVS[scenario_name](**kwargs)
+    if not use_cache:
+        net_env = _NET_ENVS[scenario_name](**kwargs)
+        return rename_net_env(net_env, lab_name) if lab_name and lab_name != net_env.name else net_env
+    key = _cache_key(scenario_name, kwargs)
+    with _NET_ENV_CACHE_LOCK:
+        if key not in _NET_ENV_CACHE:
+            logger.debug(f"Building network environment {key}")
+            _NET_ENV_CACHE[key] = load_or_build(scenario_name, _NET_ENVS[scenario_name], key[1])
+        net_env = _NET_ENV_CACHE[key]
+        if not lab_name or lab_name == net_env.name:
+            return net_env
+        if (key, lab_name) not in _NET_ENV_CACHE:
+            _NET_ENV_CACHE[(key, lab_name)] = rename_net_env(net_env, lab_name)
+        return _NET_ENV_CACHE[(key, lab_name)]
+
+
+def clear_net_env_cache():
+    """Forget the memoized network environments, e.g. after their sources changed."""
+    with _NET_ENV_CACHE_LOCK:
+        _NET_ENV_CACHE.clear()
 
 
 def list_all_net_envs() -> dict[str, NetworkEnvBase]:
@@ -0,0 +1,101 @@
+import argparse
+import json
+import time
+import tracemalloc
+
+from int_collector import FlowTable, INTCollector
+from int_parser import parse_report
+from int_replay import InMemoryInfluxDB, generate_reports, replay
+
+""" Throughput benchmark of the INT collection pipeline on synthetic reports """
+
+HOP_COUNTS = [1, 2, 4, 6]
+# (instruction_mask_0003, instruction_mask_0407)
+INSTRUCTION_BITMAPS = [
+    (0b1000, 0b0000),  # node id only
+    (0b1010, 0b0000),  # node id + hop latency
+    (0b1111, 0b0000),
+    (0b1111, 0b1111),  # everything, as configured in cmds/leaf1.txt
+]
+
+
+def _per_report_us(elapsed_ns: int, count: int) -> float:
+    return round(elapsed_ns / count / 1000, 3)
+
+
+def bench_case(hops: int, masks: tuple[int, int], reports: int, flows: int, batch_size: int) -> dict:
+    frames = generate_reports(reports, hops, masks[0], masks[1], flows=flows)
+
+    # stage 1: parse
+    start = time.perf_counter_ns()
+    parsed = [parse_report(frame) for frame in frames]
+    parse_ns = time.perf_counter_ns() - start
+
+    # stage 2: aggregate
+    flow_table = FlowTable()
+    now = time.monotonic()
+    start = time.perf_counter_ns()
+    for report in parsed:
+        flow_table.update(report, now)
+    aggregate_ns = time.perf_counter_ns() - start
+
+    # stage 3: build and write the interval summary
+    stand_in = InMemoryInfluxDB()
+    collector = INTCollector("bench", client=stand_in)
+    collector.flow_table = flow_table
+    start = time.perf_counter_ns()
+    collector.export_interval_summary(now)
+    export_ns = time.perf_counter_ns() - start
+
+    # end to end, exporting one interval per 10 batches
+    collector = INTCollector("bench", client=InMemoryInfluxDB())
+    e2e = replay(collector, frames, batch_size=batch_size, export_every=10)
+
+    # memory of the end-to-end run
+    collector = INTCollector("bench", client=InMemoryInfluxDB())
+    tracemalloc.start()
+    replay(collector, frames, batch_size=batch_size, export_every=10)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "hops": hops,
+        "instruction_mask_0003": masks[0],
+        "instruction_mask_0407": masks[1],
+        "reports": reports,
+        "reports_per_sec": round(e2e["reports_per_sec"]),
+        "parse_us": _per_report_us(parse_ns, reports),
+        "aggregate_us": _per_report_us(aggregate_ns, reports),
+        "export_us": _per_report_us(export_ns, reports),
+        "export_points": sum(len(lines) for lines in stand_in.lines.values()),
+        "peak_mem_kb": round(peak / 1024, 1),
+    }
+
+
+def run_benchmark(reports: int, flows: int, batch_size: int) -> list[dict]:
+    results = []
+    header = f"{'hops':>4} {'mask':>9} {'reports/s':>10} {'parse_us':>9} {'aggr_us':>8} {'export_us':>9} {'peak_kb':>9}"
+    print(header)
+    for hops in HOP_COUNTS:
+        for masks in INSTRUCTION_BITMAPS:
+            res = bench_case(hops, masks, reports, flows, batch_size)
+            results.append(res)
+            print(
+                f"{hops:>4} {masks[0]:04b}/{masks[1]:04b} {res['reports_per_sec']:>10} {res['parse_us']:>9} "
+                f"{res['aggregate_us']:>8} {res['export_us']:>9} {res['peak_mem_kb']:>9}"
+            )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the INT collection pipeline")
+    parser.add_argument("--reports", type=int, default=20000, help="Reports per case")
+    parser.add_argument("--flows", type=int, default=16)
+    parser.add_argument("--batch_size", type=int, default=256)
+    parser.add_argument("--json", type=str, default=None, help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.reports, args.flows, args.batch_size)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
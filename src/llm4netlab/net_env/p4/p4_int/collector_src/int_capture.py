@@ -0,0 +1,172 @@
+import ctypes
+import select
+import socket
+import struct
+import time
+
+from int_defines import *
+
+""" Raw AF_PACKET capture of INT telemetry reports, filtered in the kernel """
+
+ETH_P_ALL = 0x0003
+SO_ATTACH_FILTER = 26
+SOL_PACKET = 263
+PACKET_STATISTICS = 6
+PACKET_IGNORE_OUTGOING = 23
+
+_SOCK_FILTER = struct.Struct("HBBI")
+_TPACKET_STATS = struct.Struct("II")
+
+
+def build_report_filter(report_port: int = INT_REPORT_UDP_PORT) -> list[tuple[int, int, int, int]]:
+    """Classic BPF program accepting unfragmented IPv4/UDP frames to the report port (`udp dst port <port>`)."""
+    return [
+        (0x28, 0, 0, 12),  # ldh [12]                 ethertype
+        (0x15, 0, 8, 0x0800),  # jeq #0x800            IPv4, else drop
+        (0x30, 0, 0, 23),  # ldb [23]                 ip proto
+        (0x15, 0, 6, UDP_PROTO),  # jeq #17           UDP, else drop
+        (0x28, 0, 0, 20),  # ldh [20]                 flags + fragment offset
+        (0x45, 4, 0, 0x1FFF),  # jset #0x1fff          fragment, drop
+        (0xB1, 0, 0, 14),  # ldxb 4*([14]&0xf)        ip header length
+        (0x48, 0, 0, 16),  # ldh [x + 16]             udp dst port
+        (0x15, 0, 1, report_port),  # jeq #port
+        (0x06, 0, 0, 0x40000),  # ret #262144          accept
+        (0x06, 0, 0, 0),  # ret #0                     drop
+    ]
+
+
+class CaptureStats:
+    __slots__ = ("captured", "kernel_received", "kernel_dropped", "batches")
+
+    def __init__(self):
+        self.captured = 0
+        self.kernel_received = 0
+        self.kernel_dropped = 0
+        self.batches = 0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RawSocketCapture:
+    """Read telemetry report frames from an AF_PACKET socket in batches.
+
+    Frames are received into preallocated buffers and handed to the handler as memoryviews,
+    which are only valid until the handler returns.
+    """
+
+    def __init__(
+        self,
+        iface: str = "eth0",
+        report_port: int = INT_REPORT_UDP_PORT,
+        batch_size: int = 256,
+        snaplen: int = 2048,
+        rcvbuf: int = 32 * 1024 * 1024,
+    ):
+        self.iface = iface
+        self.report_port = report_port
+        self.batch_size = batch_size
+        self.snaplen = snaplen
+        self.rcvbuf = rcvbuf
+        self.stats = CaptureStats()
+        self.sock = None
+        self._running = False
+        self._bpf = None
+        self._buffers = [bytearray(snaplen) for _ in range(batch_size)]
+        self._views = [memoryview(buf) for buf in self._buffers]
+
+    def open(self):
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        # attach the filter before binding so that no unfiltered frame is queued
+        program = build_report_filter(self.report_port)
+        self._bpf = ctypes.create_string_buffer(b"".join(_SOCK_FILTER.pack(*insn) for insn in program))
+        sock.setsockopt(
+            socket.SOL_SOCKET, SO_ATTACH_FILTER, struct.pack("HL", len(program), ctypes.addressof(self._bpf))
+        )
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUFFORCE, self.rcvbuf)
+        except (AttributeError, PermissionError):
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.rcvbuf)
+        try:
+            sock.setsockopt(SOL_PACKET, PACKET_IGNORE_OUTGOING, 1)
+        except OSError:
+            pass  # kernel < 4.20
+        sock.bind((self.iface, ETH_P_ALL))
+        sock.setblocking(False)
+        self.sock = sock
+        return self
+
+    def close(self):
+        if self.sock is not None:
+            self.update_stats()
+            self.sock.close()
+            self.sock = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def read_batch(self) -> list[memoryview]:
+        """Drain up to batch_size frames that are already queued, without blocking."""
+        frames = []
+        recv_into = self.sock.recv_into
+        for view in self._views:
+            try:
+                nbytes = recv_into(view)
+            except BlockingIOError:
+                break
+            frames.append(view[:nbytes])
+        if frames:
+            self.stats.captured += len(frames)
+            self.stats.batches += 1
+        return frames
+
+    def update_stats(self) -> CaptureStats:
+        """Fold the kernel socket counters (reset on every read) into the capture stats."""
+        packets, drops = _TPACKET_STATS.unpack(self.sock.getsockopt(SOL_PACKET, PACKET_STATISTICS, _TPACKET_STATS.size))
+        self.stats.kernel_received += packets
+        self.stats.kernel_dropped += drops
+        return self.stats
+
+    def stop(self):
+        self._running = False
+
+    def run(self, handler, poll_timeout_ms: int = 200, stats_interval: float = 10.0, on_stats=None, on_tick=None):
+        """Capture until stop() is called, passing each batch of frames to handler(frames).
+
+        on_tick() is called after every poll, also when no frame arrived, for periodic work of the consumer.
+        """
+        if self.sock is None:
+            self.open()
+        poller = select.poll()
+        poller.register(self.sock, select.POLLIN)
+        next_stats = time.monotonic() + stats_interval
+        self._running = True
+        try:
+            while self._running:
+                if poller.poll(poll_timeout_ms):
+                    frames = self.read_batch()
+                    while frames:
+                        handler(frames)
+                        if len(frames) < self.batch_size:
+                            break
+                        frames = self.read_batch()
+                if on_tick is not None:
+                    on_tick()
+                if time.monotonic() >= next_stats:
+                    stats = self.update_stats()
+                    if on_stats is not None:
+                        on_stats(stats)
+                    next_stats += stats_interval
+        finally:
+            self.close()
+
+
+if __name__ == "__main__":
+    # Count reports arriving on the collector interface, without parsing them.
+    def print_stats(stats: CaptureStats):
+        print("INT capture: ", stats.to_dict(), flush=True)
+
+    RawSocketCapture("eth0").run(lambda frames: None, on_stats=print_stats)
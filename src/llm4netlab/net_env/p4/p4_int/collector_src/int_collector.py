@@ -1,268 +1,492 @@
-from datetime import datetime
-
-from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS
-from int_defines import *
-from int_headers import *
-from scapy.all import raw, sniff
-from scapy.layers.inet import IP, UDP
-from scapy.layers.l2 import Ether
-from scapy.packet import Raw
-
-token = "int_token"
-org = "int_org"
-bucket = "int_bucket"
-
-
-class FlowKey:
-    def __init__(self, src_ip="", dst_ip="", ip_proto="", src_port="", dst_port=""):
-        self.src_ip = src_ip
-        self.dst_ip = dst_ip
-        self.ip_proto = ip_proto
-        self.src_port = src_port
-        self.dst_port = dst_port
-
-
-class FlowInfo:
-    def __init__(self):
-        self.src_ip = ""
-        self.dst_ip = ""
-        self.ip_proto = ""
-        self.src_port = ""
-        self.dst_port = ""
-        self.int_hop_num = 0
-        self.flow_sink_time = ""
-        self.sw_ids = []
-        self.l1_in_port_ids = []
-        self.l1_e_port_ids = []
-        self.hop_latencies = []
-        self.flow_latency = 0
-        self.queue_ids = []
-        self.queue_occups = []
-        self.ingr_times = []
-        self.egr_times = []
-        self.l2_in_port_ids = []
-        self.l2_e_port_ids = []
-        self.tx_utilizes = []
-
-
-class FlowTable:
-    def __init__(self):
-        # [{FlowKey: FlowInfo}]
-        self.flow_table = {}
-
-    def lookup_flow_info(self, flow_key: FlowKey):
-        if self.flow_table[flow_key]:
-            return self.flow_table[flow_key]
-        else:
-            return None
-
-
-class INTCollector:
-    def __init__(self, sw_name):
-        self.sw_name = sw_name
-        self.flow_table = FlowTable()
-
-    def recv_msg_cpu(self, packet):
-        # packet.show()
-        pkt = raw(packet)
-        info = {}
-        info["rec_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
-
-        # parse outer headers
-        eth_report = Ether(pkt[0:ETHERNET_HEADER_LENGTH])
-        # eth_report.show()
-        ip_report = IP(pkt[OUTER_IP_HEADER : OUTER_IP_HEADER + IP_HEADER_LENGTH])
-        # ip_report.show()
-        udp_report = UDP(pkt[OUTER_L4_HEADER_OFFSET : OUTER_L4_HEADER_OFFSET + UDP_HEADER_LENGTH])
-        # udp_report.show()
-
-        # parse report header
-        raw_payload = bytes(packet[Raw])  # to get 'raw' payload
-        telemetry_report = TelemetryReport(raw_payload[0:INT_REPORT_HEADER_LENGTH])
-        # telemetry_report.show()
-
-        # parse inner headers
-        inner_eth = Ether(raw_payload[INNER_ETHERNET_OFFSET : INNER_ETHERNET_OFFSET + ETHERNET_HEADER_LENGTH])
-        # inner_eth.show()
-        inner_ip = IP(raw_payload[INNER_IP_HEADER_OFFSET : INNER_IP_HEADER_OFFSET + IP_HEADER_LENGTH])
-        # inner_ip.show()
-        # check if it's the int packets
-        if inner_ip.tos != INT_IPv4_DSCP or inner_ip.proto != UDP_PROTO:
-            return
-        inner_udp = UDP(raw_payload[INNER_L4_HEADER_OFFSET : INNER_L4_HEADER_OFFSET + UDP_HEADER_LENGTH])
-        # inner_udp.show()
-
-        # parse int headers
-        int_shim_offset = INT_SHIM_OFFSET
-        int_shim_offset += UDP_HEADER_LENGTH
-        int_meta_offset = int_shim_offset + INT_SHIM_LENGTH
-        # print("SHIM OFFSET: "+str(int_shim_offset))
-        int_shim = INTShim(raw_payload[int_shim_offset : int_shim_offset + INT_SHIM_LENGTH])
-        # int_shim.show()
-        int_meta = INTMeta(raw_payload[int_meta_offset : int_meta_offset + INT_META_LENGTH])
-        # int_meta.show()
-
-        # parse int metadata stack
-        int_metadata_stack_offset = int_meta_offset + INT_META_LENGTH
-        int_metadata_stack_length = (int_shim.len - INT_SHIM_WORD_LENGTH - INT_META_WORD_LENGTH) * 4
-        stack_payload = raw_payload[int_metadata_stack_offset : int_metadata_stack_offset + int_metadata_stack_length]
-
-        # hop_m_len：per-hop metadata length, set by the source for transit and sink
-        hop_m_len = int_meta.hop_metadata_len * 4
-        int_hop_num = int(int_metadata_stack_length / hop_m_len)
-
-        flow_info = FlowInfo()
-        # record basic info into flow_info
-        flow_info.src_ip = inner_ip.src
-        flow_info.dst_ip = inner_ip.dst
-        flow_info.ip_proto = inner_ip.proto
-        flow_info.src_port = inner_udp.sport
-        flow_info.dst_port = inner_udp.dport
-        flow_info.int_hop_num = int_hop_num
-        flow_info.flow_sink_time = telemetry_report.ingress_tstamp
-
-        # parse the instruction bitmaps
-        is_l1_in_e_port_ids = bool(int_meta.instruction_mask_0003 & 0b0100)
-        is_hop_latencies = bool(int_meta.instruction_mask_0003 & 0b0010)
-        is_queue_occups = bool(int_meta.instruction_mask_0003 & 0b0001)
-        is_ingr_times = bool(int_meta.instruction_mask_0407 & 0b1000)
-        is_egr_times = bool(int_meta.instruction_mask_0407 & 0b0100)
-        is_l2_in_e_port_ids = bool(int_meta.instruction_mask_0407 & 0b0010)
-        is_tx_utilizes = bool(int_meta.instruction_mask_0407 & 0b0001)
-
-        # start to parse each hop metadata stack
-        for hop_index in range(0, int_hop_num):
-            # cut the current hop metadata stack
-            cur_offset = hop_index * hop_m_len
-
-            # parse per-hop metadata field
-            flow_info.sw_ids.append(INTNodeID(stack_payload[cur_offset : cur_offset + len(INTNodeID())]).node_id)
-            cur_offset += len(INTNodeID())
-            if is_l1_in_e_port_ids:
-                flow_info.l1_in_port_ids.append(
-                    INTLevel1InterfaceIDs(
-                        stack_payload[cur_offset : cur_offset + len(INTLevel1InterfaceIDs())]
-                    ).l1_ingress_interface_id
-                )
-                flow_info.l1_e_port_ids.append(
-                    INTLevel1InterfaceIDs(
-                        stack_payload[cur_offset : cur_offset + len(INTLevel1InterfaceIDs())]
-                    ).l1_egress_interface_id
-                )
-                cur_offset += len(INTLevel1InterfaceIDs())
-            if is_hop_latencies:
-                flow_info.hop_latencies.append(
-                    INTHopLatency(stack_payload[cur_offset : cur_offset + len(INTHopLatency())]).hop_latency
-                )
-
-                flow_info.flow_latency += INTHopLatency(
-                    stack_payload[cur_offset : cur_offset + len(INTHopLatency())]
-                ).hop_latency
-                cur_offset += len(INTHopLatency())
-            if is_queue_occups:
-                flow_info.queue_ids.append(
-                    INTQueueOccupancy(stack_payload[cur_offset : cur_offset + len(INTQueueOccupancy())]).q_id
-                )
-                flow_info.queue_occups.append(
-                    INTQueueOccupancy(stack_payload[cur_offset : cur_offset + len(INTQueueOccupancy())]).q_occupancy
-                )
-                cur_offset += len(INTQueueOccupancy())
-            if is_ingr_times:
-                flow_info.ingr_times.append(
-                    INTIngressTstamp(
-                        stack_payload[cur_offset : cur_offset + len(INTIngressTstamp())]
-                    ).ingress_global_timestamp
-                )
-                cur_offset += len(INTIngressTstamp())
-            if is_egr_times:
-                flow_info.egr_times.append(
-                    INTEgressTstamp(
-                        stack_payload[cur_offset : cur_offset + len(INTEgressTstamp())]
-                    ).egress_global_timestamp
-                )
-                cur_offset += len(INTEgressTstamp())
-            if is_l2_in_e_port_ids:
-                flow_info.l2_in_port_ids.append(
-                    INTLevel2InterfaceIDs(
-                        stack_payload[cur_offset : cur_offset + len(INTLevel2InterfaceIDs())]
-                    ).l2_ingress_interface_id
-                )
-                flow_info.l2_e_port_ids.append(
-                    INTLevel2InterfaceIDs(
-                        stack_payload[cur_offset : cur_offset + len(INTLevel2InterfaceIDs())]
-                    ).l2_egress_interface_id
-                )
-                cur_offset += len(INTLevel2InterfaceIDs())
-            if is_tx_utilizes:
-                flow_info.tx_utilizes.append(
-                    INTEgressInterfaceTxUtil(
-                        stack_payload[cur_offset : cur_offset + len(INTEgressInterfaceTxUtil())]
-                    ).egress_interface_tx_util
-                )
-                cur_offset += len(INTEgressInterfaceTxUtil())
-        print("INT data: ", flow_info.__dict__)
-
-        # record into influxdb
-        with InfluxDBClient(url="http://localhost:8086", token=token, org=org) as client:
-            write_api = client.write_api(write_options=SYNCHRONOUS)
-            # write flow latency and flow path
-            if is_hop_latencies:
-                path_str = ":".join(str(flow_info.sw_ids[i]) for i in reversed(range(0, int_hop_num)))
-                p = (
-                    Point("flow_stat")
-                    .tag("src_ip", flow_info.src_ip)
-                    .tag("dst_ip", flow_info.dst_ip)
-                    .tag("ip_proto", flow_info.ip_proto)
-                    .tag("src_port", flow_info.src_port)
-                    .tag("dst_port", flow_info.dst_port)
-                    .field("flow_latency", flow_info.flow_latency)
-                    .field("flow_path", path_str)
-                )
-                # .time(flow_info.flow_sink_time)
-                write_api.write(bucket=bucket, org=org, record=p)
-
-                # write hop latency
-                for i in range(0, int_hop_num):
-                    p = (
-                        Point("flow_hop_latency")
-                        .tag("src_ip", flow_info.src_ip)
-                        .tag("dst_ip", flow_info.dst_ip)
-                        .tag("ip_proto", flow_info.ip_proto)
-                        .tag("src_port", flow_info.src_port)
-                        .tag("dst_port", flow_info.dst_port)
-                        .tag("sw_id", flow_info.sw_ids[i])
-                        .field("hop_latency", flow_info.hop_latencies[i])
-                    )
-                    # .time('%s' % flow_info.egr_times[i] if is_egr_times else '')
-                    write_api.write(bucket=bucket, org=org, record=p)
-
-            # write tx utilize
-            for i in range(0, int_hop_num):
-                p = (
-                    Point("port_tx_utilization")
-                    .tag("sw_id", flow_info.sw_ids[i])
-                    .tag("egress_id", flow_info.l1_e_port_ids[i])
-                    .field("tx_utilization", flow_info.tx_utilizes[i])
-                )
-                # .time('%s' % flow_info.egr_times[i] if is_egr_times else '')
-                write_api.write(bucket=bucket, org=org, record=p)
-
-            # write queue occupancy
-            for i in range(0, int_hop_num):
-                p = (
-                    Point("sw_queue_occupancy")
-                    .tag("sw_id", flow_info.sw_ids[i])
-                    .tag("queue_id", flow_info.queue_ids[i])
-                    .field("queue_occupancy", flow_info.queue_occups[i])
-                )
-                # .time('%s' % flow_info.egr_times[i] if is_egr_times else '')
-                write_api.write(bucket=bucket, org=org, record=p)
-
-    def run_cpu_port_loop(self):
-        cpu_port_intf = "eth0"
-        sniff(iface=cpu_port_intf, prn=self.recv_msg_cpu)
-
-
-if __name__ == "__main__":
-    INTCollector("s2").run_cpu_port_loop()
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from influxdb_client import InfluxDBClient, Point
+from influxdb_client.client.write_api import SYNCHRONOUS
+from int_capture import CaptureStats, RawSocketCapture
+from int_defines import *
+from int_headers import *
+from int_parser import HOP_FIELDS, INTReport, parse_report
+from int_spool import LineProtocolSpool
+from scapy.all import raw, sniff
+from scapy.layers.inet import IP, UDP
+from scapy.layers.l2 import Ether
+from scapy.packet import Raw
+
+token = "int_token"
+org = "int_org"
+bucket = "int_bucket"
+
+# keep consistent with TelemetryAPIMixin.int_spool_dir
+INT_SPOOL_DIR = "/var/spool/int_collector"
+
+
+class FlowKey:
+    __slots__ = ("src_ip", "dst_ip", "ip_proto", "src_port", "dst_port", "_hash")
+
+    def __init__(self, src_ip="", dst_ip="", ip_proto="", src_port="", dst_port=""):
+        self.src_ip = src_ip
+        self.dst_ip = dst_ip
+        self.ip_proto = ip_proto
+        self.src_port = src_port
+        self.dst_port = dst_port
+        self._hash = hash((src_ip, dst_ip, ip_proto, src_port, dst_port))
+
+    @classmethod
+    def from_report(cls, report: INTReport) -> "FlowKey":
+        return cls(report.src_ip, report.dst_ip, report.ip_proto, report.src_port, report.dst_port)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if not isinstance(other, FlowKey):
+            return NotImplemented
+        return (
+            self._hash == other._hash
+            and self.src_ip == other.src_ip
+            and self.dst_ip == other.dst_ip
+            and self.ip_proto == other.ip_proto
+            and self.src_port == other.src_port
+            and self.dst_port == other.dst_port
+        )
+
+    def __repr__(self):
+        return f"FlowKey({self.src_ip}:{self.src_port} -> {self.dst_ip}:{self.dst_port}, proto={self.ip_proto})"
+
+
+class RunningStats:
+    """Count, mean, min and max of the values seen in the current export interval."""
+
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def update(self, value):
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+
+class FlowInfo:
+    """Aggregated state of one flow: its current path and the latency stats of the interval."""
+
+    __slots__ = ("key", "path", "flow_latency", "hop_latencies", "reports", "last_seen", "flow_sink_time")
+
+    def __init__(self, key: FlowKey):
+        self.key = key
+        # the path signature, switch ids in the order of the metadata stack (sink first)
+        self.path = ()
+        self.flow_latency = RunningStats()
+        # {sw_id: RunningStats}
+        self.hop_latencies = {}
+        self.reports = 0
+        self.last_seen = 0.0
+        self.flow_sink_time = 0
+
+    @property
+    def path_str(self) -> str:
+        return ":".join(str(sw_id) for sw_id in reversed(self.path))
+
+
+class FlowTable:
+    def __init__(self, idle_timeout: float = 60.0):
+        # {FlowKey: FlowInfo}
+        self.flow_table = {}
+        # {(sw_id, egress_id): RunningStats}
+        self.port_tx_utilization = {}
+        # {(sw_id, queue_id): RunningStats}
+        self.queue_occupancy = {}
+        self.idle_timeout = idle_timeout
+
+    def __len__(self):
+        return len(self.flow_table)
+
+    def lookup_flow_info(self, flow_key: FlowKey) -> FlowInfo | None:
+        return self.flow_table.get(flow_key)
+
+    def update(self, report: INTReport, now: float) -> tuple[FlowInfo, tuple | None]:
+        """Fold a report into the table.
+
+        Returns the flow info and the previous path if the report moved the flow onto a new path, else None.
+        """
+        key = FlowKey.from_report(report)
+        flow_info = self.flow_table.get(key)
+        if flow_info is None:
+            flow_info = self.flow_table[key] = FlowInfo(key)
+
+        old_path = None
+        if report.sw_ids != flow_info.path:
+            if flow_info.path:
+                old_path = flow_info.path
+            flow_info.path = report.sw_ids
+
+        flow_info.reports += 1
+        flow_info.last_seen = now
+        flow_info.flow_sink_time = report.flow_sink_time
+
+        if report.hop_latencies:
+            flow_info.flow_latency.update(report.flow_latency)
+            hop_latencies = flow_info.hop_latencies
+            for sw_id, hop_latency in zip(report.sw_ids, report.hop_latencies):
+                stats = hop_latencies.get(sw_id)
+                if stats is None:
+                    stats = hop_latencies[sw_id] = RunningStats()
+                stats.update(hop_latency)
+
+        if report.tx_utilizes and report.l1_e_port_ids:
+            for port, tx_util in zip(zip(report.sw_ids, report.l1_e_port_ids), report.tx_utilizes):
+                stats = self.port_tx_utilization.get(port)
+                if stats is None:
+                    stats = self.port_tx_utilization[port] = RunningStats()
+                stats.update(tx_util)
+
+        if report.queue_occups:
+            for queue, queue_occup in zip(zip(report.sw_ids, report.queue_ids), report.queue_occups):
+                stats = self.queue_occupancy.get(queue)
+                if stats is None:
+                    stats = self.queue_occupancy[queue] = RunningStats()
+                stats.update(queue_occup)
+
+        return flow_info, old_path
+
+    def reset_interval(self, now: float):
+        """Start a new export interval, dropping flows that have been idle for longer than idle_timeout."""
+        for key in [key for key, info in self.flow_table.items() if now - info.last_seen > self.idle_timeout]:
+            del self.flow_table[key]
+        for flow_info in self.flow_table.values():
+            flow_info.flow_latency.reset()
+            flow_info.hop_latencies.clear()
+        self.port_tx_utilization.clear()
+        self.queue_occupancy.clear()
+
+
+def parse_report_scapy(packet) -> INTReport | None:
+    """Parse a telemetry report with the scapy header definitions.
+
+    This is the reference path the struct-based parser in int_parser.py is checked against.
+    """
+    # packet.show()
+    pkt = raw(packet)
+    info = {}
+    info["rec_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")
+
+    # parse outer headers
+    eth_report = Ether(pkt[0:ETHERNET_HEADER_LENGTH])
+    # eth_report.show()
+    ip_report = IP(pkt[OUTER_IP_HEADER : OUTER_IP_HEADER + IP_HEADER_LENGTH])
+    # ip_report.show()
+    udp_report = UDP(pkt[OUTER_L4_HEADER_OFFSET : OUTER_L4_HEADER_OFFSET + UDP_HEADER_LENGTH])
+    # udp_report.show()
+
+    # parse report header
+    raw_payload = bytes(packet[Raw])  # to get 'raw' payload
+    telemetry_report = TelemetryReport(raw_payload[0:INT_REPORT_HEADER_LENGTH])
+    # telemetry_report.show()
+
+    # parse inner headers
+    inner_eth = Ether(raw_payload[INNER_ETHERNET_OFFSET : INNER_ETHERNET_OFFSET + ETHERNET_HEADER_LENGTH])
+    # inner_eth.show()
+    inner_ip = IP(raw_payload[INNER_IP_HEADER_OFFSET : INNER_IP_HEADER_OFFSET + IP_HEADER_LENGTH])
+    # inner_ip.show()
+    # check if it's the int packets
+    if inner_ip.tos != INT_IPv4_DSCP or inner_ip.proto != UDP_PROTO:
+        return None
+    inner_udp = UDP(raw_payload[INNER_L4_HEADER_OFFSET : INNER_L4_HEADER_OFFSET + UDP_HEADER_LENGTH])
+    # inner_udp.show()
+
+    # parse int headers
+    int_shim_offset = INT_SHIM_OFFSET
+    int_shim_offset += UDP_HEADER_LENGTH
+    int_meta_offset = int_shim_offset + INT_SHIM_LENGTH
+    # print("SHIM OFFSET: "+str(int_shim_offset))
+    int_shim = INTShim(raw_payload[int_shim_offset : int_shim_offset + INT_SHIM_LENGTH])
+    # int_shim.show()
+    int_meta = INTMeta(raw_payload[int_meta_offset : int_meta_offset + INT_META_LENGTH])
+    # int_meta.show()
+
+    # parse int metadata stack
+    int_metadata_stack_offset = int_meta_offset + INT_META_LENGTH
+    int_metadata_stack_length = (int_shim.len - INT_SHIM_WORD_LENGTH - INT_META_WORD_LENGTH) * 4
+    stack_payload = raw_payload[int_metadata_stack_offset : int_metadata_stack_offset + int_metadata_stack_length]
+
+    # hop_m_len：per-hop metadata length, set by the source for transit and sink
+    hop_m_len = int_meta.hop_metadata_len * 4
+    int_hop_num = int(int_metadata_stack_length / hop_m_len)
+
+    flow_info = SimpleNamespace(**{name: [] for name in HOP_FIELDS}, flow_latency=0)
+    # record basic info into flow_info
+    flow_info.src_ip = inner_ip.src
+    flow_info.dst_ip = inner_ip.dst
+    flow_info.ip_proto = inner_ip.proto
+    flow_info.src_port = inner_udp.sport
+    flow_info.dst_port = inner_udp.dport
+    flow_info.int_hop_num = int_hop_num
+    flow_info.flow_sink_time = telemetry_report.ingress_tstamp
+
+    # parse the instruction bitmaps
+    is_l1_in_e_port_ids = bool(int_meta.instruction_mask_0003 & 0b0100)
+    is_hop_latencies = bool(int_meta.instruction_mask_0003 & 0b0010)
+    is_queue_occups = bool(int_meta.instruction_mask_0003 & 0b0001)
+    is_ingr_times = bool(int_meta.instruction_mask_0407 & 0b1000)
+    is_egr_times = bool(int_meta.instruction_mask_0407 & 0b0100)
+    is_l2_in_e_port_ids = bool(int_meta.instruction_mask_0407 & 0b0010)
+    is_tx_utilizes = bool(int_meta.instruction_mask_0407 & 0b0001)
+
+    # start to parse each hop metadata stack
+    for hop_index in range(0, int_hop_num):
+        # cut the current hop metadata stack
+        cur_offset = hop_index * hop_m_len
+
+        # parse per-hop metadata field
+        flow_info.sw_ids.append(INTNodeID(stack_payload[cur_offset : cur_offset + len(INTNodeID())]).node_id)
+        cur_offset += len(INTNodeID())
+        if is_l1_in_e_port_ids:
+            flow_info.l1_in_port_ids.append(
+                INTLevel1InterfaceIDs(
+                    stack_payload[cur_offset : cur_offset + len(INTLevel1InterfaceIDs())]
+                ).l1_ingress_interface_id
+            )
+            flow_info.l1_e_port_ids.append(
+                INTLevel1InterfaceIDs(
+                    stack_payload[cur_offset : cur_offset + len(INTLevel1InterfaceIDs())]
+                ).l1_egress_interface_id
+            )
+            cur_offset += len(INTLevel1InterfaceIDs())
+        if is_hop_latencies:
+            flow_info.hop_latencies.append(
+                INTHopLatency(stack_payload[cur_offset : cur_offset + len(INTHopLatency())]).hop_latency
+            )
+
+            flow_info.flow_latency += INTHopLatency(
+                stack_payload[cur_offset : cur_offset + len(INTHopLatency())]
+            ).hop_latency
+            cur_offset += len(INTHopLatency())
+        if is_queue_occups:
+            flow_info.queue_ids.append(
+                INTQueueOccupancy(stack_payload[cur_offset : cur_offset + len(INTQueueOccupancy())]).q_id
+            )
+            flow_info.queue_occups.append(
+                INTQueueOccupancy(stack_payload[cur_offset : cur_offset + len(INTQueueOccupancy())]).q_occupancy
+            )
+            cur_offset += len(INTQueueOccupancy())
+        if is_ingr_times:
+            flow_info.ingr_times.append(
+                INTIngressTstamp(
+                    stack_payload[cur_offset : cur_offset + len(INTIngressTstamp())]
+                ).ingress_global_timestamp
+            )
+            cur_offset += len(INTIngressTstamp())
+        if is_egr_times:
+            flow_info.egr_times.append(
+                INTEgressTstamp(stack_payload[cur_offset : cur_offset + len(INTEgressTstamp())]).egress_global_timestamp
+            )
+            cur_offset += len(INTEgressTstamp())
+        if is_l2_in_e_port_ids:
+            flow_info.l2_in_port_ids.append(
+                INTLevel2InterfaceIDs(
+                    stack_payload[cur_offset : cur_offset + len(INTLevel2InterfaceIDs())]
+                ).l2_ingress_interface_id
+            )
+            flow_info.l2_e_port_ids.append(
+                INTLevel2InterfaceIDs(
+                    stack_payload[cur_offset : cur_offset + len(INTLevel2InterfaceIDs())]
+                ).l2_egress_interface_id
+            )
+            cur_offset += len(INTLevel2InterfaceIDs())
+        if is_tx_utilizes:
+            flow_info.tx_utilizes.append(
+                INTEgressInterfaceTxUtil(
+                    stack_payload[cur_offset : cur_offset + len(INTEgressInterfaceTxUtil())]
+                ).egress_interface_tx_util
+            )
+            cur_offset += len(INTEgressInterfaceTxUtil())
+    return INTReport(
+        **{name: tuple(value) if isinstance(value, list) else value for name, value in vars(flow_info).items()},
+        instruction_mask_0003=int_meta.instruction_mask_0003,
+        instruction_mask_0407=int_meta.instruction_mask_0407,
+    )
+
+
+class INTCollector:
+    def __init__(
+        self, sw_name, export_interval: float = 5.0, idle_timeout: float = 60.0, client=None, spool_dir: str = None
+    ):
+        self.sw_name = sw_name
+        self.flow_table = FlowTable(idle_timeout=idle_timeout)
+        self.export_interval = export_interval
+        self.next_export = time.monotonic() + export_interval
+        # client can be replaced, e.g. by the in-process stand-in of int_replay.py
+        self.client = (
+            client if client is not None else InfluxDBClient(url="http://localhost:8086", token=token, org=org)
+        )
+        self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
+        # with a spool, points are appended locally and written to InfluxDB by its background flusher
+        self.spool = LineProtocolSpool(spool_dir).start(self.write_lines) if spool_dir else None
+
+    def write_lines(self, lines: list[str]):
+        self.write_api.write(bucket=bucket, org=org, record=lines)
+
+    def write_points(self, points: list[Point]):
+        if not points:
+            return
+        if self.spool is not None:
+            self.spool.append([p.to_line_protocol() for p in points])
+        else:
+            self.write_api.write(bucket=bucket, org=org, record=points)
+
+    def close(self):
+        if self.spool is not None:
+            self.spool.close()
+
+    def handle_report(self, report: INTReport):
+        flow_info, old_path = self.flow_table.update(report, time.monotonic())
+        if old_path is not None:
+            # path changes are reported as soon as they are seen, not at the end of the interval
+            key = flow_info.key
+            p = (
+                Point("flow_path_change")
+                .tag("src_ip", key.src_ip)
+                .tag("dst_ip", key.dst_ip)
+                .tag("ip_proto", key.ip_proto)
+                .tag("src_port", key.src_port)
+                .tag("dst_port", key.dst_port)
+                .field("old_path", ":".join(str(sw_id) for sw_id in reversed(old_path)))
+                .field("new_path", flow_info.path_str)
+            )
+            self.write_points([p])
+
+    def recv_msg_cpu(self, packet):
+        report = parse_report(raw(packet))
+        if report is not None:
+            self.handle_report(report)
+        self.maybe_export()
+
+    def recv_batch(self, frames):
+        """Handle a batch of raw report frames from the socket capture."""
+        for frame in frames:
+            report = parse_report(frame)
+            if report is not None:
+                self.handle_report(report)
+
+    def maybe_export(self):
+        now = time.monotonic()
+        if now >= self.next_export:
+            self.export_interval_summary(now)
+            self.next_export = now + self.export_interval
+
+    def build_interval_points(self) -> list[Point]:
+        """Summaries of the current interval, only for the flows, ports and queues that reported in it."""
+        points = []
+        for key, flow_info in self.flow_table.flow_table.items():
+            latency = flow_info.flow_latency
+            if latency.count == 0:
+                continue
+            # write flow latency and flow path
+            points.append(
+                Point("flow_stat")
+                .tag("src_ip", key.src_ip)
+                .tag("dst_ip", key.dst_ip)
+                .tag("ip_proto", key.ip_proto)
+                .tag("src_port", key.src_port)
+                .tag("dst_port", key.dst_port)
+                .field("flow_latency", latency.mean)
+                .field("flow_latency_min", latency.min)
+                .field("flow_latency_max", latency.max)
+                .field("report_count", latency.count)
+                .field("flow_path", flow_info.path_str)
+            )
+            # write hop latency
+            for sw_id, hop_latency in flow_info.hop_latencies.items():
+                points.append(
+                    Point("flow_hop_latency")
+                    .tag("src_ip", key.src_ip)
+                    .tag("dst_ip", key.dst_ip)
+                    .tag("ip_proto", key.ip_proto)
+                    .tag("src_port", key.src_port)
+                    .tag("dst_port", key.dst_port)
+                    .tag("sw_id", sw_id)
+                    .field("hop_latency", hop_latency.mean)
+                    .field("hop_latency_min", hop_latency.min)
+                    .field("hop_latency_max", hop_latency.max)
+                )
+
+        # write tx utilize
+        for (sw_id, egress_id), tx_util in self.flow_table.port_tx_utilization.items():
+            points.append(
+                Point("port_tx_utilization")
+                .tag("sw_id", sw_id)
+                .tag("egress_id", egress_id)
+                .field("tx_utilization", tx_util.mean)
+                .field("tx_utilization_max", tx_util.max)
+            )
+
+        # write queue occupancy
+        for (sw_id, queue_id), queue_occup in self.flow_table.queue_occupancy.items():
+            points.append(
+                Point("sw_queue_occupancy")
+                .tag("sw_id", sw_id)
+                .tag("queue_id", queue_id)
+                .field("queue_occupancy", queue_occup.mean)
+                .field("queue_occupancy_max", queue_occup.max)
+            )
+        return points
+
+    def export_interval_summary(self, now: float):
+        points = self.build_interval_points()
+        self.flow_table.reset_interval(now)
+        try:
+            self.write_points(points)
+        except Exception as e:
+            print(f"Failed to write {len(points)} INT points: {e}", flush=True)
+
+    def log_capture_stats(self, stats: CaptureStats):
+        spool_stats = self.spool.stats() if self.spool is not None else None
+        print("INT capture: ", stats.to_dict(), f"flows: {len(self.flow_table)}", "spool: ", spool_stats, flush=True)
+
+    def run_cpu_port_loop(self, cpu_port_intf: str = "eth0", backend: str = "socket"):
+        if backend == "socket":
+            RawSocketCapture(iface=cpu_port_intf).run(
+                self.recv_batch, on_stats=self.log_capture_stats, on_tick=self.maybe_export
+            )
+        elif backend == "scapy":
+            sniff(iface=cpu_port_intf, prn=self.recv_msg_cpu, store=False)
+        else:
+            raise ValueError(f"Unknown capture backend: {backend}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="INT collector")
+    parser.add_argument("--iface", type=str, default="eth0")
+    parser.add_argument("--backend", type=str, default="socket", choices=["socket", "scapy"])
+    parser.add_argument("--workers", type=int, default=1, help="Shard the collection over this many processes")
+    parser.add_argument("--spool_dir", type=str, default=INT_SPOOL_DIR, help="Empty to write to InfluxDB directly")
+    args = parser.parse_args()
+
+    if args.workers > 1:
+        from int_sharded import ShardedINTCollector
+
+        ShardedINTCollector(workers=args.workers, spool_dir=args.spool_dir).run_cpu_port_loop(args.iface)
+    else:
+        collector = INTCollector("s2", spool_dir=args.spool_dir)
+        try:
+            collector.run_cpu_port_loop(args.iface, args.backend)
+        finally:
+            collector.close()
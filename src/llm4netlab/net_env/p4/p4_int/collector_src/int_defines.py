@@ -26,3 +26,11 @@ INNER_IP_HEADER_OFFSET = INNER_ETHERNET_OFFSET + ETHERNET_HEADER_LENGTH
 INNER_L4_HEADER_OFFSET = INNER_IP_HEADER_OFFSET + IP_HEADER_LENGTH
 
 INT_SHIM_OFFSET = INT_REPORT_HEADER_LENGTH + ETHERNET_HEADER_LENGTH + IP_HEADER_LENGTH
+
+# The telemetry report payload starts right after the outer UDP header
+REPORT_PAYLOAD_OFFSET = OUTER_L4_HEADER_OFFSET + UDP_HEADER_LENGTH
+INT_META_OFFSET = INT_SHIM_OFFSET + UDP_HEADER_LENGTH + INT_SHIM_LENGTH
+INT_METADATA_STACK_OFFSET = INT_META_OFFSET + INT_META_LENGTH
+
+# UDP port the sink switch sends telemetry reports to, keep consistent with cmds/leaf2.txt
+INT_REPORT_UDP_PORT = 1234
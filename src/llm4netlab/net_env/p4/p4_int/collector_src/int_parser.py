@@ -0,0 +1,246 @@
+import socket
+import struct
+from functools import lru_cache
+
+from int_defines import *
+
+""" Zero-copy parser for INT telemetry reports, based on precompiled struct layouts """
+
+# Everything between the telemetry report header and the INT metadata stack has a fixed layout,
+# so it is decoded with a single unpack: report header, inner Ethernet (skipped), inner IPv4,
+# inner UDP, INT shim and INT metadata header.
+_FIXED_HEADERS = struct.Struct(
+    "!"
+    "4xIII"  # telemetry report: switch_id, seq_no, ingress_tstamp
+    "14x"  # inner ethernet
+    "xB7xB2x4s4s"  # inner ipv4: tos, proto, src, dst
+    "HH4x"  # inner udp: sport, dport
+    "2xBx"  # int shim: len
+    "2xBxB3x"  # int meta: hop_metadata_len, instruction_mask_0003/0407
+)
+
+# Per-hop metadata, in the order the switches push it into the stack.
+# (mask word, bit, ((record field, width in bytes), ...))
+_HOP_INSTRUCTIONS = (
+    (0, 0b1000, (("sw_ids", 4),)),
+    (0, 0b0100, (("l1_in_port_ids", 2), ("l1_e_port_ids", 2))),
+    (0, 0b0010, (("hop_latencies", 4),)),
+    (0, 0b0001, (("queue_occups", 4),)),  # 8-bit q_id + 24-bit occupancy, split after decoding
+    (1, 0b1000, (("ingr_times", 4),)),
+    (1, 0b0100, (("egr_times", 4),)),
+    (1, 0b0010, (("l2_in_port_ids", 4), ("l2_e_port_ids", 4))),
+    (1, 0b0001, (("tx_utilizes", 4),)),
+)
+
+_STRUCT_FORMATS = {2: "H", 4: "I"}
+
+HOP_FIELDS = (
+    "sw_ids",
+    "l1_in_port_ids",
+    "l1_e_port_ids",
+    "hop_latencies",
+    "queue_ids",
+    "queue_occups",
+    "ingr_times",
+    "egr_times",
+    "l2_in_port_ids",
+    "l2_e_port_ids",
+    "tx_utilizes",
+)
+
+
+class HopLayout:
+    """Precomputed layout of one hop of INT metadata for an instruction mask pair.
+
+    `fields` lists (name, offset, width) of every metadata field present in a hop, from which both the
+    struct used to decode a stack in one pass and the numpy dtype used for bulk decoding are built.
+    """
+
+    __slots__ = ("fields", "hop_m_len", "hop_struct", "columns", "queue_column", "_dtype")
+
+    def __init__(self, fields: tuple, hop_m_len: int):
+        self.fields = fields
+        self.hop_m_len = hop_m_len
+        self.columns = tuple(name for name, _, _ in fields)
+        self.queue_column = self.columns.index("queue_occups") if "queue_occups" in self.columns else None
+        used = sum(width for _, _, width in fields)
+        fmt = "!" + "".join(_STRUCT_FORMATS[width] for _, _, width in fields)
+        if hop_m_len > used:
+            fmt += f"{hop_m_len - used}x"
+        self.hop_struct = struct.Struct(fmt)
+        self._dtype = None
+
+    @property
+    def dtype(self):
+        """numpy structured dtype of one hop, built on first use."""
+        if self._dtype is None:
+            import numpy as np
+
+            self._dtype = np.dtype(
+                {
+                    "names": list(self.columns),
+                    "formats": [f">u{width}" for _, _, width in self.fields],
+                    "offsets": [offset for _, offset, _ in self.fields],
+                    "itemsize": self.hop_m_len,
+                }
+            )
+        return self._dtype
+
+    def decode(self, stack) -> dict[str, tuple]:
+        """Decode a whole hop stack in one pass into {field: per-hop values}, sink first."""
+        if not self.fields or len(stack) < self.hop_m_len:
+            return {}
+        stack = stack[: len(stack) - len(stack) % self.hop_m_len]
+        columns = dict(zip(self.columns, zip(*self.hop_struct.iter_unpack(stack))))
+        if self.queue_column is not None:
+            queue_words = columns["queue_occups"]
+            columns["queue_ids"] = tuple(word >> 24 for word in queue_words)
+            columns["queue_occups"] = tuple(word & 0xFFFFFF for word in queue_words)
+        return columns
+
+    def decode_array(self, stacks, count: int = -1, offset: int = 0):
+        """View count hops (all if -1) of one or more concatenated stacks as a numpy structured array.
+
+        Meant for bulk decoding, e.g. the stacks of many reports with the same masks recorded in a pcap.
+        The queue occupancy word is not split, use `queue_occups >> 24` and `queue_occups & 0xFFFFFF`.
+        """
+        import numpy as np
+
+        return np.frombuffer(stacks, dtype=self.dtype, count=count, offset=offset)
+
+
+@lru_cache(maxsize=None)
+def get_hop_layout(instruction_mask_0003: int, instruction_mask_0407: int, hop_m_len: int) -> HopLayout | None:
+    """Generate (once) the per-hop layout for the given instruction masks and hop metadata length.
+
+    Returns None if the instructions need more bytes than the hop metadata length announced by the source.
+    """
+    masks = (instruction_mask_0003, instruction_mask_0407)
+    fields = []
+    offset = 0
+    for word, bit, instruction_fields in _HOP_INSTRUCTIONS:
+        if masks[word] & bit:
+            for name, width in instruction_fields:
+                fields.append((name, offset, width))
+                offset += width
+
+    if offset > hop_m_len:
+        return None
+    return HopLayout(tuple(fields), hop_m_len)
+
+
+class INTReport:
+    """Compact record of a single INT telemetry report."""
+
+    __slots__ = (
+        "src_ip",
+        "dst_ip",
+        "ip_proto",
+        "src_port",
+        "dst_port",
+        "int_hop_num",
+        "flow_sink_time",
+        "flow_latency",
+        "instruction_mask_0003",
+        "instruction_mask_0407",
+    ) + HOP_FIELDS
+
+    def __init__(self, **fields):
+        for name in HOP_FIELDS:
+            setattr(self, name, ())
+        for name, value in fields.items():
+            setattr(self, name, value)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        return f"INTReport({self.to_dict()})"
+
+
+def parse_report(frame) -> INTReport | None:
+    """Parse a raw telemetry report frame (starting at the outer Ethernet header).
+
+    Returns None if the frame does not carry an INT report for an INT-enabled UDP flow.
+    """
+    buf = memoryview(frame)
+    if len(buf) < REPORT_PAYLOAD_OFFSET + INT_METADATA_STACK_OFFSET:
+        return None
+
+    (
+        _switch_id,
+        _seq_no,
+        ingress_tstamp,
+        tos,
+        proto,
+        src_ip,
+        dst_ip,
+        src_port,
+        dst_port,
+        shim_len,
+        hop_metadata_len,
+        instruction_mask,
+    ) = _FIXED_HEADERS.unpack_from(buf, REPORT_PAYLOAD_OFFSET)
+
+    # check if it's the int packets
+    if tos != INT_IPv4_DSCP or proto != UDP_PROTO:
+        return None
+
+    hop_m_len = (hop_metadata_len & 0x1F) * 4
+    if hop_m_len == 0:
+        return None
+    instruction_mask_0003 = instruction_mask >> 4
+    instruction_mask_0407 = instruction_mask & 0x0F
+    layout = get_hop_layout(instruction_mask_0003, instruction_mask_0407, hop_m_len)
+    if layout is None:
+        return None
+
+    stack_length = max(shim_len - INT_SHIM_WORD_LENGTH - INT_META_WORD_LENGTH, 0) * 4
+    int_hop_num = stack_length // hop_m_len
+    stack_start = REPORT_PAYLOAD_OFFSET + INT_METADATA_STACK_OFFSET
+    stack_end = stack_start + int_hop_num * hop_m_len
+    if len(buf) < stack_end:
+        return None
+
+    report = INTReport(
+        src_ip=socket.inet_ntoa(src_ip),
+        dst_ip=socket.inet_ntoa(dst_ip),
+        ip_proto=proto,
+        src_port=src_port,
+        dst_port=dst_port,
+        int_hop_num=int_hop_num,
+        flow_sink_time=ingress_tstamp,
+        instruction_mask_0003=instruction_mask_0003,
+        instruction_mask_0407=instruction_mask_0407,
+    )
+    if int_hop_num:
+        for name, values in layout.decode(buf[stack_start:stack_end]).items():
+            setattr(report, name, values)
+    report.flow_latency = sum(report.hop_latencies)
+    return report
+
+
+def diff_with_scapy(report: INTReport | None, expected: INTReport | None) -> list[str]:
+    """Compare a parsed report with the one built by the scapy path, return the mismatching fields."""
+    if report is None or expected is None:
+        return [] if report is None and expected is None else ["<report>"]
+    expected_fields = expected.to_dict()
+    return [name for name, value in report.to_dict().items() if value != expected_fields[name]]
+
+
+if __name__ == "__main__":
+    # Check the struct parser against the scapy path on recorded reports:
+    #   python3 int_parser.py reports.pcap
+    import sys
+
+    from int_collector import parse_report_scapy
+    from scapy.all import raw, rdpcap
+
+    total = mismatched = 0
+    for packet in rdpcap(sys.argv[1]):
+        total += 1
+        mismatches = diff_with_scapy(parse_report(raw(packet)), parse_report_scapy(packet))
+        if mismatches:
+            mismatched += 1
+            print(f"Report {total} mismatches on: {', '.join(mismatches)}")
+    print(f"{total - mismatched}/{total} reports match the scapy parser")
@@ -0,0 +1,198 @@
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from int_collector import INTCollector, bucket
+from int_defines import *
+from int_headers import *
+from scapy.all import IP, UDP, Ether, Raw, RawPcapReader, raw
+
+""" Offline replay of telemetry reports through the INT collector pipeline, without a running p4_int lab """
+
+
+class InMemoryInfluxDB:
+    """In-process stand-in for the InfluxDB client used by the collector.
+
+    Points are serialized to line protocol like the real client does, and kept per bucket.
+    """
+
+    def __init__(self):
+        # {bucket: [line protocol]}
+        self.lines = defaultdict(list)
+        self.writes = 0
+
+    def write_api(self, write_options=None):
+        return self
+
+    def write(self, bucket: str, org: str = None, record=None):
+        records = record if isinstance(record, list) else [record]
+        self.writes += 1
+        self.lines[bucket].extend(r if isinstance(r, str) else r.to_line_protocol() for r in records)
+
+    def query_measurement(self, measurement: str, bucket: str = bucket) -> list[str]:
+        return [line for line in self.lines[bucket] if line.split(",", 1)[0].split(" ", 1)[0] == measurement]
+
+    def count_measurements(self, bucket: str = bucket) -> dict[str, int]:
+        counts = defaultdict(int)
+        for line in self.lines[bucket]:
+            counts[line.split(",", 1)[0].split(" ", 1)[0]] += 1
+        return dict(counts)
+
+    def close(self):
+        pass
+
+
+def build_hop_metadata(sw_id: int, instruction_mask_0003: int, instruction_mask_0407: int, rng: random.Random) -> bytes:
+    """Build the metadata one switch pushes for the given instruction masks, from the int_headers definitions."""
+    hop = b""
+    if instruction_mask_0003 & 0b1000:
+        hop += raw(INTNodeID(node_id=sw_id))
+    if instruction_mask_0003 & 0b0100:
+        hop += raw(
+            INTLevel1InterfaceIDs(l1_ingress_interface_id=rng.randint(1, 4), l1_egress_interface_id=rng.randint(1, 4))
+        )
+    if instruction_mask_0003 & 0b0010:
+        hop += raw(INTHopLatency(hop_latency=rng.randint(100, 10000)))
+    if instruction_mask_0003 & 0b0001:
+        hop += raw(INTQueueOccupancy(q_id=0, q_occupancy=rng.randint(0, 64)))
+    if instruction_mask_0407 & 0b1000:
+        hop += raw(INTIngressTstamp(ingress_global_timestamp=rng.getrandbits(32)))
+    if instruction_mask_0407 & 0b0100:
+        hop += raw(INTEgressTstamp(egress_global_timestamp=rng.getrandbits(32)))
+    if instruction_mask_0407 & 0b0010:
+        hop += raw(
+            INTLevel2InterfaceIDs(l2_ingress_interface_id=rng.randint(1, 4), l2_egress_interface_id=rng.randint(1, 4))
+        )
+    if instruction_mask_0407 & 0b0001:
+        hop += raw(INTEgressInterfaceTxUtil(egress_interface_tx_util=rng.randint(0, 100)))
+    return hop
+
+
+def build_report_frame(
+    sw_ids: list[int],
+    instruction_mask_0003: int = 0b1111,
+    instruction_mask_0407: int = 0b1111,
+    src_ip: str = "10.0.0.1",
+    dst_ip: str = "10.0.0.2",
+    src_port: int = 10000,
+    dst_port: int = 5000,
+    rng: random.Random = None,
+) -> bytes:
+    """Build a telemetry report frame as sent by the sink switch, for a flow that crossed sw_ids (source first)."""
+    rng = rng or random.Random()
+    # the metadata stack is pushed hop by hop, so the last switch is on top
+    hops = [build_hop_metadata(sw_id, instruction_mask_0003, instruction_mask_0407, rng) for sw_id in reversed(sw_ids)]
+    hop_metadata_len = len(hops[0]) // 4 if hops else 0
+    stack = b"".join(hops)
+
+    inner = raw(
+        Ether(src="00:00:0a:00:00:01", dst="00:00:0a:00:00:02")
+        / IP(src=src_ip, dst=dst_ip, tos=INT_IPv4_DSCP, proto=UDP_PROTO)
+        / UDP(sport=src_port, dport=dst_port)
+    )
+    payload = (
+        raw(TelemetryReport(switch_id=sw_ids[-1] if sw_ids else 0, seq_no=0, ingress_tstamp=rng.getrandbits(32)))
+        + inner
+        + raw(INTShim(len=INT_SHIM_WORD_LENGTH + INT_META_WORD_LENGTH + len(stack) // 4))
+        + raw(
+            INTMeta(
+                hop_metadata_len=hop_metadata_len,
+                instruction_mask_0003=instruction_mask_0003,
+                instruction_mask_0407=instruction_mask_0407,
+            )
+        )
+        + stack
+    )
+    return raw(
+        Ether(src="00:00:00:00:00:aa", dst="00:00:00:00:00:03")
+        / IP(src="10.0.0.100", dst="10.0.0.3")
+        / UDP(sport=INT_REPORT_UDP_PORT, dport=INT_REPORT_UDP_PORT)
+        / Raw(payload)
+    )
+
+
+def generate_reports(
+    count: int,
+    hops: int = 3,
+    instruction_mask_0003: int = 0b1111,
+    instruction_mask_0407: int = 0b1111,
+    flows: int = 16,
+    templates: int = 64,
+    seed: int = 0,
+) -> list[bytes]:
+    """Generate count synthetic report frames over the given number of flows.
+
+    Only `templates` distinct frames are built with scapy, the rest are repeated, so that generation stays cheap.
+    """
+    rng = random.Random(seed)
+    frames = []
+    for i in range(min(templates, count)):
+        flow = i % flows
+        # every flow keeps its own path
+        sw_ids = [1 + (flow + hop) % 4 for hop in range(hops)]
+        frames.append(
+            build_report_frame(
+                sw_ids,
+                instruction_mask_0003,
+                instruction_mask_0407,
+                src_port=10000 + flow,
+                rng=rng,
+            )
+        )
+    return [frames[i % len(frames)] for i in range(count)]
+
+
+def load_pcap(path: str) -> list[bytes]:
+    """Read the raw frames of a recorded pcap, without dissecting them."""
+    return [frame for frame, _ in RawPcapReader(path)]
+
+
+def replay(collector: INTCollector, frames: list[bytes], batch_size: int = 256, export_every: int = None) -> dict:
+    """Feed frames through parse -> aggregate -> write, as the capture loop does.
+
+    Args:
+        export_every: export the interval summary every this many batches. By default the collector's own
+            export interval is used, so the number of exports depends on the replay speed.
+    """
+    start = time.perf_counter()
+    batches = 0
+    for offset in range(0, len(frames), batch_size):
+        collector.recv_batch(frames[offset : offset + batch_size])
+        batches += 1
+        if export_every is None:
+            collector.maybe_export()
+        elif batches % export_every == 0:
+            collector.export_interval_summary(time.monotonic())
+    collector.export_interval_summary(time.monotonic())
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": len(frames),
+        "batches": batches,
+        "seconds": elapsed,
+        "reports_per_sec": len(frames) / elapsed if elapsed else 0.0,
+        "flows": len(collector.flow_table),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay telemetry reports through the INT collector")
+    parser.add_argument("--pcap", type=str, default=None, help="Recorded reports to replay")
+    parser.add_argument("--synthetic", type=int, default=10000, help="Number of synthetic reports if no pcap")
+    parser.add_argument("--hops", type=int, default=3)
+    parser.add_argument("--mask_0003", type=lambda v: int(v, 0), default=0b1111)
+    parser.add_argument("--mask_0407", type=lambda v: int(v, 0), default=0b1111)
+    parser.add_argument("--flows", type=int, default=16)
+    parser.add_argument("--influx", action="store_true", help="Write to the local InfluxDB instead of the stand-in")
+    args = parser.parse_args()
+
+    if args.pcap:
+        frames = load_pcap(args.pcap)
+    else:
+        frames = generate_reports(args.synthetic, args.hops, args.mask_0003, args.mask_0407, args.flows)
+
+    stand_in = None if args.influx else InMemoryInfluxDB()
+    collector = INTCollector("replay", client=stand_in)
+    print("Replay: ", replay(collector, frames))
+    if stand_in is not None:
+        print("Written points: ", stand_in.count_measurements())
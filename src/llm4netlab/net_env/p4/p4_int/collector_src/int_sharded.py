@@ -0,0 +1,296 @@
+import argparse
+import multiprocessing as mp
+import os
+import struct
+import time
+import zlib
+from multiprocessing import shared_memory
+
+from int_capture import CaptureStats, RawSocketCapture
+from int_collector import INTCollector
+from int_defines import *
+
+""" Multi-core INT collector: one capture front-end, N workers fed through shared-memory rings """
+
+# inner src ip, dst ip, src port and dst port are contiguous in the report, hash them to pick the shard
+FLOW_HASH_START = REPORT_PAYLOAD_OFFSET + INNER_IP_HEADER_OFFSET + 12
+FLOW_HASH_END = FLOW_HASH_START + 12
+
+_U64 = struct.Struct("Q")
+_SLOT_LEN = struct.Struct("H")
+
+
+class ShmRing:
+    """Single-producer single-consumer ring of frames in a shared memory block.
+
+    The producer and consumer counters live on separate cache lines. Each slot holds a 2-byte frame length
+    followed by the frame. The producer writes the slot before publishing it by bumping `head`, and the
+    consumer releases slots by bumping `tail` once it is done with the memoryviews it was handed.
+    """
+
+    HEAD = 0
+    TAIL = 64
+    STOP = 128
+    DROPPED = 136
+    DATA = 192
+
+    def __init__(
+        self,
+        name: str = None,
+        slots: int = 4096,
+        slot_size: int = 2048,
+        create: bool = True,
+    ):
+        assert slots & (slots - 1) == 0, "slots must be a power of two"
+        self.slots = slots
+        self.slot_size = slot_size
+        self.stride = slot_size + _SLOT_LEN.size
+        size = self.DATA + slots * self.stride
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.buf = self.shm.buf
+        if create:
+            self.buf[: self.DATA] = bytes(self.DATA)
+        # producer-local copy of tail and consumer-local copy of head, refreshed only when needed
+        self._cached_tail = 0
+        self._cached_head = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def _load(self, offset: int) -> int:
+        return _U64.unpack_from(self.buf, offset)[0]
+
+    def _store(self, offset: int, value: int):
+        _U64.pack_into(self.buf, offset, value)
+
+    # producer side
+    def push(self, frame) -> bool:
+        """Copy a frame into the ring, return False (and count a drop) if the ring is full or the frame too big."""
+        head = self._load(self.HEAD)
+        if head - self._cached_tail >= self.slots:
+            self._cached_tail = self._load(self.TAIL)
+            if head - self._cached_tail >= self.slots:
+                self._store(self.DROPPED, self._load(self.DROPPED) + 1)
+                return False
+        nbytes = len(frame)
+        if nbytes > self.slot_size:
+            self._store(self.DROPPED, self._load(self.DROPPED) + 1)
+            return False
+        offset = self.DATA + (head & (self.slots - 1)) * self.stride
+        _SLOT_LEN.pack_into(self.buf, offset, nbytes)
+        self.buf[offset + _SLOT_LEN.size : offset + _SLOT_LEN.size + nbytes] = frame
+        self._store(self.HEAD, head + 1)
+        return True
+
+    def stop(self):
+        self._store(self.STOP, 1)
+
+    def pending(self) -> int:
+        return self._load(self.HEAD) - self._load(self.TAIL)
+
+    def dropped(self) -> int:
+        return self._load(self.DROPPED)
+
+    # consumer side
+    def stopped(self) -> bool:
+        return self._load(self.STOP) == 1
+
+    def peek_batch(self, max_frames: int) -> list[memoryview]:
+        """Views of up to max_frames published frames, valid until release() is called."""
+        tail = self._load(self.TAIL)
+        if tail >= self._cached_head:
+            self._cached_head = self._load(self.HEAD)
+        count = min(self._cached_head - tail, max_frames)
+        frames = []
+        for seq in range(tail, tail + count):
+            offset = self.DATA + (seq & (self.slots - 1)) * self.stride
+            nbytes = _SLOT_LEN.unpack_from(self.buf, offset)[0]
+            frames.append(self.buf[offset + _SLOT_LEN.size : offset + _SLOT_LEN.size + nbytes])
+        return frames
+
+    def release(self, count: int):
+        self._store(self.TAIL, self._load(self.TAIL) + count)
+
+    def close(self, unlink: bool = False):
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+def worker_main(
+    shard_id: int,
+    ring_name: str,
+    slots: int,
+    slot_size: int,
+    batch_size: int,
+    export_interval: float,
+    stand_in: bool,
+    spool_dir: str | None,
+):
+    """Worker process: owns the flow table of its shard and its own batched InfluxDB writer."""
+    ring = ShmRing(ring_name, slots=slots, slot_size=slot_size, create=False)
+    client = None
+    if stand_in:
+        from int_replay import InMemoryInfluxDB
+
+        client = InMemoryInfluxDB()
+    collector = INTCollector(
+        f"shard{shard_id}",
+        export_interval=export_interval,
+        client=client,
+        spool_dir=os.path.join(spool_dir, f"shard{shard_id}") if spool_dir else None,
+    )
+    try:
+        while True:
+            frames = ring.peek_batch(batch_size)
+            if frames:
+                collector.recv_batch(frames)
+                # drop the views before handing the slots back to the producer
+                count = len(frames)
+                frames = None
+                ring.release(count)
+            else:
+                if ring.stopped():
+                    break
+                time.sleep(0.0005)
+            collector.maybe_export()
+        collector.export_interval_summary(time.monotonic())
+    finally:
+        collector.close()
+        ring.close()
+
+
+class ShardedINTCollector:
+    """Capture front-end that dispatches raw report frames by flow hash to N worker processes."""
+
+    def __init__(
+        self,
+        workers: int = None,
+        slots: int = 4096,
+        slot_size: int = 2048,
+        batch_size: int = 256,
+        export_interval: float = 5.0,
+        stand_in: bool = False,
+        spool_dir: str = None,
+    ):
+        self.workers = workers or max(mp.cpu_count() - 1, 1)
+        self.batch_size = batch_size
+        self.rings = [ShmRing(slots=slots, slot_size=slot_size) for _ in range(self.workers)]
+        self.processes = [
+            mp.Process(
+                target=worker_main,
+                args=(
+                    i,
+                    ring.name,
+                    slots,
+                    slot_size,
+                    batch_size,
+                    export_interval,
+                    stand_in,
+                    spool_dir,
+                ),
+                daemon=True,
+            )
+            for i, ring in enumerate(self.rings)
+        ]
+        self.dispatched = 0
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+        return self
+
+    def dispatch(self, frames):
+        rings = self.rings
+        workers = self.workers
+        for frame in frames:
+            rings[zlib.crc32(frame[FLOW_HASH_START:FLOW_HASH_END]) % workers].push(frame)
+        self.dispatched += len(frames)
+
+    def alive(self) -> bool:
+        return all(process.is_alive() for process in self.processes)
+
+    def drain(self, timeout: float = 30.0) -> bool:
+        """Wait until the workers consumed every dispatched frame, False on timeout or if a worker exited."""
+        deadline = time.monotonic() + timeout
+        while any(ring.pending() for ring in self.rings):
+            if time.monotonic() > deadline or not self.alive():
+                return False
+            time.sleep(0.001)
+        return True
+
+    def stop(self):
+        for ring in self.rings:
+            ring.stop()
+        for process in self.processes:
+            process.join()
+        for ring in self.rings:
+            ring.close(unlink=True)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "dispatched": self.dispatched,
+            "pending": [ring.pending() for ring in self.rings],
+            "dropped": [ring.dropped() for ring in self.rings],
+        }
+
+    def log_capture_stats(self, stats: CaptureStats):
+        print("INT capture: ", stats.to_dict(), "shards: ", self.stats(), flush=True)
+
+    def run_cpu_port_loop(self, cpu_port_intf: str = "eth0"):
+        self.start()
+        try:
+            RawSocketCapture(iface=cpu_port_intf).run(self.dispatch, on_stats=self.log_capture_stats)
+        finally:
+            self.stop()
+
+
+def bench_scaling(frames: list, workers_list: list[int], batch_size: int = 256) -> list[dict]:
+    """Reports/sec of the sharded pipeline for several worker counts, writing to the in-process stand-in."""
+    results = []
+    for workers in workers_list:
+        collector = ShardedINTCollector(workers=workers, batch_size=batch_size, stand_in=True).start()
+        start = time.perf_counter()
+        for offset in range(0, len(frames), batch_size):
+            collector.dispatch(frames[offset : offset + batch_size])
+            # the front-end is faster than the workers, wait instead of dropping when rings fill up
+            while any(ring.pending() > ring.slots // 2 for ring in collector.rings) and collector.alive():
+                time.sleep(0.0002)
+        drained = collector.drain()
+        elapsed = time.perf_counter() - start
+        stats = collector.stats()
+        collector.stop()
+        result = {
+            "workers": workers,
+            "reports_per_sec": round(len(frames) / elapsed),
+            "dropped": sum(stats["dropped"]),
+        }
+        exitcodes = [process.exitcode for process in collector.processes]
+        # the throughput of a pipeline that did not process every report means nothing
+        if any(exitcodes):
+            result["error"] = f"worker exit codes {exitcodes}"
+        elif not drained:
+            result["error"] = f"{sum(stats['pending'])} reports not consumed"
+        if "error" in result:
+            result["reports_per_sec"] = None
+        results.append(result)
+    return results
+
+
+if __name__ == "__main__":
+    # Scaling check on synthetic reports, e.g. python3 int_sharded.py --workers 1 2 4
+    from int_replay import generate_reports
+
+    parser = argparse.ArgumentParser(description="Throughput of the sharded INT collector per number of workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--reports", type=int, default=200000)
+    parser.add_argument("--hops", type=int, default=3)
+    parser.add_argument("--flows", type=int, default=64)
+    args = parser.parse_args()
+
+    frames = generate_reports(args.reports, args.hops, flows=args.flows, templates=args.flows * 4)
+    for res in bench_scaling(frames, args.workers):
+        print(res)
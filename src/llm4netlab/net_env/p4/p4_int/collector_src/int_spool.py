@@ -0,0 +1,249 @@
+import glob
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+""" Write-ahead spool of line protocol between the INT collector and InfluxDB """
+
+_HEADER = struct.Struct("QQ")  # write offset, read offset
+
+
+class SpoolSegment:
+    """Append-only segment file, memory-mapped, with its write and read offsets kept in the file header."""
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        exists = os.path.exists(path)
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        if not exists:
+            os.ftruncate(self.fd, size)
+        self.size = os.fstat(self.fd).st_size
+        self.mm = mmap.mmap(self.fd, self.size)
+        if exists:
+            self.write_offset, self.read_offset = _HEADER.unpack_from(self.mm, 0)
+        else:
+            self.write_offset = self.read_offset = _HEADER.size
+            self._store_header()
+
+    def _store_header(self):
+        _HEADER.pack_into(self.mm, 0, self.write_offset, self.read_offset)
+
+    def free(self) -> int:
+        return self.size - self.write_offset
+
+    def pending(self) -> int:
+        return self.write_offset - self.read_offset
+
+    def append(self, data: bytes):
+        end = self.write_offset + len(data)
+        self.mm[self.write_offset : end] = data
+        self.write_offset = end
+        self._store_header()
+
+    def read(self, max_bytes: int) -> bytes:
+        """Up to max_bytes of pending data, cut at the last complete line."""
+        data = self.mm[self.read_offset : min(self.write_offset, self.read_offset + max_bytes)]
+        cut = data.rfind(b"\n")
+        return data[: cut + 1] if cut >= 0 else b""
+
+    def consume(self, nbytes: int):
+        self.read_offset += nbytes
+        self._store_header()
+
+    def sync(self):
+        self.mm.flush()
+
+    def close(self, remove: bool = False):
+        self.mm.close()
+        os.close(self.fd)
+        if remove:
+            os.remove(self.path)
+
+
+class LineProtocolSpool:
+    """Durable queue of line protocol records, drained to InfluxDB by a background flusher.
+
+    The capture path only appends to the active memory-mapped segment, so a slow or restarting InfluxDB does not
+    lose reports. Segments are rotated when full and removed once flushed. When the spool reaches
+    max_segments, new records are dropped and counted instead of blocking the capture path.
+    """
+
+    def __init__(
+        self,
+        spool_dir: str,
+        segment_size: int = 16 * 1024 * 1024,
+        max_segments: int = 16,
+        batch_bytes: int = 1024 * 1024,
+        flush_interval: float = 1.0,
+        retry_interval: float = 0.5,
+        max_retry_interval: float = 30.0,
+        stats_interval: float = 5.0,
+    ):
+        self.spool_dir = spool_dir
+        self.segment_size = segment_size
+        self.max_segments = max_segments
+        self.batch_bytes = batch_bytes
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.max_retry_interval = max_retry_interval
+        self.stats_interval = stats_interval
+
+        self.appended_lines = 0
+        self.dropped_lines = 0
+        self.flushed_lines = 0
+        self.flush_batches = 0
+        self.flush_failures = 0
+        self.last_error = None
+        self._behind_since = None
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._running = False
+        self._flusher = None
+
+        os.makedirs(spool_dir, exist_ok=True)
+        # resume the segments left by a previous run, oldest first
+        self.segments = [SpoolSegment(path, segment_size) for path in sorted(glob.glob(self._segment_path("*")))]
+        self._next_seq = int(os.path.basename(self.segments[-1].path)[8:16]) + 1 if self.segments else 0
+        if not self.segments:
+            self._rotate()
+        if self.pending_bytes():
+            self._behind_since = time.time()
+
+    def _segment_path(self, seq) -> str:
+        name = f"segment-{seq:08d}.lp" if isinstance(seq, int) else f"segment-{seq}.lp"
+        return os.path.join(self.spool_dir, name)
+
+    def _rotate(self):
+        self.segments.append(SpoolSegment(self._segment_path(self._next_seq), self.segment_size))
+        self._next_seq += 1
+
+    def pending_bytes(self) -> int:
+        return sum(segment.pending() for segment in self.segments)
+
+    def append(self, lines: list[str]) -> bool:
+        """Append records to the spool, return False if they were dropped because the spool is full."""
+        if not lines:
+            return True
+        data = ("\n".join(lines) + "\n").encode()
+        with self._lock:
+            active = self.segments[-1]
+            if active.free() < len(data):
+                if len(self.segments) >= self.max_segments or len(data) > self.segment_size - _HEADER.size:
+                    self.dropped_lines += len(lines)
+                    return False
+                self._rotate()
+                active = self.segments[-1]
+            active.append(data)
+            self.appended_lines += len(lines)
+            if self._behind_since is None:
+                self._behind_since = time.time()
+        return True
+
+    def _next_batch(self) -> tuple[SpoolSegment, bytes] | tuple[None, bytes]:
+        with self._lock:
+            for segment in self.segments:
+                data = segment.read(self.batch_bytes)
+                if data:
+                    return segment, data
+        return None, b""
+
+    def _commit(self, segment: SpoolSegment, nbytes: int, lines: int):
+        with self._lock:
+            segment.consume(nbytes)
+            self.flushed_lines += lines
+            self.flush_batches += 1
+            # drop the flushed segments, but always keep the active one
+            while len(self.segments) > 1 and self.segments[0].pending() == 0:
+                self.segments.pop(0).close(remove=True)
+            if self.pending_bytes() == 0:
+                self._behind_since = None
+
+    def flush_once(self, write_fn) -> int:
+        """Write one batch of pending records with write_fn(lines), return the number of records written.
+
+        Exceptions of write_fn are left to the caller, the batch stays in the spool.
+        """
+        segment, data = self._next_batch()
+        if segment is None:
+            return 0
+        lines = data.decode().splitlines()
+        write_fn(lines)
+        self._commit(segment, len(data), len(lines))
+        return len(lines)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = self.pending_bytes()
+            segments = len(self.segments)
+            behind_since = self._behind_since
+        return {
+            "spool_dir": self.spool_dir,
+            "segments": segments,
+            "pending_bytes": pending,
+            "capacity_bytes": self.max_segments * self.segment_size,
+            "lag_seconds": round(time.time() - behind_since, 3) if behind_since is not None else 0.0,
+            "appended_lines": self.appended_lines,
+            "flushed_lines": self.flushed_lines,
+            "dropped_lines": self.dropped_lines,
+            "flush_batches": self.flush_batches,
+            "flush_failures": self.flush_failures,
+            "last_error": self.last_error,
+        }
+
+    def write_stats(self):
+        """Publish the stats next to the segments, for the telemetry MCP server to read."""
+        path = os.path.join(self.spool_dir, "stats.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(self.stats(), f)
+        os.replace(path + ".tmp", path)
+
+    def _flush_loop(self, write_fn):
+        retry_interval = self.retry_interval
+        next_stats = 0.0
+        while self._running:
+            if time.monotonic() >= next_stats:
+                self.write_stats()
+                next_stats = time.monotonic() + self.stats_interval
+            try:
+                written = self.flush_once(write_fn)
+            except Exception as e:
+                self.flush_failures += 1
+                self.last_error = str(e)
+                # InfluxDB is down or slow, back off and retry the same batch
+                self._wakeup.wait(retry_interval)
+                retry_interval = min(retry_interval * 2, self.max_retry_interval)
+                continue
+            retry_interval = self.retry_interval
+            if not written:
+                with self._lock:
+                    for segment in self.segments:
+                        segment.sync()
+                self._wakeup.wait(self.flush_interval)
+
+    def start(self, write_fn):
+        """Start the background flusher, draining the spool with write_fn(lines)."""
+        self._running = True
+        self._flusher = threading.Thread(target=self._flush_loop, args=(write_fn,), daemon=True)
+        self._flusher.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        self._running = False
+        self._wakeup.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout)
+        with self._lock:
+            for segment in self.segments:
+                segment.sync()
+        self.write_stats()
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            for segment in self.segments:
+                segment.close()
+            self.segments = []
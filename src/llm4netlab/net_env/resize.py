@@ -0,0 +1,336 @@
+import copy
+import io
+import ipaddress
+import logging
+import re
+import shlex
+from dataclasses import dataclass, field
+
+from Kathara.model.Lab import Lab
+
+from llm4netlab.net_env.base import NetworkEnvBase
+from llm4netlab.net_env.checkpoint import MUTABLE_PATHS
+from llm4netlab.net_env.model_cache import dump_model, load_model
+from llm4netlab.net_env.net_env_pool import get_net_env_instance
+from llm4netlab.service.kathara import KatharaFRRAPI
+
+""" Incremental resize of a running lab to another size of its generated topology """
+
+logger = logging.getLogger(__name__)
+
+FRR_CONF = "/etc/frr/frr.conf"
+_ADDR_RE = re.compile(r"\bip addr(?:ess)? add (\S+/\d+) dev (\S+)")
+_IP_RE = re.compile(r"(?<![\d.])\d{1,3}(?:\.\d{1,3}){3}(?![\d.])")
+_ETH_RE = re.compile(r"\beth(\d+)\b")
+
+
+@dataclass
+class LabDelta:
+    """Machines and (machine, link) attachments to add to and remove from a lab to get to another size."""
+
+    added_machines: list[str] = field(default_factory=list)
+    removed_machines: list[str] = field(default_factory=list)
+    # in the order of the interfaces of the target lab
+    added_attachments: list[tuple[str, str]] = field(default_factory=list)
+    removed_attachments: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added_machines or self.removed_machines or self.added_attachments or self.removed_attachments)
+
+
+def _attachments(lab: Lab) -> list[tuple[str, str]]:
+    return [
+        (name, interface.link.name)
+        for name, machine in lab.machines.items()
+        for _, interface in sorted(machine.interfaces.items())
+        if interface is not None
+    ]
+
+
+def compute_delta(current_lab: Lab, target_lab: Lab) -> LabDelta:
+    """Difference between the model of a running lab and the model of the target size."""
+    current, target = _attachments(current_lab), _attachments(target_lab)
+    current_set, target_set = set(current), set(target)
+    return LabDelta(
+        added_machines=[name for name in target_lab.machines if name not in current_lab.machines],
+        removed_machines=[name for name in current_lab.machines if name not in target_lab.machines],
+        added_attachments=[attachment for attachment in target if attachment not in current_set],
+        removed_attachments=[attachment for attachment in current if attachment not in target_set],
+    )
+
+
+def _machine_files(lab: Lab) -> dict[str, dict[str, bytes]]:
+    """{machine: {path in the lab: content}}, the startup file and the files under the machine directory."""
+    files = {}
+    for path in lab.fs.walk.files():
+        parts = path.lstrip("/").split("/")
+        name = parts[0] if len(parts) > 1 else parts[0].removesuffix(".startup")
+        if name in lab.machines:
+            files.setdefault(name, {})[path] = lab.fs.readbytes(path)
+    return files
+
+
+def _addresses(lab: Lab, files: dict[str, dict[str, bytes]]) -> dict[tuple[str, str], list[ipaddress.IPv4Interface]]:
+    """{(machine, link or device): addresses} set by the startup files, a device such as br0 standing for itself."""
+    addresses = {}
+    for name, machine in lab.machines.items():
+        startup = files.get(name, {}).get(f"/{name}.startup", b"").decode(errors="replace")
+        for address, device in _ADDR_RE.findall(startup):
+            match = _ETH_RE.fullmatch(device)
+            interface = machine.interfaces.get(int(match.group(1))) if match else None
+            key = (name, interface.link.name if interface is not None else device)
+            addresses.setdefault(key, []).append(ipaddress.IPv4Interface(address))
+    return addresses
+
+
+class AddressPlan:
+    """Translation of the addresses of the target lab into the addresses of the running one.
+
+    A fresh build numbers the point-to-point subnets in sequence, so the same link can get another subnet at another
+    size. The attachments kept by the resize keep their running addresses, and the new ones keep the address of the
+    fresh build unless it is taken, in which case they get the next free subnet (or address, on a shared subnet).
+    """
+
+    def __init__(self, current: dict, target: dict):
+        self.ip_map: dict[str, str] = {}
+        self.subnet_map: dict[ipaddress.IPv4Network, ipaddress.IPv4Network] = {}
+        used_ips = {str(address.ip) for addresses in current.values() for address in addresses}
+        used_networks = {address.network for addresses in current.values() for address in addresses}
+        self._cursors: dict[tuple, int] = {}
+
+        for key, target_addresses in target.items():
+            for target_address, current_address in zip(target_addresses, current.get(key, [])):
+                self.ip_map.setdefault(str(target_address.ip), str(current_address.ip))
+                self.subnet_map.setdefault(target_address.network, current_address.network)
+
+        for key, target_addresses in target.items():
+            for target_address in target_addresses[len(current.get(key, [])) :]:
+                if str(target_address.ip) in self.ip_map:
+                    continue
+                network = self.subnet_map.get(target_address.network)
+                if network is None:
+                    network = target_address.network
+                    if any(network.overlaps(used) for used in used_networks):
+                        network = self._free_network(network, used_networks)
+                    self.subnet_map[target_address.network] = network
+                    used_networks.add(network)
+                ip = network.network_address + (int(target_address.ip) - int(target_address.network.network_address))
+                if str(ip) in used_ips:
+                    ip = next(host for host in network.hosts() if str(host) not in used_ips)
+                self.ip_map[str(target_address.ip)] = str(ip)
+                used_ips.add(str(ip))
+        self._prefixes = sorted({network.prefixlen for network in self.subnet_map}, reverse=True)
+
+    def _free_network(self, network: ipaddress.IPv4Network, used_networks: set) -> ipaddress.IPv4Network:
+        supernet = network.supernet(new_prefix=min(16, network.prefixlen))
+        key = (supernet, network.prefixlen)
+        size = network.num_addresses
+        for index in range(self._cursors.get(key, 0), supernet.num_addresses // size):
+            subnet = ipaddress.IPv4Network((int(supernet.network_address) + index * size, network.prefixlen))
+            if not any(subnet.overlaps(used) for used in used_networks):
+                self._cursors[key] = index + 1
+                return subnet
+        raise ValueError(f"No free /{network.prefixlen} subnet left in {supernet} for {network}.")
+
+    def remap_ip(self, ip: str) -> str:
+        if ip in self.ip_map:
+            return self.ip_map[ip]
+        for prefix in self._prefixes:
+            try:
+                network = ipaddress.IPv4Network(f"{ip}/{prefix}", strict=False)
+            except ValueError:
+                return ip
+            if network in self.subnet_map:
+                offset = int(ipaddress.IPv4Address(ip)) - int(network.network_address)
+                return str(self.subnet_map[network].network_address + offset)
+        return ip
+
+    def remap(self, text: str) -> str:
+        return _IP_RE.sub(lambda match: self.remap_ip(match.group(0)), text)
+
+
+def _remap_file(content: bytes, plan: AddressPlan, eth_map: dict[int, int] | None = None) -> bytes:
+    try:
+        text = content.decode()
+    except UnicodeDecodeError:
+        return content
+    text = plan.remap(text)
+    if eth_map:
+        text = _ETH_RE.sub(lambda match: f"eth{eth_map.get(int(match.group(1)), int(match.group(1)))}", text)
+    return text.encode()
+
+
+def frr_sections(conf: str) -> dict[str, list[str]]:
+    """{"router bgp 65100": [statements]} of the router sections of an FRR configuration."""
+    sections, header = {}, None
+    for line in conf.splitlines():
+        if line.startswith("router "):
+            header = line.strip()
+            sections[header] = []
+        elif header is not None and line.startswith(" ") and line.strip():
+            sections[header].append(line.strip())
+        else:
+            header = None
+    return sections
+
+
+def frr_delta(current_conf: str, target_conf: str) -> list[str]:
+    """vtysh configuration commands taking the router sections of current_conf to those of target_conf.
+
+    Raises:
+        ValueError: If a routing process changes its header, e.g. the AS of `router bgp`, which needs a redeploy.
+    """
+    current, target = frr_sections(current_conf), frr_sections(target_conf)
+    current_protocols = {header.split()[1]: header for header in current}
+    for header in target:
+        previous = current_protocols.get(header.split()[1])
+        if previous is not None and previous != header:
+            raise ValueError(f"`{previous}` becomes `{header}`, the lab needs to be redeployed.")
+
+    commands = []
+    for header, statements in target.items():
+        current_statements = current.get(header, [])
+        removed = [line for line in current_statements if line not in statements]
+        added = [line for line in statements if line not in current_statements]
+        if removed or added:
+            negated = [line[len("no ") :] if line.startswith("no ") else f"no {line}" for line in removed]
+            commands += [header, *negated, *added, "exit"]
+    return commands
+
+
+def resize_lab(net_env: NetworkEnvBase, topo_size: str = "s", **dims: int | None) -> NetworkEnvBase:
+    """Resize a running lab to another size of its generated topology, without redeploying it.
+
+    Only the new machines and links are created and the retired ones removed; the existing routers get the FRR
+    neighbor and network statements of their new and retired peers, and the other changed configuration files
+    (e.g. the DHCP subnets) are copied and their service restarted. A checkpoint of the lab must be captured again.
+
+    Example:
+        net_env = resize_lab(net_env, "l")
+        net_env = resize_lab(net_env, "m", leaves_per_pod=6)
+
+    Args:
+        net_env: The network environment of the running lab, left unchanged.
+        topo_size, dims: The target size, as given to the constructor of the network environment.
+
+    Returns:
+        A network environment describing the resized lab.
+
+    Raises:
+        ValueError: If the lab is not a generated topology, or the target size changes a routing process.
+    """
+    if not hasattr(net_env, "TOPO_PRESETS"):
+        raise ValueError(f"Lab {net_env.name} is not a generated topology and cannot be resized.")
+    target = get_net_env_instance(net_env.LAB_NAME, topo_size=topo_size, **dims)
+    resized = load_model(type(net_env), dump_model(net_env))
+    lab, instance = resized.lab, resized.instance
+
+    # --- plan: everything that can fail is computed before the running lab is touched ---
+    delta = compute_delta(lab, target.lab)
+    current_files, target_files = _machine_files(lab), _machine_files(target.lab)
+    plan = AddressPlan(_addresses(lab, current_files), _addresses(target.lab, target_files))
+    added_machines, removed_machines = set(delta.added_machines), set(delta.removed_machines)
+    frr_changes = 0
+    for name in target.lab.machines:
+        target_conf = target_files.get(name, {}).get(f"/{name}{FRR_CONF}")
+        if name in added_machines or target_conf is None:
+            continue
+        current_conf = current_files.get(name, {}).get(f"/{name}{FRR_CONF}", b"")
+        frr_changes += bool(frr_delta(current_conf.decode(), plan.remap(target_conf.decode())))
+    logger.info(
+        f"Resizing lab {lab.name} to {topo_size} {target.topo_dims}: +{len(delta.added_machines)} machines, "
+        f"-{len(delta.removed_machines)} machines, +{len(delta.added_attachments)} interfaces, "
+        f"-{len(delta.removed_attachments)} interfaces, {frr_changes} FRR configurations to update"
+    )
+    instance.update_lab_from_api(lab)
+
+    # --- removals: interfaces to retired links, then the retired machines and the links left empty ---
+    retired_links = {}
+    for name, link_name in delta.removed_attachments:
+        retired_links.setdefault(link_name, set()).add(name)
+        if name not in removed_machines:
+            instance.disconnect_machine_from_link(lab.machines[name], lab.links[link_name], keep_link=True)
+    for name in delta.removed_machines:
+        # the links left without containers are removed with the machine
+        instance.undeploy_machine(lab.machines[name])
+        # not Lab.remove_machine, which fails on the holes left by the interfaces disconnected by earlier resizes
+        for interface in lab.machines.pop(name).interfaces.values():
+            if interface is not None:
+                interface.link.machines.pop(name, None)
+        for path in (f"/{name}.startup", f"/{name}.shutdown"):
+            if lab.fs.exists(path):
+                lab.fs.remove(path)
+        if lab.fs.exists(f"/{name}"):
+            lab.fs.removetree(f"/{name}")
+    for link_name, names in retired_links.items():
+        if not lab.links[link_name].machines:
+            if not names & removed_machines:
+                instance.undeploy_link(lab.links[link_name])
+            del lab.links[link_name]
+
+    # --- new machines, deployed with the files of the fresh build on the running addresses ---
+    for name in delta.added_machines:
+        target_machine = target.lab.machines[name]
+        machine = lab.new_machine(name)
+        machine.meta = copy.deepcopy(target_machine.meta)
+        for num, interface in sorted(target_machine.interfaces.items()):
+            lab.connect_machine_to_link(name, interface.link.name, machine_iface_number=num)
+        for path, content in target_files.get(name, {}).items():
+            lab.fs.makedirs(path.rsplit("/", 1)[0] or "/", recreate=True)
+            lab.fs.writebytes(path, _remap_file(content, plan))
+        instance.deploy_machine(machine)
+
+    # --- existing machines: new interfaces, then their part of the startup file and the changed configurations ---
+    api = KatharaFRRAPI(lab_name=lab.name)
+    for name in target.lab.machines:
+        if name in added_machines:
+            continue
+        machine, target_machine = lab.machines[name], target.lab.machines[name]
+        for attachment_name, link_name in delta.added_attachments:
+            if attachment_name == name:
+                instance.connect_machine_to_link(machine, lab.get_or_new_link(link_name))
+        running = {interface.link.name: num for num, interface in machine.interfaces.items() if interface is not None}
+        eth_map = {num: running[interface.link.name] for num, interface in target_machine.interfaces.items()}
+
+        for path, content in target_files.get(name, {}).items():
+            new_content = _remap_file(content, plan, eth_map)
+            old_content = current_files.get(name, {}).get(path)
+            if new_content == old_content:
+                continue
+            guest_path = path[len(f"/{name}") :]
+            if path == f"/{name}.startup":
+                old_lines = set((old_content or b"").decode().splitlines())
+                lines = [line for line in new_content.decode().splitlines() if line.strip() and line not in old_lines]
+                if lines:
+                    script = " ".join(line if line.rstrip().endswith("&") else f"{line};" for line in lines)
+                    api._run_cmd(name, f"bash -c {shlex.quote(script)}")
+            elif guest_path == FRR_CONF:
+                commands = frr_delta((old_content or b"").decode(), new_content.decode())
+                if commands:
+                    api.frr_conf(name, commands)
+            else:
+                instance.copy_files(machine, {guest_path: io.BytesIO(new_content)})
+                restart = next((cmd for prefix, cmd in MUTABLE_PATHS.items() if guest_path.startswith(prefix)), None)
+                if restart:
+                    api._run_cmd(name, restart)
+            lab.fs.makedirs(path.rsplit("/", 1)[0] or "/", recreate=True)
+            lab.fs.writebytes(path, new_content)
+
+    resized.topo_size = target.topo_size
+    resized.topo_dims = dict(target.topo_dims)
+    resized.desc = target.desc
+    resized.load_machines()
+    return resized
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    net_env = get_net_env_instance("dc_clos_bgp", use_cache=False, topo_size="m")
+    net_env.deploy()
+    # grow, then shrink twice: the second shrink runs on machines with disconnected interfaces
+    for topo_size in ["l", "m", "s"]:
+        net_env = resize_lab(net_env, topo_size)
+        fresh = get_net_env_instance("dc_clos_bgp", topo_size=topo_size)
+        assert compute_delta(net_env.lab, fresh.lab).empty, f"resized lab differs from a fresh {topo_size} build"
+    print(net_env.get_info())
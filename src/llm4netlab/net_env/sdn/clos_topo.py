@@ -6,7 +6,7 @@ from typing import Literal
 from Kathara.manager.Kathara import Kathara, Machine
 from Kathara.model.Lab import Lab
 
-from llm4netlab.net_env.base import NetworkEnvBase
+from llm4netlab.net_env.base import NetworkEnvBase, resolve_topo_dims
 
 cur_path = os.path.dirname(os.path.abspath(__file__))
 
@@ -41,30 +41,43 @@ class SDNClos(NetworkEnvBase):
     TOPO_LEVEL = "medium"
     TOPO_SIZE = ["s", "m", "l"]
     TAGS = ["link", "sdn", "host", "mac", "arp", "icmp"]
-
-    def __init__(self, topo_size: Literal["s", "m", "l"] = "s"):
+    TOPO_PRESETS = {
+        "s": {"spines": 1, "leaves": 4, "hosts_per_leaf": 2},
+        "m": {"spines": 2, "leaves": 8, "hosts_per_leaf": 2},
+        "l": {"spines": 4, "leaves": 16, "hosts_per_leaf": 2},
+    }
+
+    def __init__(
+        self,
+        topo_size: Literal["s", "m", "l"] = "s",
+        spines: int | None = None,
+        leaves: int | None = None,
+        hosts_per_leaf: int | None = None,
+    ):
+        """The dimensions given explicitly override the ones of the topo_size preset, e.g. to scale past "l"."""
         super().__init__()
         self.lab = Lab(self.LAB_NAME)
         self.name = self.LAB_NAME
         self.instance = Kathara.get_instance()
         self.topo_size = topo_size
-
-        # Level s:  1 spine, 4 leaf, 2 hosts per leaf
-        # Level m:  2 spine, 8 leaf, 2 hosts per leaf
-        # Level l:  4 spine, 16 leaf, 2 hosts per leaf
-        if topo_size == "s":
-            SPINE_NUM, LEAF_NUM, HOST_PER_LEAF = 1, 4, 2
-        elif topo_size == "m":
-            SPINE_NUM, LEAF_NUM, HOST_PER_LEAF = 2, 8, 2
-        elif topo_size == "l":
-            SPINE_NUM, LEAF_NUM, HOST_PER_LEAF = 4, 16, 2
-        else:
-            raise ValueError("topo_size should be s, m, or l.")
-
-        self.desc = textwrap.dedent("""\
+        self.topo_dims = resolve_topo_dims(
+            topo_size, self.TOPO_PRESETS, spines=spines, leaves=leaves, hosts_per_leaf=hosts_per_leaf
+        )
+        SPINE_NUM = self.topo_dims["spines"]
+        LEAF_NUM = self.topo_dims["leaves"]
+        HOST_PER_LEAF = self.topo_dims["hosts_per_leaf"]
+
+        # all the hosts share 10.0.0.0/24, and the switches take 20.0.0.1 up to the controller at 20.0.0.100
+        if LEAF_NUM * HOST_PER_LEAF > 254:
+            raise ValueError(f"{LEAF_NUM * HOST_PER_LEAF} hosts do not fit the host network 10.0.0.0/24.")
+        if SPINE_NUM + LEAF_NUM > 99:
+            raise ValueError(f"{SPINE_NUM + LEAF_NUM} switches do not fit below the controller at 20.0.0.100.")
+
+        leaf_hosts_desc = "two hosts" if HOST_PER_LEAF == 2 else f"{HOST_PER_LEAF} hosts"
+        self.desc = textwrap.dedent(f"""\
             This experiment uses a scalable SDN spine–leaf topology whose size depends on the selected topo_size.
             Each leaf switch connects to all spine switches using point-to-point links.
-            Each leaf switch connects to two hosts belong to the same subnet 10.0.0.0/24.
+            Each leaf switch connects to {leaf_hosts_desc} belong to the same subnet 10.0.0.0/24.
             All switches also join a management network 20.0.0.0/24.
             The SDN controller resides at 20.0.0.100 and manages all switches via OpenFlow.""")
 
@@ -1,6 +1,6 @@
-import asyncio
 import logging
 
+from llm4netlab.generator.fault.fault_plan import FaultPlan
 from llm4netlab.net_env.net_env_pool import get_net_env_instance
 from llm4netlab.orchestrator.problems.problem_base import ProblemMeta, RootCauseCategory, TaskDescription, TaskLevel
 from llm4netlab.orchestrator.tasks.base import TaskBase
@@ -27,21 +27,19 @@ class MultiFaultBase(TaskBase):
             else:
                 self.faulty_devices.append(sub_fault.faulty_devices)
 
-    async def _inject_fault_async(self):
-        loop = asyncio.get_running_loop()
-        tasks = [loop.run_in_executor(None, fault.inject_fault) for fault in self.sub_faults]
-        await asyncio.gather(*tasks)
-
-    async def _recover_fault_async(self):
-        loop = asyncio.get_running_loop()
-        tasks = [loop.run_in_executor(None, fault.recover_fault) for fault in self.sub_faults]
-        await asyncio.gather(*tasks)
+        # sub-faults are independent, they are injected concurrently and rolled back together on failure
+        self.fault_plan = FaultPlan(max_concurrency=max(len(sub_faults), 1))
+        for i, sub_fault in enumerate(self.sub_faults):
+            self.fault_plan.add_step(
+                f"{i}_{sub_fault.root_cause_name}", sub_fault.inject_fault, undo=sub_fault.recover_fault
+            )
 
     def inject_fault(self):
-        asyncio.run(self._inject_fault_async())
+        self.fault_plan.inject()
 
     def recover_fault(self):
-        asyncio.run(self._recover_fault_async())
+        # faults injected by another process (e.g. a previous step script) are all recovered
+        self.fault_plan.recover(all_steps=not self.fault_plan.undo_log)
 
 
 class MultiFaultDetection(MultiFaultBase, DetectionTask):
@@ -1,23 +1,35 @@
 import importlib
 import inspect
+import json
 import logging
+import os
 import pkgutil
 from collections import defaultdict
-from typing import Dict, Type
+from typing import TYPE_CHECKING, Dict, Type
 
-from llm4netlab.orchestrator.problems.multi_problems import MultiFaultDetection, MultiFaultLocalization, MultiFaultRCA
-from llm4netlab.orchestrator.problems.problem_base import TaskLevel
-from llm4netlab.orchestrator.tasks.base import TaskBase
+from llm4netlab.config import BASE_DIR
+
+if TYPE_CHECKING:
+    from llm4netlab.orchestrator.problems.problem_base import TaskLevel
+    from llm4netlab.orchestrator.tasks.base import TaskBase
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+PROBLEMS_PACKAGE = "llm4netlab.orchestrator.problems"
+PROBLEMS_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.path.join(BASE_DIR, "runtime", "problem_manifest.json") if BASE_DIR else None
+
+# {root cause name: {task level: problem class}}, filled as problems are requested
+_PROBLEMS: Dict[str, Dict[str, Type["TaskBase"]]] = defaultdict(dict)
+_MANIFEST = None
+
 
 def _register_problems():
-    """Register all available problems in the pool."""
+    """Import every problem module and collect the problem classes, {root cause name: {task level: class}}."""
 
     problems = defaultdict(dict)
-    package = importlib.import_module("llm4netlab.orchestrator.problems")
+    package = importlib.import_module(PROBLEMS_PACKAGE)
 
     for info in pkgutil.walk_packages(package.__path__, prefix=package.__name__ + "."):
         # Skip direct sub-packages
@@ -59,28 +71,108 @@ def _register_problems():
     return problems
 
 
-_PROBLEMS: Dict[str, Type[TaskBase]] = _register_problems()
+def _source_mtimes() -> dict[str, int]:
+    """Modification times of the problem modules, {path relative to the problems package: mtime in ns}."""
+    mtimes = {}
+    for dirpath, dirnames, filenames in os.walk(PROBLEMS_DIR):
+        dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+        for filename in filenames:
+            if filename.endswith(".py"):
+                path = os.path.join(dirpath, filename)
+                mtimes[os.path.relpath(path, PROBLEMS_DIR)] = os.stat(path).st_mtime_ns
+    return mtimes
+
+
+def build_manifest() -> dict:
+    """Import all the problems once and describe them, so that other processes do not have to import them."""
+    sources = _source_mtimes()
+    problems = _register_problems()
+    manifest = {"sources": sources, "problems": {}}
+    for root_cause_name, classes in problems.items():
+        manifest["problems"][root_cause_name] = {
+            str(task_level): {
+                "module": problem_class.__module__,
+                "class": problem_class.__name__,
+                "tags": list(problem_class.TAGS),
+            }
+            for task_level, problem_class in classes.items()
+        }
+        _PROBLEMS[root_cause_name].update({str(level): cls for level, cls in classes.items()})
+    return manifest
+
+
+def load_manifest(rebuild: bool = False) -> dict:
+    """Problem manifest, {"sources": {file: mtime}, "problems": {root cause name: {task level: entry}}}.
+
+    The manifest is read from runtime/problem_manifest.json and regenerated when a problem module was added,
+    removed or modified since it was written.
+    """
+    global _MANIFEST
+    if _MANIFEST is not None and not rebuild:
+        return _MANIFEST
+    manifest = None
+    if not rebuild and MANIFEST_PATH is not None and os.path.exists(MANIFEST_PATH):
+        try:
+            with open(MANIFEST_PATH) as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to read the problem manifest {MANIFEST_PATH}: {e}")
+        if manifest is not None and manifest.get("sources") != _source_mtimes():
+            manifest = None
+    if manifest is None:
+        manifest = build_manifest()
+        if MANIFEST_PATH is not None:
+            os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+            tmp_path = f"{MANIFEST_PATH}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, MANIFEST_PATH)
+            logger.info(f"Wrote the problem manifest {MANIFEST_PATH}")
+    _MANIFEST = manifest
+    return manifest
+
+
+def get_problem_class(root_cause_name: str, task_level: "TaskLevel | str") -> Type["TaskBase"]:
+    """Problem class of a root cause and task level, importing only its module."""
+    task_level = str(task_level)
+    if task_level not in _PROBLEMS.get(root_cause_name, {}):
+        try:
+            entry = load_manifest()["problems"][root_cause_name][task_level]
+        except KeyError:
+            raise KeyError(f"Unknown problem {root_cause_name} at task level {task_level}.") from None
+        module = importlib.import_module(entry["module"])
+        _PROBLEMS[root_cause_name][task_level] = getattr(module, entry["class"])
+    return _PROBLEMS[root_cause_name][task_level]
 
 
 def list_avail_problem_names() -> list[str]:
     """List all available root cause names."""
-    return list(_PROBLEMS.keys())
+    return list(load_manifest()["problems"])
+
 
+def list_avail_problem_specs() -> dict[str, dict[str, dict]]:
+    """Manifest entries of all the problems, {root cause name: {task level: {"module", "class", "tags"}}}."""
+    return load_manifest()["problems"]
 
-def list_avail_problem_instances() -> list[Type[TaskBase]]:
-    return _PROBLEMS
+
+def list_avail_problem_instances() -> dict[str, dict[str, Type["TaskBase"]]]:
+    """Problem classes of all the problems, this imports every problem module."""
+    return {
+        root_cause_name: {task_level: get_problem_class(root_cause_name, task_level) for task_level in levels}
+        for root_cause_name, levels in list_avail_problem_specs().items()
+    }
 
 
 def list_avail_tags() -> list[str]:
     """List all available tags for problems."""
     tags = set()
-    for problem_classes in _PROBLEMS.values():
-        for problem_class in problem_classes.values():
-            tags.update(problem_class.TAGS)
+    for levels in list_avail_problem_specs().values():
+        for entry in levels.values():
+            tags.update(entry["tags"])
     return list(tags)
 
 
-def get_problem_instance(problem_names: list, task_level: TaskLevel, scenario_name: str, **kwargs) -> TaskBase:
+def get_problem_instance(problem_names: list, task_level: "TaskLevel", scenario_name: str, **kwargs) -> "TaskBase":
     """Get the problem instance for a specific root cause name and task level.
     Args:
         problem_names (list): The root cause names of the problem.
@@ -90,13 +182,20 @@ def get_problem_instance(problem_names: list, task_level: TaskLevel, scenario_na
     if not isinstance(problem_names, list) or len(problem_names) == 0:
         raise ValueError("problem_names should be a list of problem_names.")
 
+    from llm4netlab.orchestrator.problems.multi_problems import (
+        MultiFaultDetection,
+        MultiFaultLocalization,
+        MultiFaultRCA,
+    )
+    from llm4netlab.orchestrator.problems.problem_base import TaskLevel
+
     # Multi-fault scenario
     if len(problem_names) > 1:
         match task_level:
             case TaskLevel.DETECTION:
                 return MultiFaultDetection(
                     sub_faults=[
-                        _PROBLEMS[fault_name][task_level](scenario_name=scenario_name, **kwargs)
+                        get_problem_class(fault_name, task_level)(scenario_name=scenario_name, **kwargs)
                         for fault_name in problem_names
                     ],
                     scenario_name=scenario_name,
@@ -105,7 +204,7 @@ def get_problem_instance(problem_names: list, task_level: TaskLevel, scenario_na
             case TaskLevel.LOCALIZATION:
                 return MultiFaultLocalization(
                     sub_faults=[
-                        _PROBLEMS[fault_name][task_level](scenario_name=scenario_name, **kwargs)
+                        get_problem_class(fault_name, task_level)(scenario_name=scenario_name, **kwargs)
                         for fault_name in problem_names
                     ],
                     scenario_name=scenario_name,
@@ -114,7 +213,7 @@ def get_problem_instance(problem_names: list, task_level: TaskLevel, scenario_na
             case TaskLevel.RCA:
                 return MultiFaultRCA(
                     sub_faults=[
-                        _PROBLEMS[fault_name][task_level](scenario_name=scenario_name, **kwargs)
+                        get_problem_class(fault_name, task_level)(scenario_name=scenario_name, **kwargs)
                         for fault_name in problem_names
                     ],
                     scenario_name=scenario_name,
@@ -125,7 +224,7 @@ def get_problem_instance(problem_names: list, task_level: TaskLevel, scenario_na
 
     # Single-fault scenario
     else:
-        return _PROBLEMS[problem_names[0]][task_level](scenario_name=scenario_name, **kwargs)
+        return get_problem_class(problem_names[0], task_level)(scenario_name=scenario_name, **kwargs)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 import random
 
-from llm4netlab.generator.fault.injector_host import FaultInjectorHost
+from llm4netlab.generator.fault.injector_resource import FaultInjectorResource
 from llm4netlab.generator.fault.injector_tc import FaultInjectorTC
 from llm4netlab.net_env.net_env_pool import get_net_env_instance
 from llm4netlab.orchestrator.problems.problem_base import ProblemMeta, RootCauseCategory, TaskDescription, TaskLevel
@@ -75,14 +75,15 @@ class LoadBalancerOverloadBase:
         super().__init__()
         self.net_env = get_net_env_instance(scenario_name, **kwargs)
         self.kathara_api = KatharaAPIALL(lab_name=self.net_env.lab.name)
-        self.injector = FaultInjectorHost(lab_name=self.net_env.lab.name)
+        self.injector = FaultInjectorResource(lab_name=self.net_env.lab.name)
         self.faulty_devices = [random.choice(self.net_env.servers["load_balancer"])]
 
     def inject_fault(self):
-        self.injector.inject_stress_all(host_name=self.faulty_devices[0])
+        # starved through its cgroup limits, unlike stress-ng the contention does not depend on the host load
+        self.injector.inject_resource_contention(host_name=self.faulty_devices[0], cpus=0.05, blkio_weight=10)
 
     def recover_fault(self):
-        self.injector.recover_stress_all(host_name=self.faulty_devices[0])
+        self.injector.recover_resource_contention(host_name=self.faulty_devices[0])
 
 
 class LoadBalancerOverloadDetection(LoadBalancerOverloadBase, DetectionTask):
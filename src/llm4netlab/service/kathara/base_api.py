@@ -22,10 +22,21 @@ class KatharaBaseAPI:
     """
 
     def __init__(self, lab_name: str):
+        self.lab_name = lab_name
         self.instance = Kathara.get_instance()
-        self.lab = self.instance.get_lab_from_api(lab_name=lab_name)
-        if self.lab is None:
-            raise ValueError(f"Lab {lab_name} not found.")
+        self._lab = None
+
+    @property
+    def lab(self) -> Lab:
+        """
+        The deployed lab, fetched from Kathara on first use: running commands only needs the lab name.
+        """
+        if self._lab is None:
+            lab = self.instance.get_lab_from_api(lab_name=self.lab_name)
+            if lab is None:
+                raise ValueError(f"Lab {self.lab_name} not found.")
+            self._lab = lab
+        return self._lab
 
     def get_hosts(self) -> list[Machine]:
         """
@@ -223,7 +234,7 @@ class KatharaBaseAPI:
         decoding bytes and filtering out None/empty/zeros.
         """
         output_generator = self.instance.exec(
-            machine_name=host_name, command=command, lab_name=self.lab.name, stream=False
+            machine_name=host_name, command=command, lab_name=self.lab_name, stream=False
         )
         for item in output_generator:
             if not item or item == b"" or isinstance(item, int) or item is None or item == "None":
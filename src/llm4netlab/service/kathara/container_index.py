@@ -0,0 +1,120 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import docker
+from docker.errors import NotFound
+from docker.models.containers import Container
+
+""" Index of the Docker containers of a Kathara lab, keyed by machine name """
+
+logger = logging.getLogger(__name__)
+
+MAX_PARALLEL_ACTIONS = 16
+
+# {lab hash: index}
+_lab_indexes: dict[str, "LabContainerIndex"] = {}
+_lab_indexes_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_docker_client() -> docker.DockerClient:
+    """Docker client shared by all the container indexes of the process."""
+    return docker.from_env(max_pool_size=MAX_PARALLEL_ACTIONS)
+
+
+class LabContainerIndex:
+    """Map the machine names of a lab to their Docker containers.
+
+    Containers are selected by the labels Kathara sets on them (`app=kathara`, `lab_hash=<hash>`) and indexed by
+    their exact `name` label, so `host_1` never matches `host_10` and machines with the same name in other labs
+    are ignored. The index is built on first use and refreshed only when a machine is missing or its container
+    was recreated.
+    """
+
+    def __init__(self, lab_hash: str):
+        self.lab_hash = lab_hash
+        self.client = get_docker_client()
+        self._containers: dict[str, Container] | None = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_lab(cls, lab) -> "LabContainerIndex":
+        """Index shared by all the users of the same lab (a Kathara Lab object)."""
+        with _lab_indexes_lock:
+            if lab.hash not in _lab_indexes:
+                _lab_indexes[lab.hash] = cls(lab.hash)
+            return _lab_indexes[lab.hash]
+
+    def refresh(self):
+        containers = self.client.containers.list(
+            all=True, filters={"label": ["app=kathara", f"lab_hash={self.lab_hash}"]}
+        )
+        with self._lock:
+            self._containers = {container.labels["name"]: container for container in containers}
+        logger.debug(f"Indexed {len(containers)} containers of lab {self.lab_hash}")
+
+    def get(self, machine_name: str) -> Container:
+        if self._containers is None or machine_name not in self._containers:
+            self.refresh()
+        try:
+            return self._containers[machine_name]
+        except KeyError:
+            raise ValueError(f"Machine {machine_name} not found in lab {self.lab_hash}.") from None
+
+    def machine_names(self) -> list[str]:
+        if self._containers is None:
+            self.refresh()
+        return list(self._containers)
+
+    def _act(self, machine_name: str, action: str, **kwargs):
+        try:
+            getattr(self.get(machine_name), action)(**kwargs)
+        except NotFound:
+            # the container was recreated since the index was built
+            self.refresh()
+            getattr(self.get(machine_name), action)(**kwargs)
+
+    def _act_all(self, machine_names: str | list[str], action: str, **kwargs):
+        """Run the action on all the machines in parallel, raise once all of them were tried."""
+        if isinstance(machine_names, str):
+            machine_names = [machine_names]
+        if self._containers is None:
+            self.refresh()
+        errors = {}
+        with ThreadPoolExecutor(max_workers=min(len(machine_names), MAX_PARALLEL_ACTIONS) or 1) as executor:
+            futures = {name: executor.submit(self._act, name, action, **kwargs) for name in machine_names}
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[name] = e
+        if errors:
+            raise RuntimeError(f"Failed to {action} {', '.join(f'{n} ({e})' for n, e in errors.items())}")
+
+    def pause(self, machine_names: str | list[str]):
+        self._act_all(machine_names, "pause")
+
+    def unpause(self, machine_names: str | list[str]):
+        self._act_all(machine_names, "unpause")
+
+    def stop(self, machine_names: str | list[str], timeout: int = 10):
+        self._act_all(machine_names, "stop", timeout=timeout)
+
+    def start(self, machine_names: str | list[str]):
+        self._act_all(machine_names, "start")
+
+    def kill(self, machine_names: str | list[str], signal: str = "SIGKILL"):
+        self._act_all(machine_names, "kill", signal=signal)
+
+    def status(self, machine_names: str | list[str]) -> dict[str, str]:
+        """Current Docker status (running, paused, exited, ...) of the machines."""
+        if isinstance(machine_names, str):
+            machine_names = [machine_names]
+        result = {}
+        for name in machine_names:
+            container = self.get(name)
+            container.reload()
+            result[name] = container.status
+        return result
@@ -0,0 +1,891 @@
+import hashlib
+import io
+import ipaddress
+import json
+import re
+import shlex
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Generator
+
+from Kathara.manager.Kathara import Kathara
+from Kathara.model.Lab import Lab
+from Kathara.model.Link import Link
+from Kathara.model.Machine import Machine
+
+""" In-memory stand-in of the Kathara manager, to run the framework without Docker """
+
+FRR_ROUTE_CODES = """\
+Codes: K - kernel route, C - connected, S - static, R - RIP,
+       O - OSPF, I - IS-IS, B - BGP, E - EIGRP, N - NHRP,
+       T - Table, v - VNC, V - VNC-Direct, A - Babel, F - PBR,
+       f - OpenFabric,
+       > - selected route, * - FIB route, q - queued, r - rejected, b - backup
+"""
+# (code, administrative distance) of the routes learnt from each protocol
+FRR_PROTOCOLS = {"bgp": ("B", 20), "ospf": ("O", 110), "rip": ("R", 120)}
+
+
+def _mac_address(*parts: str) -> str:
+    digest = hashlib.sha1("/".join(parts).encode()).digest()
+    return "02:" + ":".join(f"{b:02x}" for b in digest[:5])
+
+
+@dataclass
+class FakeInterface:
+    name: str
+    mac_address: str
+    link: str | None = None
+    addresses: list[str] = field(default_factory=list)
+    up: bool = True
+    # (kind, options) of the root qdisc set with tc, e.g. ("netem", "delay 100ms loss 10%")
+    qdisc: tuple[str, str] | None = None
+
+
+@dataclass
+class FakeExecResult:
+    exit_code: int
+    output: bytes
+
+
+class FakeContainer:
+    """The bits of a Docker container read by the callers of Kathara: its labels and exec_run."""
+
+    def __init__(self, machine: "FakeMachine"):
+        self.machine = machine
+        self.name = f"kathara_{machine.lab_hash}_{machine.name}"
+        self.labels = {"name": machine.name, "lab_hash": machine.lab_hash, "user": "fake"}
+        self.status = "running" if machine.running else "exited"
+
+    def exec_run(self, cmd: str | list[str], **kwargs) -> FakeExecResult:
+        stdout, stderr, exit_code = self.machine.exec(cmd)
+        return FakeExecResult(exit_code, stdout or stderr)
+
+
+class FakeLinkStats:
+    def __init__(self, lab_hash: str, name: str, machines: list["FakeMachine"]):
+        self.lab_hash = lab_hash
+        self.name = name
+        self.network_name = f"kathara_{lab_hash}_{name}"
+        self.user = "fake"
+        self.containers = [FakeContainer(machine) for machine in machines]
+
+
+class FakeMachineStats:
+    def __init__(self, machine: "FakeMachine"):
+        self.lab_hash = machine.lab_hash
+        self.name = machine.name
+        self.container_name = f"kathara_{machine.lab_hash}_{machine.name}"
+        self.user = "fake"
+        self.image = machine.image
+        self.status = "running" if machine.running else "exited"
+        self.pids = 1
+        self.interfaces = ", ".join(machine.interfaces)
+        self.cpu_usage = "0.00%"
+        self.mem_usage = f"0 B / {machine.mem or '-'}"
+        self.mem_percent = "0.00%"
+        self.net_usage = "0 B / 0 B"
+
+    def to_dict(self) -> dict:
+        return {
+            "network_scenario_id": self.lab_hash,
+            "name": self.name,
+            "container_name": self.container_name,
+            "user": self.user,
+            "status": self.status,
+            "image": self.image,
+            "pids": self.pids,
+            "cpu_usage": self.cpu_usage,
+            "mem_usage": self.mem_usage,
+            "mem_percent": self.mem_percent,
+            "net_usage": self.net_usage,
+            "interfaces": self.interfaces,
+        }
+
+
+def _split_commands(command: str | list[str]) -> list[list[list[str]]]:
+    """Tokenize a shell command line into statements (split on ; && ||), each a pipeline of commands."""
+    if isinstance(command, list):
+        tokens = command
+    else:
+        lexer = shlex.shlex(command, posix=True, punctuation_chars=";&|")
+        lexer.whitespace_split = True
+        try:
+            tokens = list(lexer)
+        except ValueError:
+            tokens = command.split()
+    # bash -c '<script>' / sh -c '<script>', as run by exec_cmd and the injectors
+    if len(tokens) == 3 and tokens[0] in ("/bin/bash", "bash", "/bin/sh", "sh") and tokens[1] == "-c":
+        return _split_commands(tokens[2].replace('\\"', '"'))
+
+    statements, pipeline, current = [], [], []
+    for token in tokens:
+        if token in (";", "&&", "||", "&"):
+            if current:
+                pipeline.append(current)
+            if pipeline:
+                statements.append(pipeline)
+            pipeline, current = [], []
+        elif token == "|":
+            pipeline.append(current)
+            current = []
+        else:
+            current.append(token)
+    if current:
+        pipeline.append(current)
+    if pipeline:
+        statements.append(pipeline)
+    return statements
+
+
+class FakeMachine:
+    """State of a machine simulated from the lab model: interfaces and addresses from the startup file, static and
+    FRR-learnt routes, the FRR configuration and the tc qdiscs, updated by the commands that change them."""
+
+    def __init__(self, lab: "FakeLab", machine: Machine):
+        self.lab = lab
+        self.lab_hash = lab.hash
+        self.name = machine.name
+        self.image = machine.get_image()
+        self.mem = machine.get_mem()
+        self.running = True
+        self.frr_running = False
+        self.history: list[str] = []
+        self.interfaces: dict[str, FakeInterface] = {
+            "lo": FakeInterface("lo", "00:00:00:00:00:00", addresses=["127.0.0.1/8"]),
+        }
+        for num, interface in sorted(machine.interfaces.items()):
+            # None in place of an interface disconnected from a running machine
+            if interface is not None:
+                self.add_interface(num, interface.link.name, interface.mac_address)
+        # static routes, {"dst", "gateway", "dev"}
+        self.routes: list[dict] = []
+        self.frr_conf: list[str] = []
+        path = f"/{machine.name}/etc/frr/frr.conf"
+        if lab.model.fs.exists(path):
+            self.frr_conf = lab.model.fs.readtext(path).splitlines()
+        path = f"/{machine.name}.startup"
+        startup = lab.model.fs.readtext(path).splitlines() if lab.model.fs.exists(path) else []
+        for line in startup + list(machine.meta.get("exec_commands", [])):
+            if line.strip() and not line.strip().startswith("#"):
+                self.exec(line, record=False)
+
+    def add_interface(self, num: int, link: str, mac_address: str | None = None):
+        name = f"eth{num}"
+        mac_address = mac_address or _mac_address(self.lab.name, self.name, name)
+        self.interfaces[name] = FakeInterface(name, mac_address, link=link)
+
+    # --- addressing ----------------------------------------------------------------------------------------------
+    def addresses(self, up_only: bool = True) -> list[tuple[str, ipaddress.IPv4Interface]]:
+        return [
+            (interface.name, ipaddress.IPv4Interface(address))
+            for interface in self.interfaces.values()
+            if interface.up or not up_only
+            for address in interface.addresses
+            if interface.name != "lo"
+        ]
+
+    def owns(self, ip: str) -> bool:
+        # called on every machine of the lab for each ping, without parsing the addresses
+        return any(
+            address.split("/")[0] == ip
+            for interface in self.interfaces.values()
+            if interface.up and interface.name != "lo"
+            for address in interface.addresses
+        )
+
+    def kernel_routes(self) -> list[dict]:
+        """The routing table: connected routes of the up interfaces, static routes and the FRR-learnt routes."""
+        routes = [
+            {
+                "dst": str(address.network),
+                "dev": dev,
+                "protocol": "kernel",
+                "scope": "link",
+                "prefsrc": str(address.ip),
+            }
+            for dev, address in self.addresses()
+        ]
+        up = {dev for dev, _ in self.addresses()}
+        routes += [dict(route) for route in self.routes if route.get("dev") in up or route.get("dev") is None]
+        if self.frr_running:
+            routes += self.frr_routes()
+        return routes
+
+    def _dev_of(self, gateway: str | None) -> str | None:
+        if gateway is None:
+            return None
+        for dev, address in self.addresses():
+            if ipaddress.IPv4Address(gateway) in address.network:
+                return dev
+        return None
+
+    # --- FRR -----------------------------------------------------------------------------------------------------
+    def frr_sections(self) -> dict[str, dict]:
+        """{protocol: {"asn", "networks", "neighbors"}} of the router sections of the FRR configuration."""
+        sections, current = {}, None
+        for line in self.frr_conf:
+            words = line.split()
+            if not words:
+                continue
+            if words[0] == "router" and len(words) > 1 and words[1] in FRR_PROTOCOLS:
+                current = sections.setdefault(
+                    words[1], {"asn": words[2] if len(words) > 2 else None, "networks": [], "neighbors": {}}
+                )
+            elif not line.startswith(" "):
+                current = None
+            elif current is not None and words[0] == "network" and len(words) > 1:
+                current["networks"].append(words[1])
+            elif current is not None and words[0] == "neighbor" and len(words) > 3 and words[2] == "remote-as":
+                current["neighbors"][words[1]] = words[3]
+        return sections
+
+    def frr_peers(self, protocol: str) -> list[tuple[str, str]]:
+        """(address, interface) of the directly connected routers running protocol, i.e. the established sessions."""
+        peers = []
+        neighbors = self.frr_sections().get(protocol, {}).get("neighbors", {})
+        for dev, address in self.addresses():
+            link = self.interfaces[dev].link
+            for other in self.lab.machines_on_link(link):
+                if other is self or not other.frr_running or protocol not in other.frr_sections():
+                    continue
+                for other_dev, other_address in other.addresses():
+                    if other.interfaces[other_dev].link != link or other_address.ip not in address.network:
+                        continue
+                    if protocol != "bgp" or str(other_address.ip) in neighbors:
+                        peers.append((str(other_address.ip), dev))
+        return peers
+
+    def frr_routes(self) -> list[dict]:
+        """The static routes of the FRR configuration, and the networks announced by the other routers of each
+        protocol, via the first established peer."""
+        routes = []
+        connected = {str(address.network) for _, address in self.addresses()}
+        for line in self.frr_conf:
+            words = line.split()
+            if words[:2] == ["ip", "route"] and len(words) > 3:
+                dev = self._dev_of(words[3]) if re.fullmatch(r"[\d.]+", words[3]) else words[3]
+                # a static route is installed once its next hop is reachable
+                if dev is not None:
+                    routes.append({"dst": words[2], "gateway": words[3], "dev": dev, "protocol": "static"})
+        for protocol in self.frr_sections():
+            peers = self.frr_peers(protocol)
+            if not peers:
+                continue
+            gateway, dev = peers[0]
+            for network in self.lab.announced_networks(protocol, exclude=self):
+                if network not in connected and all(route["dst"] != network for route in routes):
+                    routes.append({"dst": network, "gateway": gateway, "dev": dev, "protocol": protocol})
+        return routes
+
+    def _vtysh(self, args: list[str]) -> tuple[str, str, int]:
+        if not self.frr_running:
+            return "", "Exiting: failed to connect to any daemons.", 1
+        commands = [args[i + 1] for i, arg in enumerate(args[:-1]) if arg == "-c"]
+        if commands and commands[0] in ("conf t", "configure terminal", "configure"):
+            self._configure(commands[1:])
+            return "", "", 0
+        output = [self._show(command) for command in commands]
+        return "\n".join(output), "", 0
+
+    def _configure(self, commands: list[str]):
+        section = None
+        for command in commands:
+            words = command.split()
+            if not words or words[0] in ("end", "write", "exit", "do"):
+                section = None if words and words[0] in ("end", "exit") else section
+                continue
+            if words[0] == "router":
+                section = command.strip()
+                if section not in [line.strip() for line in self.frr_conf]:
+                    self.frr_conf += [section, "!"]
+                continue
+            negate = words[0] == "no"
+            line = " ".join(words[1:] if negate else words)
+            if section is None:
+                if negate:
+                    self.frr_conf = [existing for existing in self.frr_conf if existing.strip() != line]
+                elif line not in self.frr_conf:
+                    # the global statements go before the vty section, at the end of the file
+                    stripped = [existing.strip() for existing in self.frr_conf]
+                    self.frr_conf.insert(stripped.index("line vty") if "line vty" in stripped else len(stripped), line)
+                continue
+            start = [existing.strip() for existing in self.frr_conf].index(section)
+            end = start + 1
+            while end < len(self.frr_conf) and self.frr_conf[end].startswith(" "):
+                end += 1
+            body = self.frr_conf[start + 1 : end]
+            if negate:
+                body = [existing for existing in body if not existing.strip().startswith(line)]
+            elif f" {line}" not in body:
+                body.append(f" {line}")
+            self.frr_conf[start + 1 : end] = body
+
+    def _show(self, command: str) -> str:
+        words = command.split()
+        if words[:2] in (["show", "running-config"], ["show", "run"]):
+            return "Building configuration...\n\nCurrent configuration:\n" + "\n".join(self.frr_conf) + "\nend"
+        if words[:3] == ["show", "ip", "route"]:
+            protocol = words[3] if len(words) > 3 else None
+            lines = []
+            for route in self.kernel_routes():
+                proto = route.get("protocol", "static")
+                if protocol is not None and proto != protocol:
+                    continue
+                if proto == "kernel":
+                    lines.append(f"C>* {route['dst']} is directly connected, {route['dev']}, 00:10:00")
+                else:
+                    code, distance = FRR_PROTOCOLS.get(proto, ("S", 1))
+                    dst = "0.0.0.0/0" if route["dst"] == "default" else route["dst"]
+                    lines.append(f"{code}>* {dst} [{distance}/0] via {route['gateway']}, {route['dev']}, 00:09:58")
+            return FRR_ROUTE_CODES + "\n" + "\n".join(lines)
+        sections = self.frr_sections()
+        if words[:3] in (["show", "bgp", "summary"], ["show", "ip", "bgp"]) and "bgp" in sections:
+            bgp = sections["bgp"]
+            router_id = next((str(address.ip) for _, address in self.addresses()), "0.0.0.0")
+            established = {address for address, _ in self.frr_peers("bgp")}
+            lines = [f"BGP router identifier {router_id}, local AS number {bgp['asn']} vrf-id 0"]
+            if words[:3] == ["show", "bgp", "summary"]:
+                lines.append(
+                    "Neighbor        V         AS   MsgRcvd   MsgSent   TblVer  InQ OutQ  Up/Down State/PfxRcd"
+                )
+                for neighbor, remote_as in bgp["neighbors"].items():
+                    state = "1" if neighbor in established else "Active"
+                    lines.append(
+                        f"{neighbor:<15} 4 {remote_as:>10}        10        10        0    0    0 00:10:00 {state}"
+                    )
+            else:
+                lines.append("   Network          Next Hop            Metric LocPrf Weight Path")
+                for network in bgp["networks"]:
+                    lines.append(f"*> {network:<16} 0.0.0.0                  0         32768 i")
+                for route in self.frr_routes():
+                    if route["protocol"] == "bgp":
+                        lines.append(f"*> {route['dst']:<16} {route['gateway']:<19} 0             0 i")
+            return "\n".join(lines)
+        if words[:4] == ["show", "ip", "ospf", "neighbor"] and "ospf" in sections:
+            lines = ["Neighbor ID     Pri State           Up Time         Dead Time Address         Interface"]
+            for address, dev in self.frr_peers("ospf"):
+                lines.append(f"{address:<15}   1 Full/DR         10m00s            35.000s {address:<15} {dev}")
+            return "\n".join(lines)
+        return ""
+
+    # --- commands ------------------------------------------------------------------------------------------------
+    def exec(self, command: str | list[str], record: bool = True) -> tuple[bytes, bytes, int]:
+        """Run a command line against the simulated state, returning (stdout, stderr, exit code) like Kathara."""
+        if record:
+            self.history.append(command if isinstance(command, str) else shlex.join(command))
+        stdout, stderr, exit_code = "", "", 0
+        for pipeline in _split_commands(command):
+            stdout, stderr, exit_code = self._run(pipeline[0])
+            for filter_command in pipeline[1:]:
+                stdout = self._filter(filter_command, stdout)
+        return stdout.encode(), stderr.encode(), exit_code
+
+    @staticmethod
+    def _filter(args: list[str], output: str) -> str:
+        if args and args[0] == "grep":
+            invert = "-v" in args
+            patterns = [arg for arg in args[1:] if not arg.startswith("-")]
+            if patterns:
+                return "\n".join(line for line in output.splitlines() if (patterns[0] in line) != invert)
+        if args and args[0] in ("head", "tail"):
+            lines = output.splitlines()
+            count = int(args[2]) if len(args) > 2 and args[1] == "-n" else 10
+            return "\n".join(lines[:count] if args[0] == "head" else lines[-count:])
+        return output
+
+    def _run(self, args: list[str]) -> tuple[str, str, int]:
+        if not args:
+            return "", "", 0
+        if args[0] == "ip":
+            return self._ip(args[1:])
+        if args[0] == "ifconfig":
+            return self._ifconfig(), "", 0
+        if args[0] == "tc":
+            return self._tc(args[1:])
+        if args[0] == "vtysh":
+            return self._vtysh(args[1:])
+        if args[0] == "ping":
+            return self._ping(args[1:])
+        if args[0] in ("service", "systemctl"):
+            return self._service(args[1:] if args[0] == "systemctl" else [args[2], args[1]] if len(args) > 2 else [])
+        if args[0] == "cat" and len(args) > 1:
+            match = re.fullmatch(r"/sys/class/net/(\S+)/address", args[1])
+            if match and match.group(1) in self.interfaces:
+                return self.interfaces[match.group(1)].mac_address, "", 0
+            if args[1] == "/etc/frr/frr.conf" and self.frr_conf:
+                return "\n".join(self.frr_conf), "", 0
+            return "", "", 0
+        if args[0] == "brctl" and len(args) > 2 and args[1] == "addbr":
+            self.interfaces.setdefault(args[2], FakeInterface(args[2], _mac_address(self.lab.name, self.name, args[2])))
+        return "", "", 0
+
+    def _ip(self, args: list[str]) -> tuple[str, str, int]:
+        as_json = "-j" in args
+        args = [arg for arg in args if not arg.startswith("-")]
+        obj, action = (args + ["show", "show"])[:2]
+        if obj in ("addr", "a", "address"):
+            if action in ("add", "del") and "dev" in args:
+                dev = args[args.index("dev") + 1]
+                interface = self.interfaces.setdefault(dev, FakeInterface(dev, _mac_address(self.name, dev)))
+                if action == "add" and args[2] not in interface.addresses:
+                    interface.addresses.append(args[2])
+                elif action == "del" and args[2] in interface.addresses:
+                    interface.addresses.remove(args[2])
+                return "", "", 0
+            names = [args[2]] if action == "show" and len(args) > 2 else list(self.interfaces)
+            if any(name not in self.interfaces for name in names):
+                return "", f'Device "{names[0]}" does not exist.', 1
+            if as_json:
+                return json.dumps([self._link_json(name) for name in names]), "", 0
+            return "\n".join(self._link_text(name) for name in names), "", 0
+        if obj in ("route", "r"):
+            if action in ("add", "del", "replace") and len(args) > 2:
+                route = {"dst": args[2]}
+                if "via" in args:
+                    route["gateway"] = args[args.index("via") + 1]
+                route["dev"] = args[args.index("dev") + 1] if "dev" in args else self._dev_of(route.get("gateway"))
+                self.routes = [existing for existing in self.routes if existing["dst"] != route["dst"]]
+                if action != "del":
+                    self.routes.append(route)
+                return "", "", 0
+            routes = self.kernel_routes()
+            if as_json:
+                return json.dumps(routes), "", 0
+            lines = []
+            for route in routes:
+                line = route["dst"]
+                line += f" via {route['gateway']}" if route.get("gateway") else ""
+                line += f" dev {route['dev']}"
+                if route.get("protocol") == "kernel":
+                    line += f" proto kernel scope link src {route['prefsrc']}"
+                elif route.get("protocol") in FRR_PROTOCOLS:
+                    line += f" proto {route['protocol']} metric 20"
+                lines.append(line)
+            return "\n".join(lines), "", 0
+        if obj == "link" and action == "set" and len(args) > 3:
+            interface = self.interfaces.get(args[2])
+            if interface is None:
+                return "", f'Cannot find device "{args[2]}"', 1
+            if args[3] in ("up", "down"):
+                interface.up = args[3] == "up"
+            return "", "", 0
+        if obj == "link":
+            if as_json:
+                return json.dumps([self._link_json(name) for name in self.interfaces]), "", 0
+            return "\n".join(self._link_text(name, addresses=False) for name in self.interfaces), "", 0
+        return "", "", 0
+
+    def _link_json(self, name: str) -> dict:
+        interface = self.interfaces[name]
+        index = list(self.interfaces).index(name) + 1
+        flags = ["LOOPBACK", "UP", "LOWER_UP"] if name == "lo" else ["BROADCAST", "MULTICAST"]
+        if name != "lo" and interface.up:
+            flags += ["UP", "LOWER_UP"]
+        return {
+            "ifindex": index,
+            "ifname": name,
+            "flags": flags,
+            "mtu": 65536 if name == "lo" else 1500,
+            "qdisc": interface.qdisc[0] if interface.qdisc else "noqueue",
+            "operstate": "UNKNOWN" if name == "lo" else ("UP" if interface.up else "DOWN"),
+            "link_type": "loopback" if name == "lo" else "ether",
+            "address": interface.mac_address,
+            "addr_info": [
+                {
+                    "family": "inet",
+                    "local": address.split("/")[0],
+                    "prefixlen": int(address.split("/")[1]),
+                    "scope": "host" if name == "lo" else "global",
+                    "label": name,
+                }
+                for address in interface.addresses
+            ],
+        }
+
+    def _link_text(self, name: str, addresses: bool = True) -> str:
+        link = self._link_json(name)
+        lines = [
+            f"{link['ifindex']}: {name}: <{','.join(link['flags'])}> mtu {link['mtu']} qdisc {link['qdisc']} "
+            f"state {link['operstate']} group default",
+            f"    link/{link['link_type']} {link['address']} brd ff:ff:ff:ff:ff:ff",
+        ]
+        if addresses:
+            for info in link["addr_info"]:
+                lines.append(f"    inet {info['local']}/{info['prefixlen']} scope {info['scope']} {name}")
+        return "\n".join(lines)
+
+    def _ifconfig(self) -> str:
+        blocks = []
+        for name, interface in self.interfaces.items():
+            flags = (
+                "73<UP,LOOPBACK,RUNNING>"
+                if name == "lo"
+                else ("4163<UP,BROADCAST,RUNNING,MULTICAST>" if interface.up else "4098<BROADCAST,MULTICAST>")
+            )
+            lines = [f"{name}: flags={flags}  mtu {65536 if name == 'lo' else 1500}"]
+            for address in interface.addresses:
+                address = ipaddress.IPv4Interface(address)
+                lines.append(
+                    f"        inet {address.ip}  netmask {address.netmask}  "
+                    f"broadcast {address.network.broadcast_address}"
+                )
+            lines.append(f"        ether {interface.mac_address}  txqueuelen 1000  (Ethernet)")
+            blocks.append("\n".join(lines))
+        return "\n\n".join(blocks)
+
+    def _tc(self, args: list[str]) -> tuple[str, str, int]:
+        stats = "-s" in args
+        args = [arg for arg in args if arg != "-s"]
+        if len(args) < 4 or args[0] != "qdisc" or args[2] != "dev" or args[3] not in self.interfaces:
+            return "", "", 0
+        action, interface = args[1], self.interfaces[args[3]]
+        if action in ("add", "replace", "change") and "root" in args:
+            rest = args[args.index("root") + 1 :]
+            if action == "add" and interface.qdisc is not None:
+                return "", "Error: Exclusivity flag on, cannot modify.", 2
+            interface.qdisc = (rest[0], " ".join(rest[1:])) if rest else None
+            return "", "", 0
+        if action == "del":
+            if interface.qdisc is None:
+                return "", "Error: Cannot delete qdisc with handle of zero.", 2
+            interface.qdisc = None
+            return "", "", 0
+        if action in ("show", "ls"):
+            if interface.qdisc is None:
+                line = "qdisc noqueue 0: root refcnt 2"
+            else:
+                line = f"qdisc {interface.qdisc[0]} 8001: root refcnt 2 {interface.qdisc[1]}".rstrip()
+            if stats:
+                line += "\n Sent 0 bytes 0 pkt (dropped 0, overlimits 0 requeues 0)\n backlog 0b 0p requeues 0"
+            return line, "", 0
+        return "", "", 0
+
+    def _ping(self, args: list[str]) -> tuple[str, str, int]:
+        count = int(args[args.index("-c") + 1]) if "-c" in args else 4
+        options = {"-c", "-i", "-W", "-w", "-s", "-I", "-t"}
+        positional = [arg for i, arg in enumerate(args) if not arg.startswith("-") and args[i - 1] not in options]
+        if not positional:
+            return "", "ping: usage error: Destination address required", 2
+        dst = positional[0]
+        target = self.lab.owner_of(dst)
+        received = count if target is not None and target.running and self.addresses() else 0
+        lines = [f"PING {dst} ({dst}) 56(84) bytes of data."]
+        lines += [f"64 bytes from {dst}: icmp_seq={seq} ttl=62 time=0.100 ms" for seq in range(1, received + 1)]
+        lines += [
+            "",
+            f"--- {dst} ping statistics ---",
+            f"{count} packets transmitted, {received} received, {100 - 100 * received // count}% packet loss, "
+            f"time {1000 * (count - 1)}ms",
+        ]
+        if received:
+            lines.append("rtt min/avg/max/mdev = 0.100/0.100/0.100/0.000 ms")
+        return "\n".join(lines), "", 0 if received else 1
+
+    def _service(self, args: list[str]) -> tuple[str, str, int]:
+        if len(args) < 2:
+            return "", "", 0
+        operation, service = args[0], args[1]
+        if service != "frr":
+            return "", "", 0
+        if operation in ("start", "restart"):
+            self.frr_running = True
+        elif operation == "stop":
+            self.frr_running = False
+        elif operation == "status":
+            return f"frr is {'running' if self.frr_running else 'stopped'}", "", 0 if self.frr_running else 3
+        return "", "", 0
+
+
+class FakeLab:
+    def __init__(self, model: Lab):
+        self.model = model
+        self.name = model.name
+        self.hash = model.hash
+        self.machines: dict[str, FakeMachine] = {}
+
+    def machines_on_link(self, link: str | None) -> list[FakeMachine]:
+        return [
+            machine
+            for machine in self.machines.values()
+            if machine.running
+            and any(interface.link == link and interface.up for interface in machine.interfaces.values())
+        ]
+
+    def owner_of(self, ip: str) -> FakeMachine | None:
+        for machine in self.machines.values():
+            if machine.owns(ip):
+                return machine
+        return None
+
+    def announced_networks(self, protocol: str, exclude: FakeMachine | None = None) -> list[str]:
+        networks = []
+        for machine in self.machines.values():
+            if machine is exclude or not machine.running or not machine.frr_running:
+                continue
+            section = machine.frr_sections().get(protocol)
+            if section is not None:
+                networks += section["networks"]
+        return networks
+
+
+class FakeKatharaManager:
+    """In-memory Kathara manager: deployed labs are simulated from their model instead of run as containers.
+
+    It implements the manager calls made through Kathara.get_instance() by the net envs, service/kathara, the
+    injectors and the MCP servers (deploy_lab, undeploy_lab, get_lab_from_api, exec, get_links_stats, ...), so
+    these run unchanged on a machine without Docker, e.g. to measure the overhead of the framework itself. The
+    machines answer the ip/tc/vtysh/ping/service commands from their simulated state, the other commands succeed
+    with an empty output and are kept in FakeMachine.history.
+
+    Args:
+        exec_latency: Seconds added to each exec, the round trip of a docker exec is about 50ms.
+        deploy_latency: Seconds added per deployed machine.
+
+    The state lives in the process that installed the backend, so the MCP servers only see it when they run in
+    that process. The direct Docker calls (LabContainerIndex, LabCheckpoint) are not covered.
+    """
+
+    def __init__(self, exec_latency: float = 0.0, deploy_latency: float = 0.0):
+        self.exec_latency = exec_latency
+        self.deploy_latency = deploy_latency
+        self.labs: dict[str, FakeLab] = {}
+        self.exec_count = 0
+        self._lock = threading.RLock()
+
+    def _find_lab(
+        self, lab_hash: str | None = None, lab_name: str | None = None, lab: Lab | None = None
+    ) -> FakeLab | None:
+        if lab is not None:
+            lab_name = lab.name
+        if lab_name is not None:
+            return self.labs.get(lab_name)
+        return next((fake_lab for fake_lab in self.labs.values() if fake_lab.hash == lab_hash), None)
+
+    # --- labs ----------------------------------------------------------------------------------------------------
+    def deploy_lab(
+        self, lab: Lab, selected_machines: set[str] | None = None, excluded_machines: set[str] | None = None
+    ):
+        with self._lock:
+            fake_lab = self.labs.get(lab.name)
+            if fake_lab is None or fake_lab.model is not lab:
+                fake_lab = self.labs[lab.name] = FakeLab(lab)
+            names = [
+                name
+                for name in lab.machines
+                if (not selected_machines or name in selected_machines)
+                and (not excluded_machines or name not in excluded_machines)
+            ]
+            for name in names:
+                fake_lab.machines[name] = FakeMachine(fake_lab, lab.machines[name])
+        time.sleep(self.deploy_latency * len(names))
+
+    def undeploy_lab(
+        self,
+        lab_hash: str | None = None,
+        lab_name: str | None = None,
+        lab: Lab | None = None,
+        selected_machines: set[str] | None = None,
+        excluded_machines: set[str] | None = None,
+        selected_links: set[str] | None = None,
+    ):
+        with self._lock:
+            fake_lab = self._find_lab(lab_hash, lab_name, lab)
+            if fake_lab is None:
+                return
+            for name in list(fake_lab.machines):
+                if (not selected_machines or name in selected_machines) and (
+                    not excluded_machines or name not in excluded_machines
+                ):
+                    del fake_lab.machines[name]
+            if not fake_lab.machines:
+                del self.labs[fake_lab.name]
+
+    def wipe(self, all_users: bool = False):
+        with self._lock:
+            self.labs.clear()
+
+    def get_lab_from_api(self, lab_hash: str | None = None, lab_name: str | None = None) -> Lab:
+        """The model of a deployed lab, restricted to its running machines, or an empty lab if not deployed."""
+        with self._lock:
+            fake_lab = self._find_lab(lab_hash, lab_name)
+            if fake_lab is None:
+                return Lab(lab_name or lab_hash)
+            if len(fake_lab.machines) == len(fake_lab.model.machines):
+                return fake_lab.model
+            lab = Lab(fake_lab.name)
+            for name in fake_lab.machines:
+                machine = fake_lab.model.machines[name]
+                lab.new_machine(name, **{"image": machine.get_image()})
+                for num, interface in machine.interfaces.items():
+                    if interface is not None:
+                        lab.connect_machine_to_link(name, interface.link.name, machine_iface_number=num)
+            return lab
+
+    def update_lab_from_api(self, lab: Lab):
+        pass
+
+    # --- runtime topology changes, on the model of a deployed lab as Kathara does ---------------------------------
+    def _deployed_lab(self, lab: Lab) -> FakeLab:
+        fake_lab = self.labs.get(lab.name)
+        if fake_lab is None:
+            raise Exception(f"Lab `{lab.name}` is not deployed.")
+        # the machines added to the lab read their files from the latest model
+        fake_lab.model = lab
+        return fake_lab
+
+    def deploy_machine(self, machine: Machine):
+        with self._lock:
+            fake_lab = self._deployed_lab(machine.lab)
+            fake_lab.machines[machine.name] = FakeMachine(fake_lab, machine)
+        time.sleep(self.deploy_latency)
+
+    def undeploy_machine(self, machine: Machine, keep_links: bool = False):
+        with self._lock:
+            self._deployed_lab(machine.lab).machines.pop(machine.name, None)
+
+    def deploy_link(self, link: Link):
+        # the links are implied by the interfaces of the machines
+        pass
+
+    def undeploy_link(self, link: Link):
+        pass
+
+    def connect_machine_to_link(self, machine: Machine, link: Link, mac_address: str | None = None):
+        with self._lock:
+            fake_machine = self._machine(machine.name, lab=machine.lab)
+            interface = machine.add_interface(link, mac_address=mac_address)
+            fake_machine.add_interface(interface.num, link.name, mac_address)
+
+    def disconnect_machine_from_link(self, machine: Machine, link: Link, keep_link: bool = False):
+        with self._lock:
+            fake_machine = self._machine(machine.name, lab=machine.lab)
+            machine.remove_interface(link)
+            for name, interface in list(fake_machine.interfaces.items()):
+                if interface.link == link.name:
+                    del fake_machine.interfaces[name]
+
+    def copy_files(self, machine: Machine, guest_to_host: dict[str, str | io.IOBase]):
+        with self._lock:
+            fake_machine = self._machine(machine.name, lab=machine.lab)
+            for path, source in guest_to_host.items():
+                if isinstance(source, str):
+                    with open(source, "rb") as f:
+                        content = f.read()
+                else:
+                    content = source.read()
+                if path == "/etc/frr/frr.conf":
+                    fake_machine.frr_conf = content.decode().splitlines()
+                fake_machine.history.append(f"copy {path}")
+
+    # --- machines ------------------------------------------------------------------------------------------------
+    def _machine(self, machine_name: str, lab_hash=None, lab_name=None, lab=None) -> FakeMachine:
+        fake_lab = self._find_lab(lab_hash, lab_name, lab)
+        if fake_lab is None or machine_name not in fake_lab.machines:
+            raise Exception(f"Machine `{machine_name}` not found.")
+        return fake_lab.machines[machine_name]
+
+    def exec(
+        self,
+        machine_name: str,
+        command: str | list[str],
+        lab_hash: str | None = None,
+        lab_name: str | None = None,
+        lab: Lab | None = None,
+        wait: bool | tuple[int, float] = False,
+        stream: bool = True,
+    ) -> Generator[tuple[bytes, bytes], None, None] | tuple[bytes, bytes, int]:
+        time.sleep(self.exec_latency)
+        with self._lock:
+            self.exec_count += 1
+            stdout, stderr, exit_code = self._machine(machine_name, lab_hash, lab_name, lab).exec(command)
+        if not stream:
+            return stdout, stderr, exit_code
+        return iter([(stdout, stderr)])
+
+    def get_machine_api_object(self, machine_name: str, lab_hash=None, lab_name=None, lab=None, all_users=False):
+        with self._lock:
+            return FakeContainer(self._machine(machine_name, lab_hash, lab_name, lab))
+
+    def get_machines_api_objects(self, lab_hash=None, lab_name=None, lab=None, all_users=False) -> list:
+        with self._lock:
+            fake_lab = self._find_lab(lab_hash, lab_name, lab)
+            return [FakeContainer(machine) for machine in fake_lab.machines.values()] if fake_lab else []
+
+    def get_machines_stats(
+        self, lab_hash=None, lab_name=None, lab=None, machine_name=None, all_users=False
+    ) -> Generator[dict[str, FakeMachineStats], None, None]:
+        while True:
+            with self._lock:
+                fake_lab = self._find_lab(lab_hash, lab_name, lab)
+                machines = fake_lab.machines.values() if fake_lab else []
+                yield {
+                    machine.name: FakeMachineStats(machine)
+                    for machine in machines
+                    if machine_name is None or machine.name == machine_name
+                }
+
+    # --- links ---------------------------------------------------------------------------------------------------
+    def get_links_stats(
+        self, lab_hash=None, lab_name=None, lab=None, link_name=None, all_users=False
+    ) -> Generator[dict[str, FakeLinkStats], None, None]:
+        while True:
+            with self._lock:
+                labs = (
+                    [self._find_lab(lab_hash, lab_name, lab)] if (lab_hash or lab_name or lab) else self.labs.values()
+                )
+                stats = {}
+                for fake_lab in labs:
+                    if fake_lab is None:
+                        continue
+                    links = {}
+                    for machine in fake_lab.machines.values():
+                        for interface in machine.interfaces.values():
+                            if interface.link is not None:
+                                links.setdefault(interface.link, []).append(machine)
+                    for name, machines in links.items():
+                        if link_name is None or name == link_name:
+                            link_stats = FakeLinkStats(fake_lab.hash, name, machines)
+                            stats[link_stats.network_name] = link_stats
+            yield stats
+
+
+def install_fake_backend(manager: FakeKatharaManager | None = None) -> FakeKatharaManager:
+    """Make Kathara.get_instance() return a Kathara facade over a FakeKatharaManager.
+
+    Install it before building the net envs, they keep the Kathara instance they were built with.
+    """
+    manager = manager or FakeKatharaManager()
+    instance = Kathara.__new__(Kathara)
+    instance.manager = manager
+    Kathara._Kathara__instance = instance
+    return manager
+
+
+def uninstall_fake_backend():
+    Kathara._Kathara__instance = None
+
+
+@contextmanager
+def fake_kathara(exec_latency: float = 0.0, deploy_latency: float = 0.0):
+    """Run a with block on a fresh FakeKatharaManager, then restore the previous Kathara instance."""
+    previous = Kathara._Kathara__instance
+    try:
+        yield install_fake_backend(FakeKatharaManager(exec_latency, deploy_latency))
+    finally:
+        Kathara._Kathara__instance = previous
+
+
+if __name__ == "__main__":
+    from llm4netlab.net_env.net_env_pool import get_net_env_instance
+    from llm4netlab.service.kathara import KatharaAPIALL
+
+    with fake_kathara(exec_latency=0.001) as manager:
+        net_env = get_net_env_instance("dc_clos_bgp", topo_size="s", use_cache=False)
+        manager.deploy_lab(net_env.lab)
+        api = KatharaAPIALL(lab_name=net_env.lab.name)
+        print(api.get_host_ip("pc_0_0", with_prefix=True), api.get_default_gateway("pc_0_0"))
+        print(api.frr_get_bgp_conf("leaf_router_0_0"))
+        print(api.get_links())
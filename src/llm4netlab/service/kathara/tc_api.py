@@ -1,6 +1,37 @@
 from llm4netlab.service.kathara.base_api import KatharaBaseAPI, _SupportsBase
 
 
+def netem_options(
+    loss: float | None = None,
+    delay_ms: int | None = None,
+    jitter_ms: int | None = None,
+    duplicate: float | None = None,
+    corrupt: float | None = None,
+    reorder: float | None = None,
+    limit: int | None = None,
+    rate: str | None = None,
+) -> str:
+    """Options of a netem qdisc, e.g. "loss 10% delay 50ms 5ms"."""
+    options = []
+    if loss is not None:
+        options.append(f"loss {loss}%")
+    if delay_ms is not None:
+        options.append(f"delay {delay_ms}ms" + (f" {jitter_ms}ms" if jitter_ms is not None else ""))
+    elif jitter_ms is not None:
+        raise ValueError("delay must be set with jitter")
+    if duplicate is not None:
+        options.append(f"duplicate {duplicate}%")
+    if reorder is not None:
+        options.append(f"reorder {reorder}%")
+    if corrupt is not None:
+        options.append(f"corrupt {corrupt}%")
+    if rate is not None:
+        options.append(f"rate {rate}")
+    if limit is not None:
+        options.append(f"limit {limit}")
+    return " ".join(options)
+
+
 class TCMixin:
     """
     Interfaces to interact with Linux Traffic within Kathara.
@@ -17,36 +48,33 @@ class TCMixin:
         corrupt: int = None,
         reorder: int = None,
         limit: int = None,
+        rate: str = None,
     ) -> list[str]:
         """
         Set traffic control (tc) parameters on a specific intf_name of a host.
+        The netem qdisc is replaced, so calling it again on the same interface updates the impairment.
 
         Args:
         host_name (str): Name of the host where the intf_name is located. (could be a switch or normal host)
         intf_name (str): Interface name (e.g., eth0, eth1).
         loss (int, optional): Packet loss percentage (0-100). Defaults to None.
         delay_ms (int, optional): Delay in milliseconds. Defaults to None.
-        jitter (int, optional): Jitter in milliseconds. Defaults to None.
+        jitter_ms (int, optional): Jitter in milliseconds. Defaults to None.
         duplicate (int, optional): Duplicate percentage (0-100). Defaults to None.
         reorder (int, optional): Reorder percentage (0-100). Defaults to None.
         corrupt (int, optional): Corruption percentage (0-100). Defaults to None.
+        rate (str, optional): Rate limit applied by netem (e.g., "10mbit"). Defaults to None.
         """
-        command = f"tc qdisc add dev {intf_name} root netem"
-        if loss is not None:
-            command += f" loss {loss}%"
-        if delay_ms is not None:
-            command += f" delay {delay_ms}ms"
-        if jitter_ms is not None:
-            assert delay_ms is not None, "delay must be set before jitter"
-            command += f" delay {delay_ms}ms {jitter_ms}ms"
-        if duplicate is not None:
-            command += f" duplicate {duplicate}%"
-        if reorder is not None:
-            command += f" reorder {reorder}%"
-        if corrupt is not None:
-            command += f" corrupt {corrupt}%"
-        if limit is not None:
-            command += f" limit {limit}"
+        command = f"tc qdisc replace dev {intf_name} root netem " + netem_options(
+            loss=loss,
+            delay_ms=delay_ms,
+            jitter_ms=jitter_ms,
+            duplicate=duplicate,
+            corrupt=corrupt,
+            reorder=reorder,
+            limit=limit,
+            rate=rate,
+        )
         return self._run_cmd(host_name, command)
 
     def tc_show_intf(self: _SupportsBase, host_name: str, intf_name: str) -> list[str]:
@@ -88,7 +116,7 @@ class TCMixin:
         burst (str): Burst size (e.g., "32kbit").
         limit (str): Limit size (e.g., "10000").
         """
-        command = f"tc qdisc add dev {intf_name} root tbf rate {rate} burst {burst} limit {limit}"
+        command = f"tc qdisc replace dev {intf_name} root tbf rate {rate} burst {burst} limit {limit}"
         return self._run_cmd(host_name, command)
 
 
@@ -109,11 +137,11 @@ if __name__ == "__main__":
         intf_name="eth1",
         loss=90,
         delay_ms=100,
-        jitter=10,
+        jitter_ms=10,
         duplicate=0,
         reorder=0,
         corrupt=0,
-        rate=100,
+        rate="100mbit",
     )
     print(kathara_api.tc_show_intf(host_name="s1", intf_name="eth1"))
     print(kathara_api.get_reachability())
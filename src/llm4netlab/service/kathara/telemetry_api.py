@@ -14,6 +14,8 @@ class TelemetryAPIMixin:
     token = "int_token"
     org = "int_org"
     bucket = "int_bucket"
+    # Keep consistent with INT_SPOOL_DIR in collector_src/int_collector.py.
+    int_spool_dir = "/var/spool/int_collector"
 
     def influx_list_buckets(self: _SupportsBase, host_name: str = "collector") -> list[str]:
         """List all buckets in the InfluxDB instance."""
@@ -89,6 +91,13 @@ class TelemetryAPIMixin:
         jsoned_result = self._csv_to_json(query_result)
         return [jsoned_result]
 
+    def int_collector_spool_status(self: _SupportsBase, host_name: str = "collector") -> list[str]:
+        """Size, lag and drop counts of the INT collector spool, one entry per collector process."""
+        query_cmd = f"find {self.int_spool_dir} -name stats.json -exec cat {{}} ';' -exec echo ';'"
+        result = self._run_cmd(host_name=host_name, command=query_cmd)
+        spools = [json.loads(line) for line in result.splitlines() if line.strip().startswith("{")]
+        return [json.dumps(spools, indent=2)]
+
 
 class KatharaTelemetryAPI(KatharaBaseAPI, TelemetryAPIMixin):
     """
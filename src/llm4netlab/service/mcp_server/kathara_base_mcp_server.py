@@ -88,7 +88,7 @@ def get_tc_statistics(host_name: str, interface: str) -> list[str]:
         list[str]: The tc statistics of the specified interface.
     """
     kathara_api = KatharaAPI(lab_name=LAB_NAME)
-    stats = kathara_api.tc_show_statistics(host_name=host_name, interface=interface)
+    stats = kathara_api.tc_show_statistics(host_name=host_name, intf_name=interface)
     return stats
 
 
@@ -68,6 +68,20 @@ def influx_query_measurement(measurement: str, limit: int = 10, offset: int = 0)
     return kathara_api.influx_query_measurement(measurement, limit=limit, offset=offset)
 
 
+@safe_tool
+@mcp.tool()
+def int_collector_spool_status() -> list[str]:
+    """Get the status of the INT collector spool, which buffers telemetry before it is written to InfluxDB.
+    A growing lag or non-zero drop count means recent telemetry may be missing from InfluxDB.
+
+    Returns:
+        list[str]: Pending bytes, lag in seconds, flushed/dropped record counts and the last write error
+            of each collector process, default in json format.
+    """
+    kathara_api = KatharaTelemetryAPI(lab_name=LAB_NAME)
+    return kathara_api.int_collector_spool_status()
+
+
 if __name__ == "__main__":
     # Initialize and run the server
     mcp.run(transport="stdio")
@@ -1,11 +1,14 @@
 import json
 import os
-import shutil
+import sqlite3
+import time
+from contextlib import closing
 from datetime import datetime
+from functools import lru_cache
 
 from pydantic import BaseModel
 
-from llm4netlab.config import BASE_DIR, RESULTS_DIR
+from llm4netlab.config import RESULTS_DIR, SESSION_DIR
 
 
 def generate_code():
@@ -23,54 +26,136 @@ class SessionKey(BaseModel):
     agent_type: str
 
 
+class SessionStore:
+    """SQLite store of the sessions, one row per session attribute, keyed by session_id.
+
+    The database is in WAL mode, so the step scripts, agents and MCP servers of concurrent sessions read and
+    update it without blocking each other, and an update writes only the attribute it changes.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.path.join(SESSION_DIR, "sessions.db")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(session_id TEXT PRIMARY KEY, created_at REAL NOT NULL, active INTEGER NOT NULL DEFAULT 1)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_attrs "
+                "(session_id TEXT NOT NULL, key TEXT NOT NULL, value TEXT, PRIMARY KEY (session_id, key))"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # autocommit, each statement is its own transaction
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def create(self, session_id: str) -> str:
+        """Register a new session, suffixed with _<n> if the ID is taken (e.g. two sessions in the same second)."""
+        candidate = session_id
+        with closing(self._connect()) as conn:
+            for n in range(2, 1000):
+                try:
+                    conn.execute("INSERT INTO sessions VALUES (?, ?, 1)", (candidate, time.time()))
+                    return candidate
+                except sqlite3.IntegrityError:
+                    candidate = f"{session_id}_{n}"
+        raise ValueError(f"Cannot allocate a session ID from {session_id}")
+
+    def set(self, session_id: str, values: dict):
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "INSERT INTO session_attrs VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id, key) DO UPDATE SET value = excluded.value",
+                [(session_id, key, json.dumps(value)) for key, value in values.items()],
+            )
+
+    def get(self, session_id: str) -> dict | None:
+        with closing(self._connect()) as conn:
+            if conn.execute("SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)).fetchone() is None:
+                return None
+            rows = conn.execute("SELECT key, value FROM session_attrs WHERE session_id = ?", (session_id,))
+            return {key: json.loads(value) for key, value in rows}
+
+    def latest(self) -> str | None:
+        """The most recent active session, for the step scripts run by hand without a session ID."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT session_id FROM sessions WHERE active = 1 ORDER BY created_at DESC LIMIT 1"
+            ).fetchone()
+            return row[0] if row else None
+
+    def close(self, session_id: str):
+        with closing(self._connect()) as conn:
+            conn.execute("UPDATE sessions SET active = 0 WHERE session_id = ?", (session_id,))
+
+
+@lru_cache(maxsize=None)
+def get_session_store(path: str | None = None) -> SessionStore:
+    return SessionStore(path)
+
+
 class Session:
-    def __init__(self) -> None:
-        pass
+    def __init__(self, session_id: str | None = None) -> None:
+        if session_id is not None:
+            self.session_id = session_id
 
-    def init_session(self):
-        self.session_id = generate_code()
-        os.makedirs(f"{BASE_DIR}/runtime", exist_ok=True)
+    @property
+    def _store(self) -> SessionStore:
+        return get_session_store()
 
-    def load_running_session(self):
-        session_meta = json.load(open(f"{BASE_DIR}/runtime/current_session.json", "r"))
+    def init_session(self):
+        self.session_id = self._store.create(generate_code())
+
+    def load_running_session(self, session_id: str | None = None):
+        """Load a session: the given one, else the one of this instance, of the LAB_SESSION_ID environment
+        variable, or the most recent active session."""
+        store = self._store
+        session_id = session_id or getattr(self, "session_id", None) or os.getenv("LAB_SESSION_ID") or store.latest()
+        session_meta = store.get(session_id) if session_id else None
+        if session_meta is None:
+            raise ValueError(f"No running session {session_id or ''}".strip())
+        self.session_id = session_id
         for key, value in session_meta.items():
             setattr(self, key, value)
 
-    def _write_session(self) -> str:
-        session_dict = self.__dict__
-        with open(f"{BASE_DIR}/runtime/current_session.json", "w") as f:
-            f.write(json.dumps(session_dict, indent=4))
+    def _write_session(self):
+        self._store.set(self.session_id, self.__dict__)
 
     def update_session(self, key: str, value: str):
         setattr(self, key, value)
-        self._write_session()
+        self._store.set(self.session_id, {key: value})
 
     def write_gt(self, gt: str):
         if hasattr(self, "problem_names") and hasattr(self, "task_level") and hasattr(self, "session_id"):
             if len(self.problem_names) > 1:
-                self.root_cause_name = "multiple_faults"
+                self.update_session("root_cause_name", "multiple_faults")
             else:
-                self.root_cause_name = self.problem_names[0]
-                self.session_dir = f"{RESULTS_DIR}/{self.root_cause_name}/{self.task_level}/{self.session_id}"
-            self._write_session()
+                self.update_session("root_cause_name", self.problem_names[0])
+                self.update_session(
+                    "session_dir", f"{RESULTS_DIR}/{self.root_cause_name}/{self.task_level}/{self.session_id}"
+                )
 
             os.makedirs(self.session_dir, exist_ok=True)
             with open(self.session_dir + "/ground_truth.json", "w") as f:
                 f.write(gt)
 
     def clear_session(self):
-        shutil.move(
-            f"{BASE_DIR}/runtime/current_session.json",
-            f"{self.session_dir}/session_meta.json",
-        )
+        """Save the session metadata with the results and mark the session as finished."""
+        path = f"{self.session_dir}/session_meta.json"
+        with open(f"{path}.tmp", "w") as f:
+            f.write(json.dumps(self.__dict__, indent=4))
+        os.replace(f"{path}.tmp", path)
+        self._store.close(self.session_id)
 
     def start_session(self):
-        self.start_time = datetime.now().timestamp()
-        self._write_session()
+        self.update_session("start_time", datetime.now().timestamp())
 
     def end_session(self):
-        self.end_time = datetime.now().timestamp()
-        self._write_session()
+        self.update_session("end_time", datetime.now().timestamp())
 
     def __str__(self) -> str:
         return json.dumps(self.__dict__, indent=4)
@@ -78,8 +163,7 @@ class Session:
 
 if __name__ == "__main__":
     session = Session()
-    session.load_session()
-    print(session)
+    session.init_session()
 
     session.update_session("lab_name", "test_lab")
     session.update_session("root_cause_category", "connectivity")
@@ -88,4 +172,6 @@ if __name__ == "__main__":
     session.update_session("backend_model", "gpt-4")
     session.update_session("agent_type", "default_agent")
 
-    session._write_session()
+    loaded = Session(session.session_id)
+    loaded.load_running_session()
+    print(loaded)
@@ -0,0 +1,200 @@
+import argparse
+import csv
+import functools
+import inspect
+import json
+import os
+import statistics
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from llm4netlab.config import RESULTS_DIR, SESSION_DIR
+
+""" Per-phase timing of the benchmark pipeline: spans appended to a JSONL record per session, and their report """
+
+# one <session_id>.jsonl per session, next to the results so that the workers of a parallel sweep keep theirs apart
+TIMING_DIR = os.getenv("TIMING_DIR") or (
+    os.path.join(RESULTS_DIR, "0_timing")
+    if RESULTS_DIR
+    else (os.path.join(SESSION_DIR, "timing") if SESSION_DIR else None)
+)
+
+
+def _record_path(session_id: str | None) -> str | None:
+    if TIMING_DIR is None:
+        return None
+    return os.path.join(TIMING_DIR, f"{session_id or os.getenv('LAB_SESSION_ID') or 'no_session'}.jsonl")
+
+
+def _write(path: str, record: dict):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # a single append of a short line, so the step scripts, agents and workers can share a record
+    with open(path, "a") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+
+
+@contextmanager
+def span(name: str, session_id: str | None = None, **attrs):
+    """Time a phase and append it to the timing record of the session.
+
+    The session defaults to LAB_SESSION_ID, as set in the MCP servers. A span that raises is recorded with its
+    error, and the error is raised again. Nothing is recorded without RESULTS_DIR, SESSION_DIR or TIMING_DIR.
+
+    Example:
+        with span("net_env.deploy", session_id, scenario=scenario_name):
+            net_env.deploy()
+    """
+    started_at = time.time()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        path = _record_path(session_id)
+        if path is not None:
+            record = {
+                "name": name,
+                "session_id": session_id or os.getenv("LAB_SESSION_ID"),
+                "started_at": started_at,
+                "duration": time.perf_counter() - start,
+                "pid": os.getpid(),
+                "error": error,
+            }
+            if attrs:
+                record["attrs"] = attrs
+            try:
+                _write(path, record)
+            except OSError:
+                # timing is best effort, it never fails the benchmark
+                pass
+
+
+def timed(name: str, session_id: str | None = None, **attrs):
+    """Decorator form of span, for both sync and async functions."""
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, session_id, **attrs):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, session_id, **attrs):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def load_timings(timing_dirs: list[str] | None = None) -> list[dict]:
+    """The spans of all the sessions recorded in timing_dirs (default: TIMING_DIR), e.g. one per parallel worker."""
+    records = []
+    for timing_dir in timing_dirs or [TIMING_DIR]:
+        if not timing_dir or not os.path.isdir(timing_dir):
+            continue
+        for filename in sorted(os.listdir(timing_dir)):
+            if not filename.endswith(".jsonl"):
+                continue
+            with open(os.path.join(timing_dir, filename), "r") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # a line cut by a killed process
+                        continue
+    return records
+
+
+def _percentile(values: list[float], q: float) -> float:
+    # values are sorted
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(q) - 1]
+
+
+def aggregate_timings(records: list[dict]) -> dict:
+    """Per span name: count, errors, total/mean/p50/p95/max seconds and share of the pipeline time.
+
+    The pipeline time is the sum of the top-level `phase.*` spans (start_net_env, inject_failure, start_agent,
+    eval). The other spans nest within them, e.g. the tool calls within agent.run, so their shares overlap.
+    """
+    durations = defaultdict(list)
+    errors = defaultdict(int)
+    for record in records:
+        durations[record["name"]].append(record["duration"])
+        if record.get("error"):
+            errors[record["name"]] += 1
+    total = sum(sum(values) for name, values in durations.items() if name.startswith("phase."))
+
+    spans = {}
+    for name, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+        values = sorted(values)
+        spans[name] = {
+            "count": len(values),
+            "errors": errors[name],
+            "total": round(sum(values), 3),
+            "mean": round(statistics.mean(values), 3),
+            "p50": round(statistics.median(values), 3),
+            "p95": round(_percentile(values, 95), 3),
+            "max": round(values[-1], 3),
+            "share": round(sum(values) / total, 3) if total else None,
+        }
+    return {
+        "sessions": len({record.get("session_id") for record in records}),
+        "pipeline_time": round(total, 3),
+        "spans": spans,
+    }
+
+
+def write_timing_report(timing_dirs: list[str] | None = None, output_dir: str | None = None) -> dict:
+    """Aggregate the timing records into timing_report.json and .csv in output_dir (default: RESULTS_DIR/0_summary)."""
+    report = aggregate_timings(load_timings(timing_dirs))
+    output_dir = output_dir or (os.path.join(RESULTS_DIR, "0_summary") if RESULTS_DIR else None)
+    if output_dir is None:
+        return report
+    os.makedirs(output_dir, exist_ok=True)
+    with open(os.path.join(output_dir, "timing_report.json"), "w") as f:
+        json.dump(report, f, indent=4)
+    with open(os.path.join(output_dir, "timing_report.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["span", "count", "errors", "total", "mean", "p50", "p95", "max", "share"])
+        for name, stats in report["spans"].items():
+            writer.writerow([name, *stats.values()])
+    return report
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"{report['sessions']} sessions, {report['pipeline_time']:.1f}s ({report['pipeline_time'] / 3600:.2f}h) "
+        "in the pipeline phases",
+        f"{'span':<40} {'count':>6} {'total(s)':>10} {'mean(s)':>9} {'p50(s)':>9} {'p95(s)':>9} {'share':>6}",
+    ]
+    for name, stats in report["spans"].items():
+        share = f"{stats['share']:.1%}" if stats["share"] is not None else "-"
+        lines.append(
+            f"{name:<40} {stats['count']:>6} {stats['total']:>10.1f} {stats['mean']:>9.2f} "
+            f"{stats['p50']:>9.2f} {stats['p95']:>9.2f} {share:>6}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report where the benchmark time goes, from the timing records")
+    parser.add_argument(
+        "--timing_dirs", type=str, nargs="*", default=None, help=f"Timing records (default: {TIMING_DIR})"
+    )
+    parser.add_argument(
+        "--output_dir", type=str, default=None, help="Where to write timing_report.json/csv (default: 0_summary)"
+    )
+    args = parser.parse_args()
+    print(format_report(write_timing_report(args.timing_dirs, args.output_dir)))
@@ -2,8 +2,10 @@ import argparse
 import logging
 from typing import Literal
 
+from llm4netlab.net_env.checkpoint import LabCheckpoint, reset_lab
 from llm4netlab.net_env.net_env_pool import get_net_env_instance
 from llm4netlab.utils.session import Session
+from llm4netlab.utils.timing import span
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,24 +22,53 @@ def parse_kv(s):
     return key, value
 
 
-def start_net_env(scenario_name: str, topo_size: Literal["s", "m", "l"] | None = None, redeploy: bool = True):
+def start_net_env(
+    scenario_name: str,
+    topo_size: Literal["s", "m", "l"] | None = None,
+    redeploy: bool = True,
+    use_checkpoint: bool = False,
+    lab_name: str | None = None,
+) -> str:
     """
-    Every run starts a new session.
-    """
-    net_env = get_net_env_instance(scenario_name, topo_size=topo_size)
-    if net_env.lab_exists() and redeploy:
-        net_env.undeploy()
-        net_env.deploy()
-    elif not net_env.lab_exists():
-        net_env.deploy()
+    Every run starts a new session, its ID is returned and passed to the follow-up steps.
 
-    # save session data for follow-up steps
+    With use_checkpoint, a running lab is reset from the checkpoint taken after its last fresh deploy instead of
+    being redeployed, and a redeploy happens only if the restored lab does not verify against the checkpoint.
+    A fresh deploy is then checkpointed, which takes a few seconds: only worth it when the lab is reused.
+    lab_name selects an instance of the scenario deployed under another name, e.g. leased from a LabPool.
+    """
+    # the session comes first, so that the deploy is timed in it
     session = Session()
     session.init_session()
-    session.update_session("scenario_name", scenario_name)
-    session.update_session("scenario_topo_size", topo_size)
+    with span("phase.start_net_env", session.session_id, scenario=scenario_name, topo_size=topo_size):
+        with span("net_env.build", session.session_id):
+            net_env = get_net_env_instance(scenario_name, topo_size=topo_size, lab_name=lab_name)
+        if net_env.lab_exists() and redeploy:
+            restored = False
+            if use_checkpoint:
+                with span("net_env.reset", session.session_id):
+                    restored = reset_lab(net_env, topo_size)
+            if not restored:
+                with span("net_env.deploy", session.session_id):
+                    net_env.undeploy()
+                    net_env.deploy()
+                if use_checkpoint:
+                    with span("net_env.checkpoint", session.session_id):
+                        LabCheckpoint.capture(net_env, topo_size).save()
+        elif not net_env.lab_exists():
+            with span("net_env.deploy", session.session_id):
+                net_env.deploy()
+            if use_checkpoint:
+                with span("net_env.checkpoint", session.session_id):
+                    LabCheckpoint.capture(net_env, topo_size).save()
+
+        # save session data for follow-up steps
+        session.update_session("scenario_name", scenario_name)
+        session.update_session("scenario_topo_size", topo_size)
+        session.update_session("lab_name", net_env.lab.name)
+        session.update_session("scenario_params", {"topo_size": topo_size, "lab_name": net_env.lab.name})
     logger.info(f"Started network environment: {scenario_name} with session ID: {session.session_id}")
-    return net_env
+    return session.session_id
 
 
 if __name__ == "__main__":
@@ -58,7 +89,13 @@ if __name__ == "__main__":
         help="Dynamic key=value pairs (e.g. --scenario_params topo_size=m )",
     )
 
+    parser.add_argument(
+        "--use_checkpoint",
+        action="store_true",
+        help="Restore a running lab from its checkpoint instead of redeploying it, and checkpoint fresh deploys",
+    )
+
     args = parser.parse_args()
 
     params = dict(args.scenario_params)
-    start_net_env(args.scenario, **params)
+    start_net_env(args.scenario, use_checkpoint=args.use_checkpoint, **params)
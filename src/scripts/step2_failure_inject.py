@@ -4,15 +4,18 @@ import logging
 from llm4netlab.orchestrator.problems.prob_pool import get_problem_instance, list_avail_problem_names
 from llm4netlab.orchestrator.problems.problem_base import TaskLevel
 from llm4netlab.utils.session import Session
+from llm4netlab.utils.timing import span
 
 
-def inject_failure(problem_names: list[str], task_level: TaskLevel, re_inject: bool = True):
+def inject_failure(
+    problem_names: list[str], task_level: TaskLevel, re_inject: bool = True, session_id: str | None = None
+):
     """
-    Inject failure into the network environment based on the root cause name.
+    Inject failure into the network environment based on the root cause name, and return the problem instance.
     """
     logger = logging.getLogger(__name__)
 
-    session = Session()
+    session = Session(session_id)
     session.load_running_session()
 
     for problem_name in problem_names:
@@ -20,26 +23,33 @@ def inject_failure(problem_names: list[str], task_level: TaskLevel, re_inject: b
         if problem_name not in list_avail_problem_names():
             raise ValueError(f"Unknown problem name: {problem_name}")
 
-    scenario_params = session.scenario_params if hasattr(session, "scenario_params") else {}
-    problem = get_problem_instance(
-        problem_names=problem_names, task_level=task_level, scenario_name=session.scenario_name, **scenario_params
-    )
-    if re_inject:
-        problem.inject_fault()
-    logger.info(
-        f"Session {session.session_id}, injected problem(s): {problem_names} at task level {task_level} under {session.scenario_name}."
-    )
-    task_description = problem.get_task_description()
+    with span("phase.inject_failure", session.session_id, problems=problem_names, task_level=task_level):
+        scenario_params = session.scenario_params if hasattr(session, "scenario_params") else {}
+        with span("inject.build_problem", session.session_id):
+            problem = get_problem_instance(
+                problem_names=problem_names,
+                task_level=task_level,
+                scenario_name=session.scenario_name,
+                **scenario_params,
+            )
+        if re_inject:
+            with span("inject.inject_fault", session.session_id):
+                problem.inject_fault()
+        logger.info(
+            f"Session {session.session_id}, injected problem(s): {problem_names} at task level {task_level} under {session.scenario_name}."
+        )
+        task_description = problem.get_task_description()
 
-    # save session data for follow-up steps
-    session.update_session("problem_names", problem_names)
-    session.update_session("task_level", task_level)
-    session.update_session("task_description", task_description)
+        # save session data for follow-up steps
+        session.update_session("problem_names", problem_names)
+        session.update_session("task_level", task_level)
+        session.update_session("task_description", task_description)
 
-    # save the ground truth for evaluation
-    gt = problem.get_submission().model_dump_json()
-    session.write_gt(gt)
+        # save the ground truth for evaluation
+        gt = problem.get_submission().model_dump_json()
+        session.write_gt(gt)
     logger.info(f"Ground truth saved for session ID: {session.session_id}")
+    return problem
 
 
 if __name__ == "__main__":
@@ -61,8 +71,11 @@ if __name__ == "__main__":
         default=TaskLevel.RCA,
         help="Task level for the problem (default: detection)",
     )
+    parser.add_argument(
+        "--session_id", type=str, default=None, help="Session to inject into (default: the latest running session)"
+    )
     args = parser.parse_args()
 
     problem_names = [name.strip() for name in args.problems]
     task_level = TaskLevel(args.task_level)
-    inject_failure(problem_names, task_level)
+    inject_failure(problem_names, task_level, session_id=args.session_id)
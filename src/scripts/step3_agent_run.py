@@ -4,28 +4,33 @@ import logging
 
 from agent.react_agent import BasicReActAgent
 from llm4netlab.utils.session import Session
+from llm4netlab.utils.timing import span
 
 
-def _agent_selector(agent_type: str, backend_model: str, max_steps: int = 20):
+def _agent_selector(agent_type: str, backend_model: str, max_steps: int = 20, session_id: str | None = None):
     match agent_type.lower():
         case "react":
-            return BasicReActAgent(backend_model=backend_model, max_steps=max_steps)
+            return BasicReActAgent(backend_model=backend_model, max_steps=max_steps, session_id=session_id)
         case _:
             pass
 
 
-def start_agent(agent_type: str, backend_model: str, max_steps: int):
+def start_agent(agent_type: str, backend_model: str, max_steps: int, session_id: str | None = None):
     logger = logging.getLogger("AgentRunner")
 
-    session = Session()
+    session = Session(session_id)
     session.load_running_session()
     session.update_session("agent_type", agent_type)
     session.update_session("backend_model", backend_model)
     session.start_session()
 
     logger.info(f"Starting agent: {agent_type}  with backend {backend_model} in session {session.session_id}")
-    agent = _agent_selector(agent_type, backend_model, max_steps=max_steps)
-    asyncio.run(agent.run(task_description=session.task_description))
+    with span("phase.start_agent", session.session_id, agent_type=agent_type, backend_model=backend_model):
+        # builds the agents and lists the tools of their MCP servers
+        with span("agent.build", session.session_id):
+            agent = _agent_selector(agent_type, backend_model, max_steps=max_steps, session_id=session.session_id)
+        with span("agent.run", session.session_id):
+            asyncio.run(agent.run(task_description=session.task_description))
 
     # stop session
     session.end_session()
@@ -48,5 +53,8 @@ if __name__ == "__main__":
     parser.add_argument(
         "--max_steps", type=int, nargs="?", default=20, help="Maximum steps for the agent to take (default: 20)"
     )
+    parser.add_argument(
+        "--session_id", type=str, default=None, help="Session to run the agent in (default: the latest running session)"
+    )
     args = parser.parse_args()
-    start_agent(args.agent_type, args.backend_model, args.max_steps)
+    start_agent(args.agent_type, args.backend_model, args.max_steps, session_id=args.session_id)
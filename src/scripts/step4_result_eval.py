@@ -4,13 +4,13 @@ import logging
 import os
 import textwrap
 
-from llm4netlab.config import BASE_DIR
 from llm4netlab.evaluator.llm_judge import JudgeResponse, LLMJudge
 from llm4netlab.evaluator.result_log import EvalResult, record_eval_result
 from llm4netlab.evaluator.trace_parser import AgentTraceParser
 from llm4netlab.net_env.net_env_pool import get_net_env_instance
 from llm4netlab.orchestrator.problems.prob_pool import get_problem_instance
 from llm4netlab.utils.session import Session
+from llm4netlab.utils.timing import span
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,6 +23,7 @@ def _eval_problem(session: Session, judge_model: str):
         problem_names=session.problem_names,
         task_level=session.task_level,
         scenario_name=session.scenario_name,
+        **getattr(session, "scenario_params", {}),
     )
 
     if not os.path.exists(sub_log_path):
@@ -34,7 +35,8 @@ def _eval_problem(session: Session, judge_model: str):
         with open(sub_log_path, "r") as f:
             submission = json.load(f)
         # task-specific evaluation
-        evaluator_acc, evaluator_precision, evaluator_recall, evaluator_f1 = problem.eval(submission=submission)
+        with span("eval.problem", session.session_id):
+            evaluator_acc, evaluator_precision, evaluator_recall, evaluator_f1 = problem.eval(submission=submission)
 
     # agent trace
     trace_path = os.path.join(session.session_dir, "conversation.log")
@@ -42,16 +44,17 @@ def _eval_problem(session: Session, judge_model: str):
     logger.info(f"Evaluating session {session.session_id} using LLM-as-Judge.")
     # llm as judge evaluation
     llm_judge = LLMJudge(judge_model=judge_model)
-    judge_response: JudgeResponse = llm_judge.evaluate_agent(
-        problem_description=problem.META.description,
-        net_env_info=problem.net_env.get_info(),
-        ground_truth=textwrap.dedent(f"""\
-                The root cause is {problem.root_cause_name}.
-                The faulty devices are: {", ".join(problem.faulty_devices)}.
-            """),
-        trace_path=trace_path,
-        save_path=f"{session.session_dir}/llm_judge.json",
-    )
+    with span("eval.llm_judge", session.session_id, judge_model=judge_model):
+        judge_response: JudgeResponse = llm_judge.evaluate_agent(
+            problem_description=problem.META.description,
+            net_env_info=problem.net_env.get_info(),
+            ground_truth=textwrap.dedent(f"""\
+                    The root cause is {problem.root_cause_name}.
+                    The faulty devices are: {", ".join(problem.faulty_devices)}.
+                """),
+            trace_path=trace_path,
+            save_path=f"{session.session_dir}/llm_judge.json",
+        )
     relevance_score = judge_response.scores.relevance.score
     correctness_score = judge_response.scores.correctness.score
     efficiency_score = judge_response.scores.efficiency.score
@@ -96,20 +99,21 @@ def _eval_problem(session: Session, judge_model: str):
     record_eval_result(eval_result)
 
 
-def eval(judge_model, destroy_env=True):
+def eval(judge_model, destroy_env=True, session_id: str | None = None):
     """
-    Destroy the network environment associated with the current session.
+    Evaluate the session, then destroy its network environment if destroy_env is set.
     """
-    session = Session()
+    session = Session(session_id)
     session.load_running_session()
 
-    _eval_problem(session, judge_model)
-    net_env = get_net_env_instance(session.scenario_name)
-    if destroy_env and net_env.lab_exists():
-        net_env.undeploy()
+    with span("phase.eval", session.session_id, judge_model=judge_model):
+        _eval_problem(session, judge_model)
+        net_env = get_net_env_instance(session.scenario_name, **getattr(session, "scenario_params", {}))
+        if destroy_env and net_env.lab_exists():
+            with span("eval.teardown", session.session_id):
+                net_env.undeploy()
     logger.info(f"Destroyed network environment: {session.scenario_name} with session ID: {session.session_id}")
     session.clear_session()
-    assert not os.path.exists(f"{BASE_DIR}/runtime/current_session.json")
 
 
 if __name__ == "__main__":
@@ -121,6 +125,9 @@ if __name__ == "__main__":
         default="qwen3:32b",
         help="LLM model used for judgment (default: qwen3:32b)",
     )
+    parser.add_argument(
+        "--session_id", type=str, default=None, help="Session to evaluate (default: the latest running session)"
+    )
     args = parser.parse_args()
 
-    eval(judge_model=args.judge_model)
+    eval(judge_model=args.judge_model, session_id=args.session_id)
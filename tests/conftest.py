@@ -0,0 +1,33 @@
+import os
+import tempfile
+
+import pytest
+
+""" The tests run on the in-memory Kathara backend, no Docker daemon is needed """
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# read by llm4netlab.config on import: the lab templates are found under BASE_DIR, the sessions and results are
+# kept out of the repository
+os.environ.setdefault("BASE_DIR", ROOT_DIR)
+os.environ.setdefault("SESSION_DIR", tempfile.mkdtemp(prefix="llm4netlab_sessions_"))
+os.environ.setdefault("RESULTS_DIR", tempfile.mkdtemp(prefix="llm4netlab_results_"))
+
+from llm4netlab.net_env import model_cache  # noqa: E402
+from llm4netlab.net_env.net_env_pool import clear_net_env_cache  # noqa: E402
+from llm4netlab.service.kathara.fake_backend import (  # noqa: E402
+    FakeKatharaManager,
+    install_fake_backend,
+    uninstall_fake_backend,
+)
+
+
+@pytest.fixture(autouse=True)
+def kathara(tmp_path, monkeypatch) -> FakeKatharaManager:
+    """A fresh fake Kathara backend per test, with empty model caches."""
+    monkeypatch.setattr(model_cache, "MODEL_CACHE_DIR", str(tmp_path / "lab_models"))
+    clear_net_env_cache()
+    manager = install_fake_backend(FakeKatharaManager())
+    yield manager
+    uninstall_fake_backend()
+    clear_net_env_cache()
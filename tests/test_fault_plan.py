@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from llm4netlab.generator.fault.fault_plan import FaultPlan, FaultPlanError
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str, fail: bool = False):
+        def step():
+            with self._lock:
+                self.calls.append(name)
+            if fail:
+                raise RuntimeError(f"{name} failed")
+
+        return step
+
+
+def test_failing_step_rolls_back():
+    calls = Recorder()
+    plan = FaultPlan(max_concurrency=1)
+    plan.add_step("link_down", calls("inject link_down"), calls("undo link_down"))
+    plan.add_step("route_missing", calls("inject route_missing", fail=True), calls("undo route_missing"))
+    plan.add_step("dns_down", calls("inject dns_down"), calls("undo dns_down"), depends_on=["route_missing"])
+
+    with pytest.raises(FaultPlanError, match="route_missing"):
+        plan.inject()
+
+    # the step depending on the failed one is never started, the partial step is undone too
+    assert "inject dns_down" not in calls.calls
+    assert "undo dns_down" not in calls.calls
+    assert sorted(calls.calls[-2:]) == ["undo link_down", "undo route_missing"]
+    assert plan.undo_log == []
+
+
+def test_recover_undoes_dependents_first():
+    calls = Recorder()
+    plan = FaultPlan()
+    plan.add_step("a", calls("inject a"), calls("undo a"))
+    plan.add_step("b", calls("inject b"), calls("undo b"), depends_on=["a"])
+    plan.add_step("c", calls("inject c"), calls("undo c"), depends_on=["b"])
+    plan.inject()
+    assert calls.calls == ["inject a", "inject b", "inject c"]
+
+    plan.recover()
+    assert calls.calls[3:] == ["undo c", "undo b", "undo a"]
+
+
+def test_missed_deadline_rolls_back():
+    release = threading.Event()
+    undone = []
+    plan = FaultPlan(rollback_grace=5.0)
+    plan.add_step("slow", lambda: release.wait(5.0), lambda: undone.append("slow"), deadline=0.1)
+    timer = threading.Timer(0.3, release.set)
+    timer.start()
+    with pytest.raises(FaultPlanError, match="deadline"):
+        plan.inject()
+    timer.join()
+    assert undone == ["slow"]
+
+
+def test_dependency_cycle_is_rejected():
+    plan = FaultPlan()
+    plan.add_step("a", lambda: None, depends_on=["b"])
+    plan.add_step("b", lambda: None, depends_on=["a"])
+    with pytest.raises(ValueError, match="cycle"):
+        plan.inject()
@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+COLLECTOR_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src/llm4netlab/net_env/p4/p4_int/collector_src"
+)
+# the collector scripts import each other as top-level modules, as they do in the collector container
+sys.path.insert(0, COLLECTOR_DIR)
+
+from int_collector import parse_report_scapy  # noqa: E402
+from int_defines import INNER_IP_HEADER_OFFSET, REPORT_PAYLOAD_OFFSET  # noqa: E402
+from int_parser import diff_with_scapy, get_hop_layout, parse_report  # noqa: E402
+from int_replay import build_report_frame, generate_reports  # noqa: E402
+from scapy.layers.l2 import Ether  # noqa: E402
+
+
+@pytest.mark.parametrize("hops", [1, 3, 6])
+@pytest.mark.parametrize("masks", [(0b1000, 0b0000), (0b1010, 0b0000), (0b1111, 0b0000), (0b1111, 0b1111)])
+def test_struct_parser_matches_scapy(hops, masks):
+    for frame in generate_reports(8, hops, *masks, flows=4, templates=8):
+        report = parse_report(frame)
+        assert report is not None
+        assert report.int_hop_num == hops
+        assert diff_with_scapy(report, parse_report_scapy(Ether(frame))) == []
+
+
+def test_non_int_frames_are_skipped():
+    frame = bytearray(build_report_frame([1, 2], 0b1111, 0b1111))
+    # not the INT DSCP in the inner IPv4 TOS
+    frame[REPORT_PAYLOAD_OFFSET + INNER_IP_HEADER_OFFSET + 1] = 0
+    assert parse_report(bytes(frame)) is None
+    assert parse_report_scapy(Ether(bytes(frame))) is None
+    # truncated
+    assert parse_report(frame[:REPORT_PAYLOAD_OFFSET]) is None
+
+
+def test_hop_layout_longer_than_hop_metadata():
+    # every instruction of the first word needs 4 words per hop
+    assert get_hop_layout(0b1111, 0b0000, 12) is None
+    assert get_hop_layout(0b1111, 0b0000, 16).hop_m_len == 16
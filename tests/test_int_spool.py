@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+COLLECTOR_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src/llm4netlab/net_env/p4/p4_int/collector_src"
+)
+sys.path.insert(0, COLLECTOR_DIR)
+
+from int_spool import LineProtocolSpool  # noqa: E402
+
+
+def failing_writer(lines):
+    raise ConnectionError("InfluxDB is down")
+
+
+def test_failed_write_keeps_the_batch(tmp_path):
+    spool = LineProtocolSpool(str(tmp_path))
+    spool.append(["m v=1", "m v=2"])
+    with pytest.raises(ConnectionError):
+        spool.flush_once(failing_writer)
+
+    written = []
+    assert spool.flush_once(written.extend) == 2
+    assert written == ["m v=1", "m v=2"]
+    assert spool.pending_bytes() == 0
+    spool.close()
+
+
+def test_replay_after_restart(tmp_path):
+    # the collector dies while InfluxDB is down
+    spool = LineProtocolSpool(str(tmp_path), segment_size=256, batch_bytes=64)
+    lines = [f"m,flow={i} v={i}" for i in range(20)]
+    for line in lines:
+        assert spool.append([line])
+    with pytest.raises(ConnectionError):
+        spool.flush_once(failing_writer)
+    assert len(spool.segments) > 1
+    spool.close()
+
+    # the next collector replays every record, in order, from the segments left on disk
+    spool = LineProtocolSpool(str(tmp_path), segment_size=256, batch_bytes=64)
+    written = []
+    while spool.flush_once(written.extend):
+        pass
+    assert written == lines
+    assert spool.pending_bytes() == 0
+    assert len(spool.segments) == 1
+    spool.close()
+
+
+def test_full_spool_drops_instead_of_blocking(tmp_path):
+    spool = LineProtocolSpool(str(tmp_path), segment_size=64, max_segments=2)
+    appended = [spool.append([f"m v={i:020d}"]) for i in range(8)]
+    assert not all(appended)
+    assert spool.stats()["dropped_lines"] == appended.count(False)
+    spool.close()
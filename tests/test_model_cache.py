@@ -0,0 +1,56 @@
+import os
+import pickle
+
+from llm4netlab.net_env import model_cache
+from llm4netlab.net_env.data_center_routing.dc_clos_bgp.lab_workers import DCClosBGP
+from llm4netlab.net_env.model_cache import dump_model, load_model, load_or_build, rename_net_env
+from llm4netlab.net_env.resize import compute_delta
+
+
+def test_dump_load_round_trip():
+    net_env = DCClosBGP("s")
+    model = dump_model(net_env)
+    loaded = load_model(DCClosBGP, pickle.loads(pickle.dumps(model)))
+
+    assert dump_model(loaded)["files"] == model["files"]
+    assert dump_model(loaded)["machines"] == model["machines"]
+    assert compute_delta(loaded.lab, net_env.lab).empty
+    assert loaded.hosts == net_env.hosts
+    assert loaded.routers == net_env.routers
+    assert loaded.topo_dims == net_env.topo_dims
+    assert loaded.instance is net_env.instance
+
+
+def test_round_trip_keeps_disconnected_interfaces():
+    net_env = DCClosBGP("s")
+    machine = net_env.lab.machines["leaf_router_0_0"]
+    machine.interfaces[0].link.machines.pop(machine.name)
+    machine.interfaces[0] = None
+
+    loaded = load_model(DCClosBGP, dump_model(net_env))
+    interfaces = loaded.lab.machines["leaf_router_0_0"].interfaces
+    assert interfaces[0] is None
+    assert {num: interface.link.name for num, interface in interfaces.items() if interface is not None} == {
+        num: interface.link.name for num, interface in machine.interfaces.items() if interface is not None
+    }
+
+
+def test_rename_leaves_the_original_untouched():
+    net_env = DCClosBGP("s")
+    renamed = rename_net_env(net_env, "dc_clos_bgp_pool1")
+    assert renamed.lab.name == renamed.name == "dc_clos_bgp_pool1"
+    assert net_env.lab.name == net_env.name == "dc_clos_bgp"
+    assert compute_delta(renamed.lab, net_env.lab).empty
+
+
+def test_load_or_build_reuses_the_cached_model(monkeypatch):
+    arguments = (("topo_size", "s"),)
+    built = load_or_build("dc_clos_bgp", DCClosBGP, arguments)
+    assert len(os.listdir(model_cache.MODEL_CACHE_DIR)) == 1
+
+    def constructor_called(*args, **kwargs):
+        raise AssertionError("the cached model should be loaded")
+
+    monkeypatch.setattr(DCClosBGP, "__init__", constructor_called)
+    cached = load_or_build("dc_clos_bgp", DCClosBGP, arguments)
+    assert dump_model(cached)["files"] == dump_model(built)["files"]
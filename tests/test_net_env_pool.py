@@ -0,0 +1,28 @@
+from llm4netlab.net_env.net_env_pool import _cache_key, get_net_env_instance
+
+
+def test_cache_key_applies_the_constructor_defaults():
+    default = _cache_key("dc_clos_bgp", {})
+    assert _cache_key("dc_clos_bgp", {"topo_size": "s"}) == default
+    # an explicit dimension left to None is the preset one
+    assert _cache_key("dc_clos_bgp", {"topo_size": "s", "leaves_per_pod": None}) == default
+    assert _cache_key("dc_clos_bgp", {"topo_size": "m"}) != default
+    assert _cache_key("dc_clos_bgp", {"leaves_per_pod": 3}) != default
+    # the keyword order does not matter
+    assert _cache_key("dc_clos_bgp", {"topo_size": "m", "leaves_per_pod": 3}) == _cache_key(
+        "dc_clos_bgp", {"leaves_per_pod": 3, "topo_size": "m"}
+    )
+
+
+def test_equivalent_arguments_share_the_instance():
+    net_env = get_net_env_instance("dc_clos_bgp")
+    assert get_net_env_instance("dc_clos_bgp", topo_size="s") is net_env
+    assert get_net_env_instance("dc_clos_bgp", topo_size="m") is not net_env
+    assert get_net_env_instance("dc_clos_bgp", use_cache=False) is not net_env
+
+
+def test_renamed_instances_are_memoized():
+    net_env = get_net_env_instance("dc_clos_bgp", topo_size="s", lab_name="dc_clos_bgp_pool0")
+    assert net_env.lab.name == net_env.name == "dc_clos_bgp_pool0"
+    assert get_net_env_instance("dc_clos_bgp", lab_name="dc_clos_bgp_pool0") is net_env
+    assert get_net_env_instance("dc_clos_bgp").lab.name == "dc_clos_bgp"
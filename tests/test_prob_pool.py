@@ -0,0 +1,67 @@
+import json
+import os
+
+import pytest
+
+from llm4netlab.orchestrator.problems import prob_pool
+
+
+@pytest.fixture
+def problems_dir(tmp_path, monkeypatch):
+    """A problems package of one module, whose manifest builds are counted instead of importing the problems."""
+    package = tmp_path / "problems"
+    package.mkdir()
+    (package / "link_issue.py").write_text("")
+    builds = []
+
+    def register_problems():
+        builds.append(1)
+        return {}
+
+    monkeypatch.setattr(prob_pool, "PROBLEMS_DIR", str(package))
+    monkeypatch.setattr(prob_pool, "MANIFEST_PATH", str(tmp_path / "problem_manifest.json"))
+    monkeypatch.setattr(prob_pool, "_register_problems", register_problems)
+    monkeypatch.setattr(prob_pool, "_MANIFEST", None)
+    return package, builds
+
+
+def test_manifest_is_reused_until_a_source_changes(problems_dir):
+    package, builds = problems_dir
+    prob_pool.load_manifest()
+    assert len(builds) == 1
+    with open(prob_pool.MANIFEST_PATH) as f:
+        assert list(json.load(f)["sources"]) == ["link_issue.py"]
+
+    # another process reads the manifest written by the first one
+    prob_pool._MANIFEST = None
+    prob_pool.load_manifest()
+    assert len(builds) == 1
+
+    # a modified module
+    stat = os.stat(package / "link_issue.py")
+    os.utime(package / "link_issue.py", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    prob_pool._MANIFEST = None
+    prob_pool.load_manifest()
+    assert len(builds) == 2
+
+    # a new module
+    (package / "service_issue.py").write_text("")
+    prob_pool._MANIFEST = None
+    assert set(prob_pool.load_manifest()["sources"]) == {"link_issue.py", "service_issue.py"}
+    assert len(builds) == 3
+
+    # a removed module
+    (package / "link_issue.py").unlink()
+    prob_pool._MANIFEST = None
+    assert list(prob_pool.load_manifest()["sources"]) == ["service_issue.py"]
+    assert len(builds) == 4
+
+
+def test_corrupted_manifest_is_rebuilt(problems_dir):
+    _, builds = problems_dir
+    with open(prob_pool.MANIFEST_PATH, "w") as f:
+        f.write("{not json")
+    prob_pool.load_manifest()
+    assert len(builds) == 1
+    with open(prob_pool.MANIFEST_PATH) as f:
+        assert "link_issue.py" in json.load(f)["sources"]
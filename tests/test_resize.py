@@ -0,0 +1,60 @@
+import collections
+
+import pytest
+
+from llm4netlab.net_env.net_env_pool import get_net_env_instance
+from llm4netlab.net_env.resize import compute_delta, resize_lab
+from llm4netlab.service.kathara import KatharaAPIALL
+
+
+def assert_matches_fresh_build(kathara, net_env, topo_size, **dims):
+    fresh = get_net_env_instance(net_env.LAB_NAME, topo_size=topo_size, **dims)
+    assert compute_delta(net_env.lab, fresh.lab).empty
+    running = kathara.labs[net_env.lab.name].machines
+    assert set(running) == set(fresh.lab.machines)
+    addresses = collections.Counter(
+        str(address.ip) for machine in running.values() for _, address in machine.addresses()
+    )
+    assert [ip for ip, count in addresses.items() if count > 1] == []
+
+
+def assert_reachable(net_env):
+    api = KatharaAPIALL(lab_name=net_env.lab.name)
+    source = net_env.hosts[0]
+    for host in net_env.hosts[1:]:
+        assert " 0% packet loss" in api._run_cmd(source, f"ping -c 1 -W 1 {api.get_host_ip(host)}"), host
+
+
+# the hosts of ospf_enterprise_dhcp get their address from DHCP, which the fake backend does not run
+@pytest.mark.parametrize("scenario_name, reachable", [("dc_clos_bgp", True), ("ospf_enterprise_dhcp", False)])
+def test_grow_and_shrink_round_trip(kathara, scenario_name, reachable):
+    net_env = get_net_env_instance(scenario_name, use_cache=False, topo_size="s")
+    net_env.deploy()
+    initial = {name: machine.addresses() for name, machine in kathara.labs[net_env.lab.name].machines.items()}
+
+    net_env = resize_lab(net_env, "m")
+    assert_matches_fresh_build(kathara, net_env, "m")
+    if reachable:
+        assert_reachable(net_env)
+
+    net_env = resize_lab(net_env, "s")
+    assert_matches_fresh_build(kathara, net_env, "s")
+    if reachable:
+        assert_reachable(net_env)
+    running = kathara.labs[net_env.lab.name].machines
+    assert {name: machine.addresses() for name, machine in running.items()} == initial
+
+
+def test_resize_explicit_dimensions(kathara):
+    net_env = get_net_env_instance("dc_clos_bgp", use_cache=False, topo_size="s")
+    net_env.deploy()
+    net_env = resize_lab(net_env, "s", leaves_per_pod=3, hosts_per_leaf=2)
+    assert_matches_fresh_build(kathara, net_env, "s", leaves_per_pod=3, hosts_per_leaf=2)
+    assert len(net_env.hosts) == 6
+    assert_reachable(net_env)
+
+
+def test_resize_changing_a_routing_process_is_rejected():
+    net_env = get_net_env_instance("dc_clos_bgp", use_cache=False, topo_size="s")
+    with pytest.raises(ValueError):
+        resize_lab(net_env, "xl")
@@ -0,0 +1,41 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from llm4netlab.utils.session import SessionStore
+
+
+def test_concurrent_sessions(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    SessionStore(path)
+
+    def run_session(worker: int) -> str:
+        # every worker opens its own store, as the step scripts of parallel sessions do
+        store = SessionStore(path)
+        # all the sessions are started in the same second
+        session_id = store.create("1019120000")
+        for step in range(10):
+            store.set(session_id, {"worker": worker, f"step_{step}": step})
+        store.set(session_id, {"lab_name": f"lab_{worker}"})
+        return session_id
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        session_ids = list(executor.map(run_session, range(16)))
+
+    assert len(set(session_ids)) == 16
+    assert "1019120000" in session_ids
+    store = SessionStore(path)
+    for worker, session_id in enumerate(session_ids):
+        session = store.get(session_id)
+        assert session["worker"] == worker
+        assert session["lab_name"] == f"lab_{worker}"
+        assert [session[f"step_{step}"] for step in range(10)] == list(range(10))
+
+
+def test_latest_active_session(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    assert store.latest() is None
+    first = store.create("1019120000")
+    second = store.create("1019120001")
+    assert store.latest() == second
+    store.close(second)
+    assert store.latest() == first
+    assert store.get("unknown") is None